@@ -0,0 +1,226 @@
+"""
+Benchmarks of the hooks on large synthetic repositories.
+
+Every hook runs in a child process (see benchmarks/probe.py) twice: with an empty cache
+and with the cache filled by the first run. Wall time, peak RSS and counts of opened files,
+directory listings and started processes are compared with the stored baselines. Every hook
+must succeed on its input, a different exit code is a regression.
+
+Usage: python -m benchmarks [--scale 1.0] [--only NAME] [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections.abc import Callable
+from collections.abc import Sequence
+from typing import Any
+from typing import NamedTuple
+
+from hooks.settings import get_project_root
+
+from . import generators
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+# Differences below these values are noise
+MIN_TIME_DELTA = 0.05
+MIN_RSS_DELTA = 5 * 1024 * 1024
+COUNTERS = ("open", "listdir", "subprocess")
+
+
+class Scenario(NamedTuple):
+    """Hook run on a generated input."""
+
+    name: str
+    # Generated input name, scenarios with the same input share it
+    input_name: str
+    target: str
+    args: list[str]
+
+
+def _source_tree(root: str, scale: float) -> None:
+    generators.make_source_tree(root, files=int(5000 * scale), vendored_files=int(2000 * scale))
+
+
+def _django_project(root: str, scale: float) -> None:
+    generators.make_django_project(root, apps=int(200 * scale), migrations_per_app=10)
+
+
+def _untracked_storm(root: str, scale: float) -> None:
+    generators.make_untracked_storm(root, tracked=int(2000 * scale), untracked=int(20000 * scale))
+
+
+def _po_catalog(root: str, scale: float) -> None:
+    # About 4 MB
+    generators.make_po_catalog(os.path.join(root, "locale", "de", "LC_MESSAGES", "django.po"), int(25000 * scale))
+
+
+INPUTS: dict[str, Callable[[str, float], None]] = {
+    "source-tree": _source_tree,
+    "django-project": _django_project,
+    "untracked-storm": _untracked_storm,
+    "po-catalog": _po_catalog,
+}
+
+PO_FILE = os.path.join("locale", "de", "LC_MESSAGES", "django.po")
+
+SCENARIOS = [
+    Scenario("files-with-extension", "source-tree", "hooks.utils:iter_files_with_extension", [".py", "."]),
+    Scenario("migration-graph", "django-project", "hooks.check_migration_graph", []),
+    Scenario("debug-mode-static", "django-project", "hooks.check_debug_mode", ["--mode", "static"]),
+    Scenario("debug-mode-import", "django-project", "hooks.check_debug_mode", ["--mode", "import"]),
+    Scenario("absent-migrations", "django-project", "hooks.check_absent_migrations", []),
+    Scenario("unapplied-migrations", "django-project", "hooks.check_unapplied_migrations", []),
+    Scenario("django-check-run", "django-project", "hooks.cli", ["run", "--hooks", "debug,unapplied,absent"]),
+    Scenario("untracked-migrations", "untracked-storm", "hooks.check_untracked_migrations", []),
+    Scenario("po-location-format", "po-catalog", "hooks.po_location_format", [PO_FILE, "--add-location", "file"]),
+]
+
+
+def run_probe(scenario: Scenario, cwd: str, cache_dir: str, result_path: str) -> dict[str, Any]:
+    """
+    Runs the scenario in a child process.
+
+    Returns:
+        Measurements reported by the probe
+    """
+    env = {
+        **os.environ,
+        "DJANGO_CHECK_CACHE_DIR": cache_dir,
+        "PYTHONPATH": os.pathsep.join([get_project_root(), os.environ.get("PYTHONPATH", "")]),
+    }
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    command = [sys.executable, "-m", "benchmarks.probe", result_path, scenario.target, *scenario.args]
+    subprocess.run(command, cwd=cwd, env=env, check=True)
+    with open(result_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_scenario(scenario: Scenario, workdir: str, repeat: int) -> dict[str, dict[str, Any]]:
+    """
+    Runs the scenario with an empty cache once and with a filled cache repeat times.
+
+    Returns:
+        Measurements by run name (cold or warm), the best of the warm runs is kept
+    """
+    cwd = os.path.join(workdir, "inputs", scenario.input_name)
+    cache_dir = os.path.join(workdir, "cache", scenario.name)
+    result_path = os.path.join(workdir, f"{scenario.name}.json")
+
+    results = {"cold": run_probe(scenario, cwd, cache_dir, result_path)}
+    warm = [run_probe(scenario, cwd, cache_dir, result_path) for _ in range(max(1, repeat))]
+    results["warm"] = min(warm, key=lambda result: result["wall"])
+    return results
+
+
+def find_regressions(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    time_tolerance: float,
+    rss_tolerance: float,
+) -> list[str]:
+    """
+    Compares measurements with the baseline.
+
+    Args:
+        results: Measurements by benchmark name
+        baseline: Baseline measurements by benchmark name
+        time_tolerance: Allowed ratio of wall time to the baseline
+        rss_tolerance: Allowed ratio of peak RSS to the baseline
+
+    Returns:
+        Regression descriptions
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["exit_code"] != expected["exit_code"]:
+            regressions.append(f"{name}: exit code {result['exit_code']}, baseline {expected['exit_code']}")
+        wall, expected_wall = result["wall"], expected["wall"]
+        if wall > expected_wall * time_tolerance and wall - expected_wall > MIN_TIME_DELTA:
+            regressions.append(f"{name}: wall time {wall:.3f}s, baseline {expected_wall:.3f}s")
+        rss, expected_rss = result["rss"], expected["rss"]
+        if rss > expected_rss * rss_tolerance and rss - expected_rss > MIN_RSS_DELTA:
+            regressions.append(f"{name}: peak RSS {rss / 2**20:.1f} MB, baseline {expected_rss / 2**20:.1f} MB")
+        for counter in COUNTERS:
+            # Counts do not depend on the machine, but may differ a bit between Python versions
+            if result[counter] > expected[counter] * 1.1 + 5:
+                regressions.append(f"{name}: {counter} count {result[counter]}, baseline {expected[counter]}")
+    return regressions
+
+
+def print_header() -> None:
+    print(f"{'benchmark':<32} {'wall':>9} {'baseline':>9} {'RSS MB':>8} {'open':>8} {'listdir':>8} {'procs':>6}")
+
+
+def print_result(name: str, result: dict[str, Any], expected: dict[str, Any] | None) -> None:
+    expected_wall = f"{expected['wall']:.3f}s" if expected else "-"
+    print(
+        f"{name:<32} {result['wall']:>8.3f}s {expected_wall:>9} {result['rss'] / 2**20:>8.1f} "
+        f"{result['open']:>8} {result['listdir']:>8} {result['subprocess']:>6}"
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for running benchmarks."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark hooks on generated inputs")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier of generated input sizes")
+    parser.add_argument("--only", action="append", choices=[s.name for s in SCENARIOS], help="Run only these")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs with a filled cache")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baselines file path")
+    parser.add_argument("--update-baseline", action="store_true", help="Store results as the new baselines")
+    parser.add_argument("--time-tolerance", type=float, default=1.5, help="Allowed wall time ratio to the baseline")
+    parser.add_argument("--rss-tolerance", type=float, default=1.25, help="Allowed peak RSS ratio to the baseline")
+    args = parser.parse_args(argv)
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or scenario.name in args.only]
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        stored = {}
+    baseline = stored.get("results", {}) if stored.get("scale") == args.scale else {}
+    if stored and not baseline:
+        print(f"Baselines are stored for scale {stored.get('scale')}, comparison is skipped")
+
+    with tempfile.TemporaryDirectory(prefix="django-check-bench-") as workdir:
+        for input_name in sorted({scenario.input_name for scenario in scenarios}):
+            print(f"Generating {input_name}...")
+            INPUTS[input_name](os.path.join(workdir, "inputs", input_name), args.scale)
+
+        results = {}
+        print_header()
+        for scenario in scenarios:
+            for run, result in run_scenario(scenario, workdir, args.repeat).items():
+                name = f"{scenario.name}/{run}"
+                results[name] = result
+                print_result(name, result, baseline.get(name))
+
+    failed = [name for name, result in results.items() if result["exit_code"] != 0]
+    if args.update_baseline and failed:
+        print(f"Baselines are not updated, hooks failed: {', '.join(sorted(failed))}")
+        return 1
+    if args.update_baseline:
+        stored_results = baseline if args.only else {}
+        stored_results.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "results": stored_results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baselines written to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.time_tolerance, args.rss_tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if regressions:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
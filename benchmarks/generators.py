@@ -0,0 +1,166 @@
+"""Generators of large synthetic inputs for the hooks."""
+
+import os
+import shutil
+import subprocess
+import sys
+
+from hooks.settings import get_example_project_path
+
+MODELS = """from django.db import models
+
+
+class Item{index}(models.Model):
+    name = models.CharField(max_length=100)
+{relation}"""
+
+RELATION = '    parent = models.ForeignKey("{app}.Item{index}", on_delete=models.CASCADE)\n'
+
+INITIAL_MIGRATION = """from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = {dependencies}
+
+    operations = [
+        migrations.CreateModel(
+            name="Item{index}",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=100)),
+{relation}            ],
+        ),
+    ]
+"""
+
+INITIAL_RELATION = (
+    '                ("parent", models.ForeignKey(on_delete=models.deletion.CASCADE, to="{app}.item{index}")),\n'
+)
+
+EMPTY_MIGRATION = """from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = {dependencies}
+
+    operations = []
+"""
+
+PO_HEADER = """msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\\n"
+
+"""
+
+PO_ENTRY = """#: app_{module}/templates/app_{module}/page.html
+#: app_{module}/views.py
+msgid "Message number {index}"
+msgstr "Translated message number {index}"
+
+"""
+
+
+def _write(path: str, content: str = "") -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _git(root: str, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=root, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def init_git_repository(root: str) -> None:
+    """Creates a git repository with all files of the folder committed."""
+    _git(root, "init", "-q")
+    _git(root, "add", "-A")
+    _git(root, "-c", "user.name=bench", "-c", "user.email=bench@example.com", "commit", "-q", "-m", "init")
+
+
+def make_source_tree(root: str, files: int, vendored_files: int, depth: int = 8) -> None:
+    """
+    Creates a tree of Python files with deep node_modules and venv folders.
+
+    Args:
+        root: Folder to create files in
+        files: Number of project .py files
+        vendored_files: Number of files in each of node_modules and venv
+        depth: Nesting depth of vendored folders
+    """
+    for index in range(files):
+        _write(os.path.join(root, f"package_{index % 50}", f"module_{index // 50 % 20}", f"file_{index}.py"))
+    for vendored in ("node_modules", os.path.join("venv", "lib", "site-packages")):
+        for index in range(vendored_files):
+            nested = os.path.join("", *[f"level_{level}" for level in range(index % depth)])
+            _write(os.path.join(root, vendored, f"package_{index % 100}", nested, f"file_{index}.py"))
+
+
+def make_django_project(root: str, apps: int, migrations_per_app: int) -> None:
+    """
+    Creates a Django project with many apps, every app has a model and a chain of migrations.
+
+    Every app model references the model of the previous app, so migrations of the apps depend on each other.
+    All migrations are applied to the SQLite database of the project.
+
+    Args:
+        root: Folder for the project, it must not exist
+        apps: Number of apps
+        migrations_per_app: Number of migrations of every app
+    """
+    shutil.copytree(get_example_project_path(), root)
+    labels = [f"app_{index}" for index in range(apps)]
+    for index, label in enumerate(labels):
+        previous = labels[index - 1] if index else None
+        relation = RELATION.format(app=previous, index=index - 1) if previous else ""
+        _write(os.path.join(root, label, "__init__.py"))
+        _write(os.path.join(root, label, "models.py"), MODELS.format(index=index, relation=relation))
+        _write(os.path.join(root, label, "migrations", "__init__.py"))
+
+        dependencies = [(previous, "0001_initial")] if previous else []
+        initial_relation = INITIAL_RELATION.format(app=previous, index=index - 1) if previous else ""
+        content = INITIAL_MIGRATION.format(index=index, dependencies=dependencies, relation=initial_relation)
+        _write(os.path.join(root, label, "migrations", "0001_initial.py"), content)
+        for number in range(2, migrations_per_app + 1):
+            dependencies = [(label, f"{number - 1:04d}_step")] if number > 2 else [(label, "0001_initial")]
+            content = EMPTY_MIGRATION.format(dependencies=dependencies)
+            _write(os.path.join(root, label, "migrations", f"{number:04d}_step.py"), content)
+
+    with open(os.path.join(root, "testproject", "settings.py"), "a", encoding="utf-8") as f:
+        f.write(f"\nDEBUG = False\nINSTALLED_APPS += {labels!r}\n")
+
+    env = {name: value for name, value in os.environ.items() if name != "DJANGO_SETTINGS_MODULE"}
+    subprocess.run([sys.executable, "manage.py", "migrate", "--verbosity", "0"], cwd=root, env=env, check=True)
+
+
+def make_untracked_storm(root: str, tracked: int, untracked: int) -> None:
+    """
+    Creates a git repository with many committed migrations and many untracked files which are not migrations.
+
+    Args:
+        root: Folder for the repository
+        tracked: Number of committed migrations
+        untracked: Number of untracked files
+    """
+    for index in range(tracked):
+        _write(os.path.join(root, f"app_{index % 100}", "migrations", f"{index:04d}_tracked.py"))
+    init_git_repository(root)
+    for index in range(untracked):
+        _write(os.path.join(root, "build", f"chunk_{index % 100}", f"file_{index}.js"))
+
+
+def make_po_catalog(path: str, entries: int) -> None:
+    """
+    Creates a .po catalog with locations formatted like --add-location file does.
+
+    Args:
+        path: Path to the catalog
+        entries: Number of messages, about 150 bytes each
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(PO_HEADER)
+        for index in range(entries):
+            f.write(PO_ENTRY.format(module=index % 40, index=index))
@@ -0,0 +1,71 @@
+"""
+Runs a hook entry point in this process and reports resource usage as JSON.
+
+Usage: python -m benchmarks.probe RESULT_PATH TARGET [ARGS...]
+
+TARGET is a hook module, its main() is called with ARGS as argv, or MODULE:FUNCTION called with ARGS.
+
+Audit hooks can not be removed once added, so the probe is always started in a child process.
+"""
+
+import collections
+import contextlib
+import importlib
+import io
+import json
+import os
+import resource
+import sys
+import time
+from collections.abc import Iterator
+
+OPEN_EVENTS = {"open"}
+LISTING_EVENTS = {"os.scandir", "os.listdir"}
+PROCESS_EVENTS = {"subprocess.Popen", "os.fork", "os.posix_spawn", "os.exec"}
+
+
+def main() -> int:
+    result_path, target, *args = sys.argv[1:]
+    module_name, _, function_name = target.partition(":")
+    counts = {"open": 0, "listdir": 0, "subprocess": 0}
+
+    def audit(event: str, event_args: tuple) -> None:
+        if event in OPEN_EVENTS:
+            counts["open"] += 1
+        elif event in LISTING_EVENTS:
+            counts["listdir"] += 1
+        elif event in PROCESS_EVENTS:
+            counts["subprocess"] += 1
+
+    sys.addaudithook(audit)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        module = importlib.import_module(module_name)
+        if function_name:
+            returned = getattr(module, function_name)(*args)
+            if isinstance(returned, Iterator):
+                # Generators do the work while they are consumed
+                collections.deque(returned, maxlen=0)
+            exit_code = 0
+        else:
+            exit_code = module.main(args)
+    wall = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+    result = {
+        "wall": wall,
+        "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_unit,
+        "children_rss": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * rss_unit,
+        "exit_code": exit_code,
+        **counts,
+    }
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    return 0
+
+
+if __name__ == "__main__":
+    # Skip interpreter cleanup, it is not a part of the hook run
+    sys.stdout.flush()
+    os._exit(main())
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+from typing import Any
+
+from .timings import IO
+from .timings import span
+from .timings import timed
+
+CACHE_DIR_ENV = "DJANGO_CHECK_CACHE_DIR"
+NO_CACHE_ENV = "DJANGO_CHECK_NO_CACHE"
+CACHE_DIR_NAME = "django-check"
+
+
+def find_git_dir(start_path: str = ".") -> str | None:
+    """
+    Finds the git directory of the repository containing the path.
+
+    Args:
+        start_path: Path inside the repository
+
+    Returns:
+        Path to the git directory or None if the path is not inside a git repository
+    """
+    current = os.path.abspath(start_path)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
+            # Worktrees and submodules use a ".git" file pointing to the real git directory
+            with open(dot_git, encoding="utf-8") as f:
+                content = f.read().strip()
+            if content.startswith("gitdir:"):
+                return os.path.join(current, content[len("gitdir:") :].strip())
+            return None
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def get_cache_dir(start_path: str = ".", create: bool = True) -> str | None:
+    """
+    Returns the cache directory, creating it if needed.
+
+    The directory is taken from DJANGO_CHECK_CACHE_DIR, otherwise it is placed inside the git
+    directory of the repository, so it is never committed and is shared by all worktree checkouts.
+
+    Args:
+        start_path: Path inside the repository
+        create: Whether to create the directory, otherwise it is returned only if it exists
+
+    Returns:
+        Path to the cache directory or None if caching is disabled or not possible
+    """
+    if os.environ.get(NO_CACHE_ENV):
+        return None
+
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        git_dir = find_git_dir(start_path)
+        if git_dir is None:
+            return None
+        cache_dir = os.path.join(git_dir, CACHE_DIR_NAME)
+
+    if not create:
+        return cache_dir if os.path.isdir(cache_dir) else None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return None
+    return cache_dir
+
+
+def load_cache(name: str, start_path: str = ".") -> dict[str, Any]:
+    """
+    Loads a JSON cache file, returning an empty dict if it is missing or broken.
+
+    Args:
+        name: Cache file name
+        start_path: Path inside the repository
+
+    Returns:
+        Cached data
+    """
+    cache_dir = get_cache_dir(start_path, create=False)
+    if cache_dir is None:
+        return {}
+
+    try:
+        with span("load cache", IO, file=name), open(os.path.join(cache_dir, name), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_cache(name: str, data: dict[str, Any], start_path: str = ".") -> None:
+    """
+    Atomically writes a JSON cache file. Errors are ignored, cache is only an optimization.
+
+    Args:
+        name: Cache file name
+        data: Data to store
+        start_path: Path inside the repository
+    """
+    cache_dir = get_cache_dir(start_path)
+    if cache_dir is None:
+        return
+
+    # tempfile imports shutil and random, it is not needed to only read caches
+    import tempfile
+
+    try:
+        with span("save cache", IO, file=name):
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix=f".{name}.")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, os.path.join(cache_dir, name))
+    except OSError:
+        pass
+
+
+@timed(IO)
+def file_hash(file_path: str) -> str:
+    """Returns the sha256 hex digest of the file content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path: str) -> dict[str, Any]:
+    """
+    Builds a fingerprint of the file to detect its changes later.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Dictionary with size, mtime and content hash of the file
+    """
+    stat = os.stat(file_path)
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": file_hash(file_path),
+    }
+
+
+def is_file_unchanged(file_path: str, fingerprint: dict[str, Any]) -> bool:
+    """
+    Checks that the file still matches its fingerprint.
+
+    Size and mtime are compared first, the content is hashed only when mtime differs,
+    so touching a file without changing it does not invalidate the cache.
+
+    Args:
+        file_path: Path to the file
+        fingerprint: Fingerprint built by file_fingerprint
+
+    Returns:
+        True if the file content is unchanged
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return False
+
+    if stat.st_size != fingerprint.get("size"):
+        return False
+    if stat.st_mtime_ns == fingerprint.get("mtime"):
+        return True
+    try:
+        return file_hash(file_path) == fingerprint.get("hash")
+    except OSError:
+        return False
@@ -0,0 +1,519 @@
+import argparse
+import datetime
+import decimal
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import uuid
+from collections.abc import Iterable
+from collections.abc import Sequence
+from typing import Any
+
+from .cache import file_hash
+from .cache import load_cache
+from .cache import save_cache
+from .relevance import MODELS
+from .relevance import has_relevant_changes
+from .settings import DJANGO_FILES
+from .timings import IMPORT
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
+from .utils_django import setup_django
+from .utils_migrations import MigrationIssue
+from .utils_migrations import find_conflicts
+from .utils_migrations import print_migration_issues
+
+STATE_CACHE_NAME = "project_state.json"
+# Settings which change model states rendered from migrations, besides swappable model settings
+STATE_SETTINGS = ["AUTH_USER_MODEL", "MIGRATION_MODULES"]
+
+
+def find_absent_migrations(app_labels: Sequence[str] | None = None) -> list[MigrationIssue]:
+    """
+    Find model changes which are not reflected in migrations.
+
+    Works like makemigrations --check --dry-run, but does not connect to the database.
+    Django must be set up before calling this function.
+
+    Args:
+        app_labels: Apps to check, all apps by default
+
+    Returns:
+        Issue for every conflicting leaf and every migration makemigrations would create
+    """
+    from django.apps import apps
+    from django.db.migrations.autodetector import MigrationAutodetector
+    from django.db.migrations.loader import MigrationLoader
+    from django.db.migrations.questioner import NonInteractiveMigrationQuestioner
+    from django.db.migrations.state import ProjectState
+
+    with span("load migrations", IMPORT):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+    issues = find_conflicts(loader)
+    if issues:
+        # Autodetector can not arrange new migrations for conflicting migrations
+        return issues
+
+    app_labels = list(app_labels) if app_labels else None
+    autodetector = MigrationAutodetector(
+        loader.project_state(),
+        ProjectState.from_apps(apps),
+        NonInteractiveMigrationQuestioner(specified_apps=app_labels, dry_run=True),
+    )
+    with span("autodetect changes"):
+        changes = autodetector.changes(graph=loader.graph, trim_to_apps=app_labels, convert_apps=app_labels)
+    for app_label, migrations in sorted(changes.items()):
+        for migration in migrations:
+            reason = "; ".join(operation.describe() for operation in migration.operations)
+            issues.append(MigrationIssue(app_label, migration.name, reason))
+    return issues
+
+
+def get_app_labels_for_files(filenames: Iterable[str]) -> set[str] | None:
+    """
+    Map changed files to labels of apps containing them.
+
+    Django must be set up before calling this function.
+
+    Args:
+        filenames: Changed files, e.g. staged files passed by pre-commit
+
+    Returns:
+        Labels of changed apps or None if the project entry files changed and all apps must be checked
+    """
+    from django.apps import apps
+
+    # Longest paths first, so files of nested apps are mapped to the innermost app
+    app_paths = sorted(
+        (
+            (os.path.join(os.path.abspath(app_config.path), ""), app_config.label)
+            for app_config in apps.get_app_configs()
+        ),
+        reverse=True,
+    )
+    app_labels = set()
+    for filename in filenames:
+        if not filename.endswith(".py"):
+            continue
+        if os.path.basename(filename) in DJANGO_FILES:
+            return None
+        file_path = os.path.abspath(filename)
+        for app_path, app_label in app_paths:
+            if file_path.startswith(app_path):
+                app_labels.add(app_label)
+                break
+    return app_labels
+
+
+def _migrations_path(app_label: str) -> str | None:
+    from django.db.migrations.loader import MigrationLoader
+
+    module_name, _ = MigrationLoader.migrations_module(app_label)
+    if module_name is None:
+        return None
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return list(spec.submodule_search_locations)[0]
+
+
+def _migrations_hash(migrations_path: str) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(migrations_path)):
+        if name.endswith(".py"):
+            digest.update(name.encode())
+            digest.update(file_hash(os.path.join(migrations_path, name)).encode())
+    return digest.hexdigest()
+
+
+def _related_labels(model_or_state: Any) -> set[str]:
+    """Labels of apps referenced by relations and bases of the model class or ModelState."""
+    from django.db.migrations.state import ModelState
+
+    labels = set()
+    if isinstance(model_or_state, ModelState):
+        references = [base for base in model_or_state.bases if isinstance(base, str)]
+        for field in model_or_state.fields.values():
+            if field.remote_field is not None:
+                references.extend([field.remote_field.model, getattr(field.remote_field, "through", None)])
+        for reference in references:
+            if isinstance(reference, str) and "." in reference:
+                labels.add(reference.split(".")[0])
+        return labels
+
+    labels.update(parent._meta.app_label for parent in model_or_state._meta.parents)
+    for field in model_or_state._meta.local_fields + model_or_state._meta.local_many_to_many:
+        if field.related_model is not None and not isinstance(field.related_model, str):
+            labels.add(field.related_model._meta.app_label)
+        through = getattr(field.remote_field, "through", None)
+        if through is not None and not isinstance(through, str):
+            labels.add(through._meta.app_label)
+    return labels
+
+
+def _resolve(path: str) -> Any:
+    """
+    Resolves a dotted path to an object of an already imported module.
+
+    Nothing is imported, so cached states can not make the hook run code of other modules.
+    """
+    parts = path.split(".")
+    for index in range(len(parts) - 1, 0, -1):
+        module = sys.modules.get(".".join(parts[:index]))
+        if module is None:
+            continue
+        value = module
+        for name in parts[index:]:
+            value = getattr(value, name)
+        return value
+    raise ValueError(f"{path} is not imported")
+
+
+def _reference(value: Any) -> str:
+    path = f"{value.__module__}.{value.__qualname__}"
+    try:
+        if _resolve(path) is value:
+            return path
+    except (AttributeError, ValueError):
+        pass
+    raise TypeError(f"{value!r} can not be referenced by its path")
+
+
+def _encode(value: Any) -> Any:
+    """
+    Encodes a value of a deconstructed model state as JSON.
+
+    Raises:
+        TypeError: If the value can not be encoded, e.g. a lambda default
+    """
+    from django.conf import SettingsReference
+
+    if isinstance(value, SettingsReference):
+        return {"setting": value.setting_name, "value": str(value)}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {"set": [_encode(item) for item in value]}
+    if isinstance(value, dict):
+        return {"dict": [[_encode(key), _encode(item)] for key, item in value.items()]}
+    if isinstance(value, decimal.Decimal):
+        return {"decimal": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    if isinstance(value, datetime.timedelta):
+        return {"timedelta": [value.days, value.seconds, value.microseconds]}
+    if isinstance(value, (datetime.datetime, datetime.time)) and value.utcoffset() is None:
+        return {type(value).__name__: value.isoformat()}
+    if type(value) is datetime.date:
+        return {"date": value.isoformat()}
+    if isinstance(value, type) or callable(value) and hasattr(value, "__qualname__"):
+        # Classes and functions, e.g. bases, on_delete=CASCADE or default=timezone.now
+        return {"ref": _reference(value)}
+    if hasattr(value, "deconstruct"):
+        # Fields, managers, validators, indexes, constraints and expressions
+        deconstructed = value.deconstruct()
+        if len(deconstructed) == 4:
+            _, path, args, kwargs = deconstructed
+        elif len(deconstructed) == 5:
+            as_manager, path, _, args, kwargs = deconstructed
+            if as_manager:
+                raise TypeError("managers built with QuerySet.as_manager() are not encoded")
+        else:
+            path, args, kwargs = deconstructed
+        return {"object": path, "args": [_encode(item) for item in args], "kwargs": _encode(kwargs)}
+    raise TypeError(f"{type(value).__name__} values are not encoded")
+
+
+def _decode(value: Any) -> Any:
+    """
+    Decodes a value encoded by _encode.
+
+    Objects are built only with classes which can be deconstructed, like Django does for migrations.
+
+    Raises:
+        ValueError: If the value can not be decoded
+    """
+    from django.conf import SettingsReference
+
+    if not isinstance(value, (list, dict)):
+        return value
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    try:
+        if "setting" in value:
+            return SettingsReference(value["value"], value["setting"])
+        if "tuple" in value:
+            return tuple(_decode(item) for item in value["tuple"])
+        if "set" in value:
+            return {_decode(item) for item in value["set"]}
+        if "dict" in value:
+            return {_decode(key): _decode(item) for key, item in value["dict"]}
+        if "decimal" in value:
+            return decimal.Decimal(value["decimal"])
+        if "uuid" in value:
+            return uuid.UUID(value["uuid"])
+        if "timedelta" in value:
+            return datetime.timedelta(*value["timedelta"])
+        for name in ("datetime", "date", "time"):
+            if name in value:
+                return getattr(datetime, name).fromisoformat(value[name])
+        if "ref" in value:
+            return _resolve(value["ref"])
+        cls = _resolve(value["object"])
+        if not isinstance(cls, type) or not hasattr(cls, "deconstruct"):
+            raise ValueError(f"{value['object']} can not be deconstructed")
+        return cls(*_decode(value["args"]), **_decode(value["kwargs"]))
+    except (AttributeError, KeyError, TypeError) as e:
+        raise ValueError(f"broken cached value: {e}") from e
+
+
+def _encode_model_states(model_states: list[Any]) -> list[Any]:
+    return [
+        {
+            "app_label": model_state.app_label,
+            "name": model_state.name,
+            "fields": _encode(list(model_state.fields.items())),
+            "options": _encode(model_state.options),
+            "bases": _encode(model_state.bases),
+            "managers": _encode(model_state.managers),
+        }
+        for model_state in model_states
+    ]
+
+
+def _decode_model_states(data: Any) -> list[Any]:
+    from django.db.migrations.state import ModelState
+
+    try:
+        return [
+            ModelState(
+                item["app_label"],
+                item["name"],
+                _decode(item["fields"]),
+                options=_decode(item["options"]),
+                bases=_decode(item["bases"]),
+                managers=_decode(item["managers"]),
+            )
+            for item in data
+        ]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"broken cached state: {e}") from e
+
+
+def _settings_hash() -> str:
+    """Hash of settings model states depend on, e.g. swapped user models."""
+    from django.apps import apps
+    from django.conf import settings
+
+    names = set(STATE_SETTINGS)
+    for model in apps.get_models(include_swapped=True):
+        if model._meta.swappable:
+            names.add(model._meta.swappable)
+    values = {name: getattr(settings, name, None) for name in sorted(names)}
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=repr).encode()).hexdigest()[:16]
+
+
+class _MigrationStates:
+    """
+    Per-app migration state, cached between runs.
+
+    The cache stores deconstructed model states as JSON and leaf migrations of every app,
+    invalidated by content hashes of the app migration files and by settings states depend on.
+    When any needed app is missing or changed, the migration graph is loaded once and the cache is
+    refreshed for all apps.
+    """
+
+    def __init__(self, use_cache: bool):
+        import django
+        from django.conf import settings
+
+        self.use_cache = use_cache
+        self.cache_key = f"{settings.SETTINGS_MODULE}:{django.get_version()}:{_settings_hash()}"
+        self.cache = load_cache(STATE_CACHE_NAME) if use_cache else {}
+        self.entries = self.cache.get(self.cache_key, {})
+        self.models: dict[str, list[Any]] = {}
+        self.leaves: dict[str, list[str]] = {}
+        self.unmigrated: set[str] = set()
+        self.loaded = False
+
+    def load(self, app_labels: Iterable[str]) -> None:
+        for app_label in app_labels:
+            if app_label in self.models or app_label in self.unmigrated:
+                continue
+            migrations_path = _migrations_path(app_label)
+            if migrations_path is None:
+                self.unmigrated.add(app_label)
+                continue
+            models = self._cached_models(app_label, migrations_path)
+            if models is not None:
+                self.models[app_label] = models
+                self.leaves[app_label] = self.entries[app_label]["leaves"]
+            elif not self.loaded:
+                self._load_graph()
+            else:
+                # Not known to the migration loader, e.g. empty migrations package
+                self.models[app_label] = []
+                self.leaves[app_label] = []
+
+    def _cached_models(self, app_label: str, migrations_path: str) -> list[Any] | None:
+        entry = self.entries.get(app_label)
+        if not entry or entry.get("hash") != _migrations_hash(migrations_path):
+            return None
+        try:
+            return _decode_model_states(entry["models"])
+        except ValueError:
+            # E.g. a referenced function moved, the graph is loaded
+            return None
+
+    def _load_graph(self) -> None:
+        from django.db.migrations.loader import MigrationLoader
+
+        with span("load migrations", IMPORT):
+            loader = MigrationLoader(None, ignore_no_migrations=True)
+            state = loader.project_state()
+        self.loaded = True
+        self.models = {app_label: [] for app_label in loader.migrated_apps}
+        for (app_label, _), model_state in state.models.items():
+            self.models.setdefault(app_label, []).append(model_state)
+        self.leaves = {app_label: [] for app_label in self.models}
+        for app_label, name in loader.graph.leaf_nodes():
+            self.leaves.setdefault(app_label, []).append(name)
+
+        if not self.use_cache:
+            return
+        for app_label, model_states in self.models.items():
+            migrations_path = _migrations_path(app_label)
+            if migrations_path is None:
+                continue
+            try:
+                models = _encode_model_states(model_states)
+            except TypeError:
+                # States with values which can not be encoded, e.g. lambda defaults, are not cached
+                self.entries.pop(app_label, None)
+                continue
+            self.entries[app_label] = {
+                "hash": _migrations_hash(migrations_path),
+                "models": models,
+                "leaves": self.leaves[app_label],
+            }
+        self.cache[self.cache_key] = self.entries
+        save_cache(STATE_CACHE_NAME, self.cache)
+
+
+def find_absent_migrations_in_apps(app_labels: Iterable[str], use_cache: bool = True) -> list[MigrationIssue]:
+    """
+    Find model changes which are not reflected in migrations of the given apps only.
+
+    Only the given apps and apps related to their models are diffed. Migration state of unchanged
+    apps is taken from the cache, so the migration graph is not loaded at all in the common case.
+    Django must be set up before calling this function.
+
+    Args:
+        app_labels: Apps to check
+        use_cache: Whether to use the cached migration state
+
+    Returns:
+        Issue for every conflicting leaf and every migration makemigrations would create
+    """
+    from django.apps import apps
+    from django.db.migrations.autodetector import MigrationAutodetector
+    from django.db.migrations.graph import MigrationGraph
+    from django.db.migrations.questioner import NonInteractiveMigrationQuestioner
+    from django.db.migrations.state import ModelState
+    from django.db.migrations.state import ProjectState
+
+    app_labels = sorted(app_labels)
+    states = _MigrationStates(use_cache)
+
+    # Models of related apps are needed to render both states
+    installed = {app_config.label for app_config in apps.get_app_configs()}
+    needed = set(app_labels)
+    pending = set(app_labels)
+    while pending:
+        states.load(pending)
+        related = set()
+        for app_label in pending:
+            for model in apps.get_app_config(app_label).get_models(include_swapped=True):
+                related |= _related_labels(model)
+            for model_state in states.models.get(app_label, []):
+                related |= _related_labels(model_state)
+        pending = (related & installed) - needed
+        needed |= pending
+
+    issues = []
+    for app_label in app_labels:
+        leaves = sorted(states.leaves.get(app_label, []))
+        if len(leaves) > 1:
+            for name in leaves:
+                issues.append(MigrationIssue(app_label, name, f"conflicting leaf nodes: {', '.join(leaves)}"))
+    if issues:
+        return issues
+
+    from_state = ProjectState(real_apps=needed & states.unmigrated)
+    to_state = ProjectState()
+    graph = MigrationGraph()
+    for app_label in sorted(needed):
+        for model_state in states.models.get(app_label, []):
+            from_state.add_model(model_state.clone())
+        for model in apps.get_app_config(app_label).get_models(include_swapped=True):
+            to_state.add_model(ModelState.from_model(model))
+        for name in states.leaves.get(app_label, []):
+            graph.add_node((app_label, name), None)
+
+    autodetector = MigrationAutodetector(
+        from_state,
+        to_state,
+        NonInteractiveMigrationQuestioner(specified_apps=app_labels, dry_run=True),
+    )
+    with span("autodetect changes"):
+        changes = autodetector.changes(graph=graph, trim_to_apps=app_labels, convert_apps=app_labels)
+    for app_label, migrations in sorted(changes.items()):
+        for migration in migrations:
+            reason = "; ".join(operation.describe() for operation in migration.operations)
+            issues.append(MigrationIssue(app_label, migration.name, reason))
+    return issues
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for checking absent migrations."""
+    parser = argparse.ArgumentParser(description="Check that all model changes have migrations")
+    parser.add_argument("filenames", nargs="*", help="Changed files, only apps containing them are checked")
+    parser.add_argument("--project-folder", default=".", help="Project folder path")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use settings discovery and migration caches")
+    parser.add_argument("--json", action="store_true", help="Print found issues as JSON")
+    add_timings_argument(parser)
+    args = parser.parse_args(argv)
+
+    with record_timings(args.timings, "check-absent-migrations"):
+        use_cache = not args.no_cache
+        if args.filenames and not has_relevant_changes(args.filenames, args.project_folder, MODELS, use_cache):
+            print("No app files changed")
+            return 0
+
+        if setup_django(args.project_folder, use_cache=use_cache) is None:
+            return 1
+
+        app_labels = get_app_labels_for_files(args.filenames) if args.filenames else None
+        if app_labels is None:
+            issues = find_absent_migrations()
+        elif app_labels:
+            issues = find_absent_migrations_in_apps(app_labels, use_cache=use_cache)
+        else:
+            print("No app files changed")
+            return 0
+        print_migration_issues(issues, "Absent migration", as_json=args.json)
+        return 1 if issues else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,23 +1,164 @@
 import argparse
+import contextlib
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
 from collections.abc import Sequence
+from typing import Any
+from typing import NamedTuple
 
-from .utils_django import init_django_settings
+from .cache import load_cache
+from .cache import save_cache
+from .daemon import NO_DAEMON_ENV
+from .daemon import run_in_daemon
+from .dependencies import Dependencies
+from .dependencies import is_snapshot_unchanged
+from .dependencies import track_imports
+from .modes import AUTO
+from .modes import MODES
+from .modes import STATIC
+from .relevance import SETTINGS
+from .relevance import has_relevant_changes
+from .timings import SUBPROCESS
+from .timings import TIMINGS_ENV
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
 
+# Results are stored in a file per project, parallel checks of projects do not overwrite each other
+RESULT_CACHE_PREFIX = "debug_mode"
 
-def check_debug_mode_via_django_settings(project_folder: str = ".") -> bool:
+# Statuses of projects checked with --all-projects
+OK = "OK"
+FAILED = "FAILED"
+TIMEOUT = "TIMEOUT"
+
+
+class ProjectResult(NamedTuple):
+    project_folder: str
+    settings_module: str
+    status: str
+    duration: float
+    output: str
+
+
+def _result_cache_name(project_folder: str, settings_module: str, mode: str) -> str:
+    key = json.dumps([os.path.abspath(project_folder), settings_module, mode])
+    return f"{RESULT_CACHE_PREFIX}-{hashlib.sha256(key.encode()).hexdigest()[:16]}.json"
+
+
+def load_cached_result(project_folder: str, settings_module: str, mode: str) -> bool | None:
+    """
+    Returns the result of the previous check if settings and everything they depend on are unchanged.
+
+    Args:
+        project_folder: Path to the project folder.
+        settings_module: Settings module of the project.
+        mode: How settings were evaluated.
+
+    Returns:
+        True if DEBUG was disabled, False if not, None if there is no valid cached result.
+    """
+    entry = load_cache(_result_cache_name(project_folder, settings_module, mode), project_folder)
+    if not entry or not is_snapshot_unchanged(entry.get("dependencies", {})):
+        return None
+    return entry.get("is_debug_disabled")
+
+
+def save_result(
+    project_folder: str,
+    settings_module: str,
+    mode: str,
+    is_debug_disabled: bool,
+    dependencies: Dependencies,
+) -> None:
+    """Stores the result of the check with the snapshot of files and environment variables it depends on."""
+    if not dependencies.complete or not dependencies.files:
+        return
+    entry: dict[str, Any] = {"is_debug_disabled": is_debug_disabled, "dependencies": dependencies.snapshot()}
+    save_cache(_result_cache_name(project_folder, settings_module, mode), entry, project_folder)
+
+
+def print_cached_result(is_debug_disabled: bool) -> None:
+    print(f"DEBUG mode: {'disabled' if is_debug_disabled else 'not disabled'} (cached, settings are unchanged)")
+
+
+def check_debug_mode_statically(
+    project_folder: str = ".",
+    use_cache: bool = True,
+    settings_module: str | None = None,
+    dependencies: Dependencies | None = None,
+) -> bool | None:
+    """
+    Check DEBUG mode by static evaluation of Django settings, without importing them.
+
+    Args:
+        project_folder: Path to the project folder.
+        use_cache: Whether to use the settings discovery cache.
+        settings_module: Settings module to check instead of the found one.
+        dependencies: Collects evaluated files and looked up environment variables.
+
+    Returns:
+        True if DEBUG = False, False if DEBUG = True, None if DEBUG can not be evaluated statically.
+    """
+    # Imported here to keep the client of the daemon light
+    from .static_settings import StaticSettingsEvaluator
+    from .utils_django import find_settings_module
+
+    settings_module = settings_module or find_settings_module(project_folder, use_cache=use_cache)
+    if not settings_module:
+        return None
+
+    evaluator = StaticSettingsEvaluator(project_folder)
+    namespace = evaluator.evaluate_module(settings_module)
+    if dependencies is not None:
+        dependencies.add_files(evaluator.visited_files)
+        dependencies.environ_names.update(evaluator.environ.looked_up)
+    if namespace is None:
+        return None
+
+    # DEBUG is False by default in Django global settings
+    settings_value = namespace.lookup("DEBUG", False)
+    # Imported names and environment lookups only resolve to a bool at import time
+    if not isinstance(settings_value, bool):
+        print("DEBUG mode: undecidable without importing settings")
+        return None
+
+    print(f"DEBUG mode: {settings_value}")
+    return settings_value is False
+
+
+def check_debug_mode_via_django_settings(
+    project_folder: str = ".",
+    use_cache: bool = True,
+    settings_module: str | None = None,
+    dependencies: Dependencies | None = None,
+) -> bool:
     """
     Check DEBUG mode via Django settings.
 
     Args:
         project_folder: Path to the project folder.
+        use_cache: Whether to use the settings discovery cache.
+        settings_module: Settings module to check instead of the found one.
+        dependencies: Collects imported project modules, opened project files and read environment variables.
 
     Returns:
         True if DEBUG = False, False if DEBUG = True or an error occurred.
     """
+    from .utils_django import init_django_settings
+
+    tracking = contextlib.nullcontext() if dependencies is None else track_imports(dependencies, settings_module)
     try:
-        settings = init_django_settings(project_folder)
+        with tracking:
+            settings = init_django_settings(project_folder, use_cache=use_cache, settings_module=settings_module)
         if settings is None:
             print("ERROR: Django settings are not initialized")
+            if dependencies is not None:
+                dependencies.complete = False
             return False
 
         # Get DEBUG value from Django settings
@@ -26,25 +167,258 @@ def check_debug_mode_via_django_settings(project_folder: str = ".") -> bool:
         return settings_value is False
     except Exception:
         print("ERROR: Failed to check DEBUG mode")
+        if dependencies is not None:
+            dependencies.complete = False
         return False
 
 
+def check_debug_mode(
+    project_folder: str = ".",
+    mode: str = AUTO,
+    use_cache: bool = True,
+    settings_module: str | None = None,
+) -> bool:
+    """
+    Check DEBUG mode of the project and cache the result with everything the settings depend on.
+
+    Args:
+        project_folder: Path to the project folder.
+        mode: How to evaluate settings.
+        use_cache: Whether to use the settings discovery and result caches.
+        settings_module: Settings module to check instead of the found one.
+
+    Returns:
+        True if DEBUG = False.
+    """
+    dependencies = Dependencies(project_folder)
+    is_debug_disabled = None
+    if mode in (AUTO, STATIC):
+        is_debug_disabled = check_debug_mode_statically(project_folder, use_cache, settings_module, dependencies)
+        if is_debug_disabled is None and mode == STATIC:
+            print("ERROR: DEBUG mode can not be evaluated statically")
+            return False
+    if is_debug_disabled is None:
+        is_debug_disabled = check_debug_mode_via_django_settings(
+            project_folder, use_cache, settings_module, dependencies
+        )
+
+    if use_cache and settings_module:
+        save_result(project_folder, settings_module, mode, is_debug_disabled, dependencies)
+    return is_debug_disabled
+
+
+def check_project_in_subprocess(
+    project_folder: str,
+    settings_module: str,
+    mode: str = AUTO,
+    use_cache: bool = True,
+    timeout: float | None = None,
+) -> ProjectResult:
+    """
+    Check DEBUG mode of one project in a separate process.
+
+    Django settings and DJANGO_SETTINGS_MODULE are global for the process, so every project needs its own.
+
+    Args:
+        project_folder: Path to the project folder.
+        settings_module: Settings module of the project.
+        mode: How to evaluate settings.
+        use_cache: Whether to use the settings discovery cache.
+        timeout: Seconds after which the check is stopped.
+
+    Returns:
+        Result of the project check.
+    """
+    command = [
+        sys.executable,
+        "-m",
+        "hooks.check_debug_mode",
+        "--project-folder",
+        project_folder,
+        "--settings-module",
+        settings_module,
+        "--mode",
+        mode,
+    ]
+    if not use_cache:
+        command.append("--no-cache")
+    env = {name: value for name, value in os.environ.items() if name not in ("DJANGO_SETTINGS_MODULE", TIMINGS_ENV)}
+    env[NO_DAEMON_ENV] = "1"
+
+    started = time.perf_counter()
+    try:
+        with span("check project", SUBPROCESS, project=project_folder):
+            process = subprocess.run(
+                command,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=timeout,
+                text=True,
+            )
+    except subprocess.TimeoutExpired as e:
+        output = e.output.decode(errors="replace") if isinstance(e.output, bytes) else e.output or ""
+        return ProjectResult(project_folder, settings_module, TIMEOUT, time.perf_counter() - started, output)
+    status = OK if process.returncode == 0 else FAILED
+    return ProjectResult(project_folder, settings_module, status, time.perf_counter() - started, process.stdout)
+
+
+def check_all_projects(
+    project_folder: str = ".",
+    mode: str = AUTO,
+    use_cache: bool = True,
+    jobs: int = 1,
+    timeout: float | None = None,
+) -> list[ProjectResult] | None:
+    """
+    Check DEBUG mode of every Django project in the folder, in parallel worker processes.
+
+    Args:
+        project_folder: Path to the folder with projects, e.g. the root of a monorepo.
+        mode: How to evaluate settings.
+        use_cache: Whether to use the settings discovery cache.
+        jobs: Number of projects checked at the same time.
+        timeout: Seconds after which the check of a project is stopped.
+
+    Returns:
+        Results in the order of projects, or None if there are no projects.
+    """
+    from .utils_django import discover_projects
+
+    projects = discover_projects(project_folder)
+    if not projects:
+        return None
+
+    results: dict[tuple[str, str], ProjectResult] = {}
+    if use_cache:
+        # Unchanged projects are not checked again, so no process is started for them
+        for project_root, settings_module in projects:
+            cached = load_cached_result(project_root, settings_module, mode)
+            if cached is not None:
+                status = OK if cached else FAILED
+                output = "DEBUG mode is not disabled (cached, settings are unchanged)" if not cached else ""
+                results[project_root, settings_module] = ProjectResult(
+                    project_root, settings_module, status, 0, output
+                )
+    to_check = [project for project in projects if project not in results]
+
+    def check(project: tuple[str, str]) -> ProjectResult:
+        return check_project_in_subprocess(*project, mode=mode, use_cache=use_cache, timeout=timeout)
+
+    if len(to_check) <= 1 or jobs <= 1:
+        results.update((project, check(project)) for project in to_check)
+    else:
+        # Imported here to keep the client of the daemon light, threads only wait for the processes
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(jobs, len(to_check))) as executor:
+            results.update(zip(to_check, executor.map(check, to_check)))
+    return [results[project] for project in projects]
+
+
+def print_results(results: list[ProjectResult], project_folder: str = ".") -> None:
+    """Prints the table of project results and the output of failed projects."""
+    rows = [
+        (
+            os.path.relpath(result.project_folder, project_folder),
+            result.settings_module,
+            result.status,
+            result.duration,
+        )
+        for result in results
+    ]
+    project_width = max(len("project"), *(len(row[0]) for row in rows))
+    module_width = max(len("settings module"), *(len(row[1]) for row in rows))
+    print(f"{'project':<{project_width}}  {'settings module':<{module_width}}  {'result':<7}  {'time':>7}")
+    for project, settings_module, status, duration in rows:
+        print(f"{project:<{project_width}}  {settings_module:<{module_width}}  {status:<7}  {duration:>6.2f}s")
+
+    for (project, settings_module, status, _), result in zip(rows, results):
+        if status != OK:
+            print(f"\n{project} ({settings_module}):")
+            print(result.output.rstrip() or "No output")
+
+
 def main(argv: Sequence[str] | None = None) -> int:
     """Main function for checking DEBUG mode."""
+    exit_code = run_in_daemon("check-debug-mode", argv)
+    if exit_code is not None:
+        return exit_code
     parser = argparse.ArgumentParser(description="Check that DEBUG mode is disabled in Django settings")
-    parser.add_argument("filenames", nargs="*", help="Files to check (if not specified, search automatically)")
+    parser.add_argument(
+        "filenames",
+        nargs="*",
+        help="Changed files, the check is skipped if none of them affects settings (if not specified, always check)",
+    )
     parser.add_argument("--project-folder", default=".", help="Project folder path")
-
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the settings discovery cache")
+    parser.add_argument("--settings-module", help="Settings module to check (if not specified, search automatically)")
+    parser.add_argument(
+        "--all-projects",
+        action="store_true",
+        help="Check every Django project in the project folder, each one in a separate process",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of projects checked in parallel with --all-projects (default is the number of CPUs)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60,
+        help="Seconds to check one project with --all-projects (default is 60)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default=AUTO,
+        help="How to evaluate settings: statically, by importing them, or statically with import as fallback",
+    )
+    add_timings_argument(parser)
     args = parser.parse_args(argv)
 
-    is_debug_disabled = check_debug_mode_via_django_settings(args.project_folder)
+    with record_timings(args.timings, "check-debug-mode"):
+        use_cache = not args.no_cache
 
-    if not is_debug_disabled:
-        print("ERROR: DEBUG mode is not disabled in Django settings")
-        return 1
-    else:
-        print("OK: DEBUG is correctly disabled in Django settings")
-        return 0
+        if args.all_projects:
+            results = check_all_projects(args.project_folder, args.mode, use_cache, args.jobs, args.timeout)
+            if results is None:
+                print("ERROR: No Django projects found")
+                return 1
+            print_results(results, args.project_folder)
+            if any(result.status != OK for result in results):
+                print("ERROR: DEBUG mode is not disabled in some Django projects")
+                return 1
+            print(f"OK: DEBUG is correctly disabled in {len(results)} Django projects")
+            return 0
+
+        if args.filenames and not has_relevant_changes(args.filenames, args.project_folder, SETTINGS, use_cache):
+            print("No settings files changed")
+            return 0
+
+        settings_module = args.settings_module
+        if settings_module is None and use_cache:
+            from .utils_django import find_settings_module
+
+            settings_module = find_settings_module(args.project_folder)
+
+        is_debug_disabled = None
+        if use_cache and settings_module:
+            is_debug_disabled = load_cached_result(args.project_folder, settings_module, args.mode)
+            if is_debug_disabled is not None:
+                print_cached_result(is_debug_disabled)
+
+        if is_debug_disabled is None:
+            is_debug_disabled = check_debug_mode(args.project_folder, args.mode, use_cache, settings_module)
+
+        if not is_debug_disabled:
+            print("ERROR: DEBUG mode is not disabled in Django settings")
+            return 1
+        else:
+            print("OK: DEBUG is correctly disabled in Django settings")
+            return 0
 
 
 if __name__ == "__main__":
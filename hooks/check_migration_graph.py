@@ -0,0 +1,45 @@
+import argparse
+import os
+from collections.abc import Sequence
+
+from .migration_graph import build_migration_graphs
+from .timings import add_timings_argument
+from .timings import record_timings
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for checking migration graph without Django."""
+    parser = argparse.ArgumentParser(description="Check migration conflicts and dangling dependencies")
+    parser.add_argument("--project-folder", default=".", help="Project folder path")
+    parser.add_argument("--jobs", type=int, help="Number of processes parsing migrations (default is CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the parsed migrations cache")
+    add_timings_argument(parser)
+    args = parser.parse_args(argv)
+
+    with record_timings(args.timings, "check-migration-graph"):
+        graphs = build_migration_graphs(args.project_folder, jobs=args.jobs, use_cache=not args.no_cache)
+
+        found = False
+        for graph in graphs:
+            # Same app labels may be used by several projects of a monorepo
+            project = f" in {os.path.relpath(graph.root, args.project_folder)}" if len(graphs) > 1 else ""
+            for app in graph.apps:
+                leaves = [name for _, name in graph.leaf_nodes(app)]
+                if len(leaves) > 1:
+                    found = True
+                    print(f"Conflicting migrations found{project}: {app} {', '.join(leaves)} (multiple leaf nodes)")
+
+            for (app, name), (dependency_app, dependency_name) in graph.dangling_dependencies():
+                found = True
+                print(
+                    f"Dangling dependency found{project}: {app} {name} "
+                    f"depends on missing {dependency_app} {dependency_name}"
+                )
+
+        if found:
+            return 1
+        return 0
+
+
+if __name__ == "__main__":
+    exit(main())
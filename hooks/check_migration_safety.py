@@ -0,0 +1,371 @@
+import argparse
+import os
+from collections.abc import Sequence
+from typing import Any
+from typing import NamedTuple
+
+from .config import load_config
+from .migration_graph import MIGRATION_FILE_RE
+from .migration_graph import Key
+from .migration_graph import MigrationGraph
+from .migration_graph import build_migration_graphs
+from .migration_operations import DATABASE
+from .migration_operations import STATE
+from .migration_operations import MigrationOperations
+from .migration_operations import Operation
+from .migration_operations import parse_operation_files
+from .timings import CHECK
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
+
+# Section of [tool.django-check] in pyproject.toml
+CONFIG_SECTION = "migration-safety"
+# Tables with fewer rows are not flagged when table sizes are configured
+DEFAULT_MIN_ROWS = 1_000_000
+
+ADD_FIELD_DEFAULT = "add-field-default"
+ALTER_FIELD_TYPE = "alter-field-type"
+ADD_INDEX = "add-index"
+RUN_PYTHON = "run-python"
+REMOVE_FIELD = "remove-field"
+RULES = [ADD_FIELD_DEFAULT, ALTER_FIELD_TYPE, ADD_INDEX, RUN_PYTHON, REMOVE_FIELD]
+
+# Operations defining a field, used to find its previous definition
+FIELD_DEFINITIONS = {"CreateModel", "AddField", "AlterField"}
+# Fields creating an index unless db_index=False
+INDEXED_FIELDS = {"ForeignKey", "OneToOneField"}
+# Versions from which adding a column with a default does not rewrite the table
+INSTANT_DEFAULT_VERSIONS = {
+    "postgresql": (11,),
+    "mysql": (8, 0, 12),
+    "mariadb": (10, 3, 2),
+    "oracle": (11,),
+}
+
+
+class Finding(NamedTuple):
+    path: str
+    line: int
+    rule: str
+    message: str
+
+
+class SafetyConfig(NamedTuple):
+    ignore: frozenset[str]
+    # "app_label.model" -> number of rows
+    tables: dict[str, int]
+    min_rows: int
+    # Production database vendor and version, None if not configured
+    database: str | None = None
+    database_version: tuple[int, ...] | None = None
+
+    def has_instant_defaults(self) -> bool:
+        """Without the configured database version defaults are treated as rewriting the table."""
+        minimal = INSTANT_DEFAULT_VERSIONS.get(self.database or "")
+        return minimal is not None and self.database_version is not None and self.database_version >= minimal
+
+    def is_big_table(self, app: str, model: str | None) -> bool:
+        """Without configured table sizes every table is treated as big."""
+        if not self.tables:
+            return True
+        return model is not None and self.tables.get(f"{app}.{model}", 0) >= self.min_rows
+
+
+def _count(name: str, value: Any) -> int:
+    # bool is a subclass of int, but "min-rows = true" is a mistake
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{name} must be a non-negative integer, got {value!r}")
+    return value
+
+
+def _version(value: Any) -> tuple[int, ...]:
+    parts = str(value).split(".") if isinstance(value, (str, int)) and not isinstance(value, bool) else []
+    if not parts or not all(part.isdigit() for part in parts):
+        raise ValueError(f'database-version must be a version string like "15.2", got {value!r}')
+    return tuple(int(part) for part in parts)
+
+
+def load_safety_config(project_folder: str = ".") -> SafetyConfig:
+    """
+    Loads [tool.django-check.migration-safety] from pyproject.toml.
+
+    Args:
+        project_folder: Path to the project folder
+
+    Returns:
+        Ignored rules, table sizes, the size from which tables are big and the production database
+
+    Raises:
+        ValueError: If a value of the section is invalid
+    """
+    config, _ = load_config(project_folder)
+    section: dict[str, Any] = config.get(CONFIG_SECTION, {})
+
+    ignore = section.get("ignore", [])
+    if not isinstance(ignore, list) or any(rule not in RULES for rule in ignore):
+        raise ValueError(f"ignore must be a list of rules ({', '.join(RULES)}), got {ignore!r}")
+    tables = section.get("tables", {})
+    if not isinstance(tables, dict):
+        raise ValueError(f'tables must be a table of "app_label.model" = rows, got {tables!r}')
+    database = section.get("database")
+    if database is not None and not isinstance(database, str):
+        raise ValueError(f"database must be a string, got {database!r}")
+    version = section.get("database-version")
+    return SafetyConfig(
+        frozenset(ignore),
+        {table.lower(): _count(f"tables.{table}", rows) for table, rows in tables.items()},
+        _count("min-rows", section.get("min-rows", DEFAULT_MIN_ROWS)),
+        database.lower() if database is not None else None,
+        _version(version) if version is not None else None,
+    )
+
+
+class MigrationSafetyChecker:
+    """Finds operations which rewrite or lock big tables, or break the code running during a deploy."""
+
+    def __init__(self, graph: MigrationGraph, parsed: dict[str, MigrationOperations | None], config: SafetyConfig):
+        self.graph = graph
+        self.parsed = parsed
+        self.config = config
+        self.paths = {os.path.abspath(node.path): key for key, node in graph.nodes.items()}
+        # Ancestors are looked up for every operation changing fields, they are walked once per migration
+        self._ancestors: dict[Key, set[Key]] = {}
+
+    def ancestors(self, key: Key) -> set[Key]:
+        """Migrations applied before the migration, without itself."""
+        if key not in self._ancestors:
+            self._ancestors[key] = self.graph.ancestors([key]) - {key}
+        return self._ancestors[key]
+
+    def _operations(self, key: Key) -> list[Operation]:
+        node = self.graph.nodes.get(key)
+        parsed = self.parsed.get(os.path.abspath(node.path)) if node else None
+        return parsed.operations if parsed else []
+
+    def _latest(self, keys: list[Key]) -> Key | None:
+        """Returns the migration applied last among the given ones."""
+        # One walk from the dependencies of all the migrations instead of a walk per migration
+        applied_before = self.graph.ancestors(
+            [dependency for key in keys for dependency in self.graph.dependencies(key)]
+        )
+        return next((key for key in sorted(keys) if key not in applied_before), None)
+
+    def previous_definition(self, key: Key, index: int, model: str, field: str) -> Operation | None:
+        """
+        Finds the definition of the field before the operation.
+
+        Args:
+            key: Migration of the operation
+            index: Index of the operation in the migration
+            model: Lower-case model name
+            field: Field name
+
+        Returns:
+            The last CreateModel, AddField or AlterField of the field, or None if it is not found
+        """
+
+        def defines(operation: Operation) -> bool:
+            return (
+                operation.name in FIELD_DEFINITIONS
+                and operation.scope != DATABASE
+                and operation.model == model
+                and operation.field == field
+            )
+
+        for operation in reversed(self._operations(key)[:index]):
+            if defines(operation):
+                return operation
+        candidates = [
+            ancestor
+            for ancestor in self.ancestors(key)
+            if ancestor[0] == key[0] and any(defines(operation) for operation in self._operations(ancestor))
+        ]
+        latest = self._latest(candidates)
+        if latest is None:
+            return None
+        return next(operation for operation in reversed(self._operations(latest)) if defines(operation))
+
+    def _removed_from_state(self, key: Key, model: str | None, field: str | None) -> bool:
+        """Checks that an earlier migration removed the field from the state only."""
+        for ancestor in self.ancestors(key):
+            for operation in self._operations(ancestor):
+                if (operation.name, operation.scope, operation.model, operation.field) == (
+                    "RemoveField",
+                    STATE,
+                    model,
+                    field,
+                ):
+                    return True
+        return False
+
+    def check_operation(self, key: Key, index: int, operation: Operation) -> tuple[str, str] | None:
+        """
+        Checks one operation.
+
+        Returns:
+            Rule and message, or None if the operation is safe
+        """
+        app = key[0]
+        if operation.scope == STATE:
+            # Changes only Django state, the database is not touched
+            return None
+        options = operation.field_options
+
+        if operation.name == "RunPython":
+            if not operation.elidable and not operation.batched:
+                return RUN_PYTHON, (
+                    "RunPython is neither elidable nor batched, process rows with .iterator() or batch_size "
+                    "and mark it elidable=True so squashing drops it"
+                )
+            return None
+
+        if not self.config.is_big_table(app, operation.model):
+            return None
+        table = f"{app}.{operation.model}"
+
+        if operation.name == "AddField":
+            if (
+                "default" in options
+                and options.get("null") is not True
+                and "db_default" not in options
+                and not self.config.has_instant_defaults()
+            ):
+                return ADD_FIELD_DEFAULT, (
+                    f"{table}.{operation.field} is added with a default, databases without instant defaults "
+                    "(PostgreSQL < 11, MySQL < 8.0.12, MariaDB < 10.3.2) rewrite the table, add it with "
+                    "null=True or db_default, or configure database-version"
+                )
+            indexed = options.get("db_index") is True or options.get("unique") is True
+            if indexed or (operation.field_class in INDEXED_FIELDS and options.get("db_index") is not False):
+                return ADD_INDEX, (
+                    f"{table}.{operation.field} is added with an index, it locks writes to the table, "
+                    "add the index with AddIndexConcurrently in a non-atomic migration"
+                )
+            return None
+
+        if operation.name == "AlterField" and operation.model and operation.field:
+            previous = self.previous_definition(key, index, operation.model, operation.field)
+            if previous is not None and previous.field_class != operation.field_class:
+                return ALTER_FIELD_TYPE, (
+                    f"{table}.{operation.field} type is changed from {previous.field_class} to "
+                    f"{operation.field_class}, the table is rewritten under an exclusive lock"
+                )
+            previous_options = previous.field_options if previous is not None else {}
+            for option in ("db_index", "unique"):
+                if options.get(option) is True and previous_options.get(option) is not True:
+                    return ADD_INDEX, (
+                        f"{table}.{operation.field} gets {option}=True, the index locks writes to the table, "
+                        "add it with AddIndexConcurrently in a non-atomic migration"
+                    )
+            return None
+
+        if operation.name == "AddIndex":
+            return ADD_INDEX, (
+                f"AddIndex on {table} locks writes to the table, use AddIndexConcurrently in a non-atomic migration"
+            )
+
+        if operation.name == "RemoveField":
+            if operation.scope == DATABASE and self._removed_from_state(key, operation.model, operation.field):
+                return None
+            return REMOVE_FIELD, (
+                f"{table}.{operation.field} column is dropped while the running code may still use it, "
+                "remove the field from the state with SeparateDatabaseAndState in an earlier deploy"
+            )
+        return None
+
+    def check_file(self, path: str) -> list[Finding]:
+        key = self.paths.get(os.path.abspath(path))
+        if key is None:
+            return []
+        findings = []
+        for index, operation in enumerate(self._operations(key)):
+            result = self.check_operation(key, index, operation)
+            if result is not None and result[0] not in self.config.ignore:
+                findings.append(Finding(path, operation.line, *result))
+        return findings
+
+
+def check_migration_safety(
+    filenames: Sequence[str] | None = None,
+    project_folder: str = ".",
+    jobs: int | None = None,
+    use_cache: bool = True,
+    config: SafetyConfig | None = None,
+) -> list[Finding]:
+    """
+    Finds expensive or locking operations in migrations.
+
+    Args:
+        filenames: Migration files to check, all migrations of the project by default
+        project_folder: Path to the project folder
+        jobs: Number of worker processes parsing migrations, CPU count by default
+        use_cache: Whether to use the parsed migrations cache of the graph
+        config: Loaded configuration, read from pyproject.toml by default
+
+    Returns:
+        Findings in the order of files and operations
+    """
+    graphs = build_migration_graphs(project_folder, jobs=jobs, use_cache=use_cache)
+    if filenames is None:
+        targets = sorted(node.path for graph in graphs for node in graph.nodes.values())
+    else:
+        targets = [filename for filename in filenames if MIGRATION_FILE_RE.match(filename.replace(os.sep, "/"))]
+    if not targets:
+        return []
+
+    # Previous definitions of fields are looked up in migrations of the same apps of the same project
+    target_paths = {os.path.abspath(path) for path in targets}
+    paths = set()
+    for graph in graphs:
+        apps = {key[0] for key, node in graph.nodes.items() if os.path.abspath(node.path) in target_paths}
+        paths.update(os.path.abspath(node.path) for key, node in graph.nodes.items() if key[0] in apps)
+    parsed = parse_operation_files(sorted(paths), jobs=jobs)
+
+    if config is None:
+        config = load_safety_config(project_folder)
+    checkers = [MigrationSafetyChecker(graph, parsed, config) for graph in graphs]
+    findings = []
+    with span("check migration safety", CHECK, files=len(targets)):
+        for path in targets:
+            for checker in checkers:
+                findings.extend(checker.check_file(path))
+    return findings
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for checking expensive and locking migrations."""
+    parser = argparse.ArgumentParser(
+        description="Check migrations for operations rewriting or locking big tables",
+        epilog=(
+            "add-field-default is reported unless database and database-version of "
+            "[tool.django-check.migration-safety] name a database adding columns with defaults instantly"
+        ),
+    )
+    parser.add_argument("filenames", nargs="*", help="Migration files to check (default is all migrations)")
+    parser.add_argument("--project-folder", default=".", help="Project folder path")
+    parser.add_argument("--jobs", type=int, help="Number of processes parsing migrations (default is CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the parsed migrations cache")
+    add_timings_argument(parser)
+    args = parser.parse_args(argv)
+
+    with record_timings(args.timings, "check-migration-safety"):
+        try:
+            config = load_safety_config(args.project_folder)
+        except ValueError as e:
+            print(f"Invalid [tool.django-check.{CONFIG_SECTION}] config: {e}")
+            return 1
+        findings = check_migration_safety(
+            args.filenames or None,
+            args.project_folder,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            config=config,
+        )
+        for finding in findings:
+            print(f"{finding.path}:{finding.line}: {finding.rule}: {finding.message}")
+        return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,335 @@
+import argparse
+import os
+import time
+from collections.abc import Sequence
+from typing import Any
+from typing import NamedTuple
+
+from .config import load_config
+from .migration_graph import MIGRATION_FILE_RE
+from .migration_graph import Key
+from .migration_graph import MigrationGraph
+from .migration_graph import build_migration_graphs
+from .migration_operations import MigrationOperations
+from .migration_operations import parse_operation_files
+from .timings import CHECK
+from .timings import IMPORT
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
+
+# Section of [tool.django-check] in pyproject.toml
+CONFIG_SECTION = "migration-squash"
+DEFAULT_MAX_MIGRATIONS = 50
+
+# Operations running code, squashing keeps them unless they are elidable
+RUN_OPERATIONS = {"RunPython", "RunSQL"}
+
+
+class AppStats(NamedTuple):
+    app: str
+    # Migration names in the order they are applied
+    migrations: list[str]
+    operations: int
+    run_operations: int
+    non_elidable: int
+    # Seconds to import migration modules and to render the project state, measured with Django
+    load_time: float | None = None
+    state_time: float | None = None
+
+    @property
+    def non_elidable_ratio(self) -> float:
+        """Share of operations squashing can neither drop nor optimize through."""
+        return self.non_elidable / self.operations if self.operations else 0.0
+
+
+class SquashConfig(NamedTuple):
+    # None disables the threshold
+    max_migrations: int | None
+    max_run_operations: int | None
+    max_non_elidable_ratio: float | None
+    max_state_seconds: float | None
+
+
+def load_squash_config(project_folder: str = ".") -> SquashConfig:
+    """
+    Loads thresholds from [tool.django-check.migration-squash] in pyproject.toml.
+
+    Args:
+        project_folder: Path to the project folder
+
+    Returns:
+        Thresholds, only the number of migrations is limited by default
+    """
+    config, _ = load_config(project_folder)
+    section: dict[str, Any] = config.get(CONFIG_SECTION, {})
+
+    def threshold(name: str, cast: type, default: Any = None) -> Any:
+        value = section.get(name, default)
+        return None if value is None else cast(value)
+
+    return SquashConfig(
+        threshold("max-migrations", int, DEFAULT_MAX_MIGRATIONS),
+        threshold("max-run-operations", int),
+        threshold("max-non-elidable-ratio", float),
+        threshold("max-state-seconds", float),
+    )
+
+
+def app_chain(graph: MigrationGraph, app: str) -> list[Key]:
+    """
+    Returns migrations of the app in the order they are applied.
+
+    Args:
+        graph: Migration graph
+        app: App label
+
+    Returns:
+        Migrations sorted topologically by dependencies in the app, then by name
+    """
+    nodes = sorted(key for key in graph.nodes if key[0] == app)
+    parents = {key: {dependency for dependency in graph.dependencies(key) if dependency[0] == app} for key in nodes}
+    chain: list[Key] = []
+    applied: set[Key] = set()
+    while len(chain) < len(nodes):
+        ready = [key for key in nodes if key not in applied and parents[key] <= applied]
+        if not ready:
+            # Circular dependencies, Django fails to load them, the rest is kept in name order
+            ready = [key for key in nodes if key not in applied]
+        chain.extend(ready)
+        applied.update(ready)
+    return chain
+
+
+def collect_app_stats(graph: MigrationGraph, parsed: dict[str, MigrationOperations | None]) -> list[AppStats]:
+    """
+    Counts migrations and operations of every app.
+
+    Args:
+        graph: Migration graph
+        parsed: Parsed operations by absolute file path
+
+    Returns:
+        Statistics in the order of app labels
+    """
+    stats = []
+    for app in graph.apps:
+        chain = app_chain(graph, app)
+        operations = set()
+        run_operations = set()
+        non_elidable = set()
+        for key in chain:
+            path = os.path.abspath(graph.nodes[key].path)
+            for operation in parsed[path].operations if parsed.get(path) else []:
+                # CreateModel is parsed into an operation per field, all of them share the line
+                location = (path, operation.name, operation.line)
+                operations.add(location)
+                if operation.name in RUN_OPERATIONS:
+                    run_operations.add(location)
+                    if not operation.elidable:
+                        non_elidable.add(location)
+        stats.append(
+            AppStats(app, [name for _, name in chain], len(operations), len(run_operations), len(non_elidable))
+        )
+    return stats
+
+
+def suggest_squash_ranges(graph: MigrationGraph, app: str) -> list[tuple[str, str]]:
+    """
+    Suggests ranges of migrations of the app to squash with squashmigrations.
+
+    Squashed migrations can not be squashed again, and a range ends before a migration depending on
+    another app which depends on the range, the squashed migration would depend on itself.
+
+    Args:
+        graph: Migration graph
+        app: App label
+
+    Returns:
+        Names of the first and the last migration of every range
+    """
+    ranges = []
+    current: list[Key] = []
+
+    def close() -> None:
+        if len(current) > 1:
+            ranges.append((current[0][1], current[-1][1]))
+        current.clear()
+
+    for key in app_chain(graph, app):
+        if graph.nodes[key].replaces:
+            close()
+            continue
+        foreign = [dependency for dependency in graph.dependencies(key) if dependency[0] != app]
+        if current and foreign and graph.ancestors(foreign) & set(current):
+            close()
+        current.append(key)
+    close()
+    return ranges
+
+
+def measure_migration_loading(apps: Sequence[str]) -> tuple[float, dict[str, tuple[float, float]]]:
+    """
+    Measures how long Django loads migrations and renders project states.
+
+    Django must be set up before calling this function.
+
+    Args:
+        apps: App labels to measure
+
+    Returns:
+        Seconds to build the MigrationLoader graph, and seconds to import migration modules and
+        to render the project state at the latest migrations (with dependencies) by app
+    """
+    import pkgutil
+    from importlib import import_module
+
+    from django.apps import apps as app_registry
+    from django.db.migrations.loader import MigrationLoader
+
+    load_times = {}
+    for app_config in app_registry.get_app_configs():
+        if app_config.label not in apps:
+            continue
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        started = time.perf_counter()
+        with span("import migrations", IMPORT, app=app_config.label):
+            try:
+                module = import_module(module_name)
+                for module_info in pkgutil.iter_modules(getattr(module, "__path__", [])):
+                    import_module(f"{module_name}.{module_info.name}")
+            except ImportError:
+                pass
+        load_times[app_config.label] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with span("build migration graph", IMPORT):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+    graph_time = time.perf_counter() - started
+
+    times = {}
+    for app, load_time in load_times.items():
+        started = time.perf_counter()
+        with span("render project state", CHECK, app=app):
+            state = loader.graph.make_state(
+                nodes=loader.graph.leaf_nodes(app), at_end=True, real_apps=loader.unmigrated_apps
+            )
+            # Accessing apps renders models of the state, it is what migrate spends time on
+            _ = state.apps
+        times[app] = (load_time, time.perf_counter() - started)
+    return graph_time, times
+
+
+def find_violations(stats: AppStats, config: SquashConfig) -> list[str]:
+    """Returns messages for every threshold the app exceeds."""
+    violations = []
+    if config.max_migrations is not None and len(stats.migrations) > config.max_migrations:
+        violations.append(f"{len(stats.migrations)} migrations exceed max-migrations {config.max_migrations}")
+    if config.max_run_operations is not None and stats.run_operations > config.max_run_operations:
+        violations.append(
+            f"{stats.run_operations} RunPython/RunSQL operations exceed max-run-operations {config.max_run_operations}"
+        )
+    if config.max_non_elidable_ratio is not None and stats.non_elidable_ratio > config.max_non_elidable_ratio:
+        violations.append(
+            f"non-elidable ratio {stats.non_elidable_ratio:.2f} exceeds "
+            f"max-non-elidable-ratio {config.max_non_elidable_ratio}"
+        )
+    if config.max_state_seconds is not None and stats.state_time is not None:
+        if stats.state_time > config.max_state_seconds:
+            violations.append(
+                f"project state renders in {stats.state_time:.2f}s, over max-state-seconds {config.max_state_seconds}"
+            )
+    return violations
+
+
+def print_stats(stats: list[AppStats]) -> None:
+    """Prints the table of app statistics, with times if they were measured."""
+    measured = any(app_stats.load_time is not None for app_stats in stats)
+    app_width = max(len("app"), *(len(app_stats.app) for app_stats in stats))
+    header = f"{'app':<{app_width}}  {'migrations':>10}  {'run ops':>7}  {'non-elidable':>12}"
+    print(f"{header}  {'load':>7}  {'state':>7}" if measured else header)
+    for app_stats in stats:
+        row = (
+            f"{app_stats.app:<{app_width}}  {len(app_stats.migrations):>10}  {app_stats.run_operations:>7}  "
+            f"{app_stats.non_elidable_ratio:>12.0%}"
+        )
+        if measured and app_stats.load_time is not None and app_stats.state_time is not None:
+            row = f"{row}  {app_stats.load_time:>6.2f}s  {app_stats.state_time:>6.2f}s"
+        print(row)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for checking migration chains which should be squashed."""
+    parser = argparse.ArgumentParser(description="Report migration chains of apps and suggest squash ranges")
+    parser.add_argument(
+        "filenames",
+        nargs="*",
+        help="Changed files, the check is skipped if none of them is a migration (if not specified, always check)",
+    )
+    parser.add_argument("--project-folder", default=".", help="Project folder path")
+    parser.add_argument("--jobs", type=int, help="Number of processes parsing migrations (default is CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the parsed migrations cache")
+    parser.add_argument(
+        "--measure",
+        action="store_true",
+        help="Set Django up and measure migration loading and project state rendering of every app",
+    )
+    add_timings_argument(parser)
+    args = parser.parse_args(argv)
+
+    with record_timings(args.timings, "check-migration-squash"):
+        migration_files = [f for f in args.filenames if MIGRATION_FILE_RE.match(f.replace(os.sep, "/"))]
+        if args.filenames and not migration_files:
+            print("No migration files changed")
+            return 0
+
+        use_cache = not args.no_cache
+        graphs = build_migration_graphs(args.project_folder, jobs=args.jobs, use_cache=use_cache)
+        paths = sorted({os.path.abspath(node.path) for graph in graphs for node in graph.nodes.values()})
+        parsed = parse_operation_files(paths, jobs=args.jobs)
+        stats_by_graph = [(graph, collect_app_stats(graph, parsed)) for graph in graphs]
+        stats_by_graph = [(graph, stats) for graph, stats in stats_by_graph if stats]
+        if not stats_by_graph:
+            print("No migrations found")
+            return 0
+
+        if args.measure:
+            if len(stats_by_graph) > 1:
+                print("Django projects are measured one at a time, pass the folder of one with --project-folder")
+                return 1
+            # Imported here, Django is set up only to measure
+            from .utils_django import setup_django
+
+            if setup_django(args.project_folder, use_cache=use_cache) is None:
+                return 1
+            stats = stats_by_graph[0][1]
+            graph_time, times = measure_migration_loading([app_stats.app for app_stats in stats])
+            for index, app_stats in enumerate(stats):
+                if app_stats.app in times:
+                    load_time, state_time = times[app_stats.app]
+                    stats[index] = app_stats._replace(load_time=load_time, state_time=state_time)
+            print(f"MigrationLoader graph built in {graph_time:.2f}s")
+
+        config = load_squash_config(args.project_folder)
+        failed = False
+        for graph, stats in stats_by_graph:
+            if len(stats_by_graph) > 1:
+                # Same app labels may be used by several projects of a monorepo
+                print(f"{os.path.relpath(graph.root, args.project_folder)}:")
+            print_stats(stats)
+            for app_stats in stats:
+                violations = find_violations(app_stats, config)
+                if not violations:
+                    continue
+                failed = True
+                print(f"\nERROR {app_stats.app}: {', '.join(violations)}")
+                ranges = suggest_squash_ranges(graph, app_stats.app)
+                for start, end in ranges:
+                    print(f"Squash: python manage.py squashmigrations {app_stats.app} {start} {end}")
+                if not ranges:
+                    print("No range can be squashed, transition squashed migrations to normal ones first")
+        return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+from collections.abc import Sequence
+from typing import Any
+
+from .migration_graph import MigrationGraph
+from .migration_graph import build_migration_graphs
+from .timings import add_timings_argument
+from .timings import record_timings
+
+LOCKFILE = "migrations.lock"
+LOCKFILE_VERSION = 1
+
+
+def read_lockfile(lockfile: str) -> dict[str, Any] | None:
+    try:
+        with open(lockfile, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_lockfile(lockfile: str, data: dict[str, Any]) -> None:
+    with open(lockfile, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def get_leaves(graph: MigrationGraph) -> dict[str, list[str]]:
+    return {app: [name for _, name in graph.leaf_nodes(app)] for app in graph.apps}
+
+
+def get_applied_leaves(graph: MigrationGraph, database: str) -> dict[str, list[str]]:
+    """
+    Reads applied migrations from the django_migrations table of a SQLite database.
+
+    Args:
+        graph: Migration graph
+        database: Path to the SQLite database file
+
+    Returns:
+        Leaves of applied migrations per app
+    """
+    import sqlite3
+
+    with sqlite3.connect(f"file:{database}?mode=ro", uri=True) as connection:
+        rows = connection.execute("SELECT app, name FROM django_migrations").fetchall()
+
+    applied = {(app, name) for app, name in rows if (app, name) in graph.nodes}
+    parents = {dependency for key in applied for dependency in graph.dependencies(key) if dependency[0] == key[0]}
+    leaves: dict[str, list[str]] = {}
+    for app, name in sorted(applied - parents):
+        leaves.setdefault(app, []).append(name)
+    return leaves
+
+
+def find_unapplied(graph: MigrationGraph, environment: dict[str, list[str]]) -> list[str]:
+    """
+    Finds migrations which are not applied to the recorded environment.
+
+    Args:
+        graph: Migration graph
+        environment: Applied leaves per app
+
+    Returns:
+        Problem descriptions
+    """
+    problems = []
+    recorded = [(app, name) for app, names in environment.items() for name in names]
+    for key in recorded:
+        if key not in graph.nodes:
+            problems.append(f"{key[0]} {key[1]} (recorded as applied but missing)")
+
+    applied = graph.ancestors(recorded)
+    for app, name in sorted(set(graph.nodes) - applied):
+        problems.append(f"{app} {name} (unapplied)")
+    return problems
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for checking migrations against the lockfile."""
+    parser = argparse.ArgumentParser(description="Check migration graph against the committed lockfile")
+    parser.add_argument("--project-folder", default=".", help="Project folder path")
+    parser.add_argument(
+        "--lockfile",
+        default=LOCKFILE,
+        help=f"Lockfile path, relative paths are resolved against the project folder (default is {LOCKFILE})",
+    )
+    parser.add_argument("--update", action="store_true", help="Write current migration graph to the lockfile")
+    parser.add_argument(
+        "--record-environment",
+        metavar="NAME",
+        help="Record migrations applied to the environment (all current migrations or those from --database)",
+    )
+    parser.add_argument("--database", help="SQLite database to read applied migrations from")
+    parser.add_argument(
+        "--environment",
+        action="append",
+        default=[],
+        help="Fail if migrations are not applied to the recorded environment",
+    )
+    add_timings_argument(parser)
+    args = parser.parse_args(argv)
+
+    with record_timings(args.timings, "check-migrations-lock"):
+        graphs = build_migration_graphs(args.project_folder)
+        if len(graphs) > 1:
+            # Same app labels may be used by several projects of a monorepo, each one has its lockfile
+            projects = ", ".join(os.path.relpath(graph.root, args.project_folder) for graph in graphs)
+            print(f"Several Django projects found ({projects}), lock each one with --project-folder")
+            return 1
+        graph = graphs[0] if graphs else MigrationGraph([], args.project_folder)
+        leaves = get_leaves(graph)
+        # Absolute paths are kept by join
+        lockfile = os.path.join(args.project_folder, args.lockfile)
+        lock = read_lockfile(lockfile)
+
+        found = False
+        for app, names in leaves.items():
+            if len(names) > 1:
+                found = True
+                print(f"Conflicting migrations found: {app} {', '.join(names)} (multiple leaf nodes)")
+
+        if args.update or args.record_environment:
+            if found:
+                return 1
+            lock = lock or {}
+            lock.update(version=LOCKFILE_VERSION, fingerprint=graph.fingerprint(), apps=leaves)
+            lock.setdefault("environments", {})
+            if args.record_environment:
+                applied = get_applied_leaves(graph, args.database) if args.database else leaves
+                lock["environments"][args.record_environment] = applied
+            write_lockfile(lockfile, lock)
+            print(f"Updated {os.path.relpath(lockfile)}")
+            return 0
+
+        if lock is None:
+            print(f"Lockfile {os.path.relpath(lockfile)} not found, create it with --update")
+            return 1
+
+        if lock.get("fingerprint") != graph.fingerprint():
+            found = True
+            for app in sorted(set(leaves) | set(lock.get("apps", {}))):
+                if leaves.get(app) != lock.get("apps", {}).get(app):
+                    print(f"Lockfile is out of date: {app} {leaves.get(app)} != {lock.get('apps', {}).get(app)}")
+            print("Migration graph differs from the lockfile, update it with --update")
+
+        for environment in args.environment:
+            recorded = lock.get("environments", {}).get(environment)
+            if recorded is None:
+                found = True
+                print(f"Environment {environment} is not recorded in the lockfile")
+                continue
+            for problem in find_unapplied(graph, recorded):
+                found = True
+                print(f"Unapplied migration in {environment}: {problem}")
+
+        if found:
+            return 1
+        return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,414 @@
+import argparse
+import ast
+import math
+import os
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import NamedTuple
+
+from .config import load_config
+from .relevance import SETTINGS
+from .relevance import has_relevant_changes
+from .timings import CHECK
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
+
+if TYPE_CHECKING:
+    from .static_settings import Namespace
+    from .static_settings import StaticSettingsEvaluator
+
+# Section of [tool.django-check] in pyproject.toml
+CONFIG_SECTION = "observability"
+DEFAULT_ENVIRONMENT = "production"
+
+# Budgets of every environment: numbers are maximums, booleans tell whether the option may be enabled
+DEFAULT_BUDGET: dict[str, Any] = {
+    "traces_sample_rate": 0.2,
+    "profiles_sample_rate": 0.1,
+    "profile_session_sample_rate": 0.1,
+    "max_breadcrumbs": 100,
+    "record_sql_params": False,
+    "worker_prefetch_multiplier": 4,
+    "task_acks_late": True,
+    "result_backend": True,
+    "task_always_eager": False,
+}
+
+SENTRY_INIT_NAMES = {"sentry_sdk.init", "sentry_sdk.client.init"}
+# Modules next to settings which usually configure Sentry and Celery
+ENTRY_MODULES = ("wsgi", "asgi", "celery")
+DEFAULT_CELERY_NAMESPACE = "CELERY"
+
+# Celery option -> (default, setting names of Celery < 4)
+CELERY_OPTIONS: dict[str, tuple[Any, tuple[str, ...]]] = {
+    "worker_prefetch_multiplier": (4, ("CELERYD_PREFETCH_MULTIPLIER",)),
+    "task_acks_late": (False, ("CELERY_ACKS_LATE",)),
+    "result_backend": (None, ("CELERY_RESULT_BACKEND",)),
+    "task_always_eager": (False, ("CELERY_ALWAYS_EAGER",)),
+}
+
+
+class Finding(NamedTuple):
+    path: str
+    # 0 if the option is not set in the project
+    line: int
+    option: str
+    message: str
+    # The value can not be evaluated statically, such findings do not fail the hook
+    undecidable: bool = False
+
+
+class SentryInit(NamedTuple):
+    """sentry_sdk.init call with statically evaluated options."""
+
+    path: str
+    line: int
+    # Option -> value, UNDECIDABLE for values which can not be evaluated statically
+    options: dict[str, Any]
+    # Integration class name -> its options
+    integrations: dict[str, dict[str, Any]]
+
+
+class CeleryConfig(NamedTuple):
+    # Option -> (value, path, line), the location is empty for defaults
+    options: dict[str, tuple[Any, str, int]]
+
+
+def load_budgets(project_folder: str = ".") -> tuple[str, dict[str, dict[str, Any]]]:
+    """
+    Loads [tool.django-check.observability] from pyproject.toml.
+
+    Args:
+        project_folder: Path to the project folder
+
+    Returns:
+        Default environment and budgets by environment, without the built-in defaults
+    """
+    config, _ = load_config(project_folder)
+    section: dict[str, Any] = config.get(CONFIG_SECTION, {})
+    return str(section.get("environment", DEFAULT_ENVIRONMENT)), dict(section.get("budgets", {}))
+
+
+def get_budget(environment: str, budgets: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """Returns the budget of the environment, configured options override the defaults."""
+    return {**DEFAULT_BUDGET, **budgets.get(environment, {})}
+
+
+def _dotted_name(node: ast.expr) -> str | None:
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return f"{value}.{node.attr}" if value else None
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _parse(file_path: str) -> ast.Module | None:
+    from .utils_django import ast_parse
+    from .utils_django import read_file
+
+    content = read_file(file_path)
+    if content is None:
+        return None
+    try:
+        return ast_parse(content)
+    except SyntaxError:
+        return None
+
+
+def _is_sentry_init(call: ast.Call, evaluator: "StaticSettingsEvaluator", namespace: "Namespace") -> bool:
+    from .static_settings import Ref
+
+    func = evaluator.fold(call.func, namespace)
+    if isinstance(func, Ref):
+        return func.name in SENTRY_INIT_NAMES
+    # sentry_sdk may be imported in a block which was not evaluated, e.g. "if SENTRY_DSN:"
+    return _dotted_name(call.func) in SENTRY_INIT_NAMES
+
+
+def _call_options(call: ast.Call, evaluator: "StaticSettingsEvaluator", namespace: "Namespace") -> dict[str, Any]:
+    return {keyword.arg: evaluator.fold(keyword.value, namespace) for keyword in call.keywords if keyword.arg}
+
+
+def find_sentry_inits(evaluator: "StaticSettingsEvaluator", default: "Namespace") -> list[SentryInit]:
+    """
+    Finds sentry_sdk.init calls in files evaluated by the evaluator, also in blocks it did not execute.
+
+    Args:
+        evaluator: Evaluator which evaluated settings and entry modules
+        default: Namespace to evaluate options of files which are not modules, e.g. included settings
+
+    Returns:
+        Calls in the order of files and lines
+    """
+    from .static_settings import UNDECIDABLE
+
+    inits = []
+    for file_path in dict.fromkeys(evaluator.visited_files):
+        tree = _parse(file_path)
+        if tree is None:
+            continue
+        namespace = evaluator.modules.get(file_path, default)
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call) or not _is_sentry_init(node, evaluator, namespace):
+                continue
+            options = _call_options(node, evaluator, namespace)
+            integrations: dict[str, dict[str, Any]] = {}
+            integrations_node = next((kw.value for kw in node.keywords if kw.arg == "integrations"), None)
+            if isinstance(integrations_node, (ast.List, ast.Tuple)):
+                for item in integrations_node.elts:
+                    name = _dotted_name(item.func) if isinstance(item, ast.Call) else None
+                    if isinstance(item, ast.Call) and name:
+                        integrations[name.rpartition(".")[2]] = _call_options(item, evaluator, namespace)
+                    else:
+                        integrations["<expr>"] = {}
+            elif integrations_node is not None:
+                integrations["<expr>"] = {}
+            options.pop("integrations", None)
+            if any(keyword.arg is None for keyword in node.keywords):
+                # init(**options), any option may be set
+                options["traces_sample_rate"] = options.get("traces_sample_rate", UNDECIDABLE)
+            inits.append(SentryInit(file_path, node.lineno, options, integrations))
+    return sorted(inits, key=lambda init: (init.path, init.line))
+
+
+def _celery_namespace(tree: ast.Module) -> str | None:
+    """Returns the prefix of Celery settings passed to config_from_object, None for settings without a prefix."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            if node.func.attr == "config_from_object":
+                for keyword in node.keywords:
+                    if keyword.arg == "namespace" and isinstance(keyword.value, ast.Constant):
+                        return keyword.value.value
+                return None
+    return DEFAULT_CELERY_NAMESPACE
+
+
+def _assignment_locations(files: Sequence[str]) -> dict[str, tuple[str, int]]:
+    """Returns locations of the last top-level assignments of names, every file is parsed once."""
+    trees = {file_path: _parse(file_path) for file_path in dict.fromkeys(files)}
+    locations = {}
+    for file_path in files:
+        tree = trees[file_path]
+        for node in tree.body if tree else []:
+            targets = node.targets if isinstance(node, ast.Assign) else [getattr(node, "target", None)]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    locations[target.id] = (file_path, node.lineno)
+    return locations
+
+
+def find_celery_config(
+    evaluator: "StaticSettingsEvaluator",
+    settings: "Namespace",
+    settings_files: Sequence[str],
+    celery_file: str | None = None,
+) -> CeleryConfig:
+    """
+    Collects Celery options from Django settings and from app.conf of the Celery module.
+
+    Args:
+        evaluator: Evaluator which evaluated the settings
+        settings: Namespace of the settings module
+        settings_files: Files of the settings, to find locations of options
+        celery_file: Path to the module creating the Celery app, if it is in the project
+
+    Returns:
+        Options with their values and locations
+    """
+    tree = _parse(celery_file) if celery_file else None
+    namespace = _celery_namespace(tree) if tree is not None else DEFAULT_CELERY_NAMESPACE
+
+    locations = _assignment_locations(settings_files)
+    options: dict[str, tuple[Any, str, int]] = {}
+    for option, (default, old_names) in CELERY_OPTIONS.items():
+        options[option] = (default, "", 0)
+        setting = f"{namespace}_{option.upper()}" if namespace else option.upper()
+        for name in (*old_names, setting):
+            if name in settings or settings.tainted:
+                options[option] = (settings.lookup(name), *locations.get(name, ("", 0)))
+
+    if tree is not None and celery_file:
+        # app.conf.update(task_always_eager=True) and app.conf.task_always_eager = True override settings
+        celery_namespace = evaluator.modules.get(celery_file, settings)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and (_dotted_name(node.func) or "").endswith(".conf.update"):
+                for option, value in _call_options(node, evaluator, celery_namespace).items():
+                    if option in CELERY_OPTIONS:
+                        options[option] = (value, celery_file, node.lineno)
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    name = _dotted_name(target) or ""
+                    if ".conf." in name and name.rpartition(".")[2] in CELERY_OPTIONS:
+                        value = evaluator.fold(node.value, celery_namespace)
+                        options[name.rpartition(".")[2]] = (value, celery_file, node.lineno)
+    return CeleryConfig(options)
+
+
+def check_option(option: str, value: Any, budget: dict[str, Any], environment: str) -> str | None:
+    """
+    Checks the decidable option value against the budget of the environment.
+
+    Returns:
+        Message or None if the value is within the budget
+    """
+    if option not in budget or value is None:
+        return None
+    limit = budget[option]
+    if isinstance(limit, bool):
+        if value and not limit:
+            return f"{option} = {value!r} is not allowed by the {environment} budget"
+        return None
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    # 0 disables the prefetch limit, workers reserve all messages
+    unlimited = option == "worker_prefetch_multiplier" and value == 0
+    if (math.inf if unlimited else value) > limit:
+        return f"{option} = {value}{' (unlimited)' if unlimited else ''} exceeds the {environment} budget {limit}"
+    return None
+
+
+def _check(
+    location: tuple[str, int],
+    option: str,
+    value: Any,
+    budget: dict[str, Any],
+    environment: str,
+    prefix: str = "",
+) -> Finding | None:
+    from .static_settings import is_decidable
+
+    if option not in budget:
+        return None
+    if not is_decidable(value):
+        return Finding(*location, option, f"{prefix}{option} can not be evaluated statically", undecidable=True)
+    message = check_option(option, value, budget, environment)
+    return Finding(*location, option, f"{prefix}{message}") if message else None
+
+
+def check_sentry_init(init: SentryInit, budget: dict[str, Any], environment: str) -> list[Finding]:
+    """Checks options of the sentry_sdk.init call and of its integrations."""
+    options = dict(init.options)
+    if (
+        options.get("enable_tracing") is True
+        and "traces_sample_rate" not in options
+        and "traces_sampler" not in options
+    ):
+        # Sentry samples every transaction if tracing is enabled without a rate
+        options["traces_sample_rate"] = 1.0
+    if "traces_sampler" in options:
+        # Rates are decided by the sampler function at runtime
+        options.pop("traces_sample_rate", None)
+    experiments = options.get("_experiments")
+    if isinstance(experiments, dict):
+        options.update((name, value) for name, value in experiments.items() if name not in options)
+
+    location = (init.path, init.line)
+    findings = [_check(location, option, value, budget, environment) for option, value in options.items()]
+    for integration, integration_options in init.integrations.items():
+        findings.extend(
+            _check(location, option, value, budget, environment, prefix=f"{integration}: ")
+            for option, value in integration_options.items()
+        )
+    return [finding for finding in findings if finding is not None]
+
+
+def _environment(value: Any, default: str) -> str:
+    return value if isinstance(value, str) and value else default
+
+
+def check_observability_overhead(
+    project_folder: str = ".",
+    environment: str | None = None,
+    use_cache: bool = True,
+    settings_module: str | None = None,
+) -> list[Finding] | None:
+    """
+    Checks Sentry and Celery options against per-environment budgets, without importing sentry_sdk or celery.
+
+    Args:
+        project_folder: Path to the project folder
+        environment: Environment whose budget is used, the environment option of sentry_sdk.init
+            or the configured one by default
+        use_cache: Whether to use the settings discovery cache
+        settings_module: Settings module to check instead of the found one
+
+    Returns:
+        Findings, or None if the settings are not found
+    """
+    # Imported here, settings are evaluated only when the check runs
+    from .static_settings import StaticSettingsEvaluator
+    from .utils_django import find_settings_module
+
+    settings_module = settings_module or find_settings_module(project_folder, use_cache=use_cache)
+    if not settings_module:
+        return None
+    evaluator = StaticSettingsEvaluator(project_folder)
+    settings = evaluator.evaluate_module(settings_module)
+    if settings is None:
+        return None
+    settings_files = list(evaluator.visited_files)
+
+    package = settings_module.split(".")[0]
+    for module in ENTRY_MODULES:
+        evaluator.evaluate_module(f"{package}.{module}")
+    celery_module = evaluator.resolve_module(f"{package}.celery")
+
+    default_environment, budgets = load_budgets(project_folder)
+    findings = []
+    with span("check observability overhead", CHECK):
+        inits = find_sentry_inits(evaluator, settings)
+        for init in inits:
+            init_environment = environment or _environment(init.options.get("environment"), default_environment)
+            findings.extend(check_sentry_init(init, get_budget(init_environment, budgets), init_environment))
+
+        if environment is None and inits:
+            environment = _environment(inits[0].options.get("environment"), default_environment)
+        environment = environment or default_environment
+        budget = get_budget(environment, budgets)
+        celery = find_celery_config(evaluator, settings, settings_files, celery_module[0] if celery_module else None)
+        for option, (value, path, line) in celery.options.items():
+            finding = _check((path or settings_files[0], line), option, value, budget, environment)
+            if finding is not None:
+                findings.append(finding)
+    return findings
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for checking overhead of Sentry and Celery options."""
+    parser = argparse.ArgumentParser(description="Check Sentry sample rates and Celery options against budgets")
+    parser.add_argument(
+        "filenames",
+        nargs="*",
+        help="Changed files, the check is skipped if none of them affects settings (if not specified, always check)",
+    )
+    parser.add_argument("--project-folder", default=".", help="Project folder path")
+    parser.add_argument("--environment", help="Environment whose budget is used (default is detected)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the settings discovery cache")
+    parser.add_argument("--settings-module", help="Settings module to check (if not specified, search automatically)")
+    add_timings_argument(parser)
+    args = parser.parse_args(argv)
+
+    with record_timings(args.timings, "check-observability-overhead"):
+        use_cache = not args.no_cache
+        if args.filenames and not has_relevant_changes(args.filenames, args.project_folder, SETTINGS, use_cache):
+            print("No settings files changed")
+            return 0
+
+        findings = check_observability_overhead(args.project_folder, args.environment, use_cache, args.settings_module)
+        if findings is None:
+            print("ERROR: Django settings are not found")
+            return 1
+        for finding in findings:
+            location = os.path.relpath(finding.path, args.project_folder)
+            if finding.line:
+                location = f"{location}:{finding.line}"
+            level = "WARNING" if finding.undecidable else "ERROR"
+            print(f"{location}: {level} {finding.option}: {finding.message}")
+        return 1 if any(not finding.undecidable for finding in findings) else 0
+
+
+if __name__ == "__main__":
+    exit(main())
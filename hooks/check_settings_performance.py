@@ -0,0 +1,354 @@
+import argparse
+from collections.abc import Callable
+from collections.abc import Mapping
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import NamedTuple
+
+from .config import load_config
+from .modes import AUTO
+from .modes import IMPORT
+from .modes import MODES
+from .modes import STATIC
+from .relevance import SETTINGS
+from .relevance import has_relevant_changes
+from .timings import CHECK
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
+
+if TYPE_CHECKING:
+    from django.conf import Settings
+
+# Section of [tool.django-check] in pyproject.toml
+CONFIG_SECTION = "settings-performance"
+
+ERROR = "error"
+WARNING = "warning"
+OFF = "off"
+SEVERITIES = (ERROR, WARNING, OFF)
+
+CACHED_LOADER = "django.template.loaders.cached.Loader"
+DJANGO_TEMPLATES = "django.template.backends.django.DjangoTemplates"
+DB_SESSION_ENGINE = "django.contrib.sessions.backends.db"
+LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache": "is not shared between processes",
+    "django.core.cache.backends.dummy.DummyCache": "caches nothing",
+}
+# Apps and middleware which slow down every request, they are meant for development
+DEBUG_PACKAGES = ("debug_toolbar", "silk")
+
+# Django defaults of the audited settings, for statically evaluated settings
+DEFAULTS: dict[str, Any] = {
+    "DATABASES": {},
+    "TEMPLATES": [],
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    "SESSION_ENGINE": DB_SESSION_ENGINE,
+    "DATA_UPLOAD_MAX_MEMORY_SIZE": 2621440,
+    "USE_TZ": True,
+    "TIME_ZONE": "America/Chicago",
+    "INSTALLED_APPS": [],
+    "MIDDLEWARE": [],
+}
+
+# Returns the value of the setting, UNDECIDABLE if it can not be evaluated statically
+Lookup = Callable[[str], Any]
+
+
+class Undecidable(Exception):
+    """A setting needed by the rule can not be evaluated statically."""
+
+
+class Skipped(Exception):
+    """A setting needed by the rule has an unexpected shape, Django reports it itself."""
+
+
+class Finding(NamedTuple):
+    severity: str
+    rule: str
+    message: str
+
+
+def _known(value: Any) -> Any:
+    """Returns the value, raises Undecidable if it can not be evaluated statically, its items may still be."""
+    from .static_settings import UNDECIDABLE
+
+    if value is UNDECIDABLE:
+        raise Undecidable
+    return value
+
+
+def _decidable(value: Any) -> Any:
+    """Returns the value, raises Undecidable if any part of it can not be evaluated statically."""
+    from .static_settings import is_decidable
+
+    if not is_decidable(value):
+        raise Undecidable
+    return value
+
+
+def _mapping(value: Any, name: str) -> Mapping[str, Any]:
+    if not isinstance(value, Mapping):
+        raise Skipped(f"{name} is not a dict")
+    return value
+
+
+def _list(value: Any, name: str) -> Sequence[Any]:
+    if not isinstance(value, (list, tuple)):
+        raise Skipped(f"{name} is not a list")
+    return value
+
+
+def _server_databases(get: Lookup) -> list[tuple[str, Mapping[str, Any]]]:
+    """Returns databases with a server, opening SQLite connections is cheap."""
+    databases = []
+    for alias, database in _mapping(_known(get("DATABASES")), "DATABASES").items():
+        database = _mapping(_known(database), f"DATABASES['{alias}']")
+        engine = _decidable(database.get("ENGINE", ""))
+        if not isinstance(engine, str):
+            raise Skipped(f"DATABASES['{alias}'] ENGINE is not a string")
+        if "sqlite3" not in engine:
+            databases.append((alias, database))
+    return databases
+
+
+def check_conn_max_age(get: Lookup) -> list[str]:
+    messages = []
+    for alias, database in _server_databases(get):
+        if _decidable(database.get("CONN_MAX_AGE", 0)) == 0:
+            messages.append(f"DATABASES['{alias}'] CONN_MAX_AGE is 0, every request opens a new database connection")
+    return messages
+
+
+def check_conn_health_checks(get: Lookup) -> list[str]:
+    messages = []
+    for alias, database in _server_databases(get):
+        persistent = _decidable(database.get("CONN_MAX_AGE", 0)) != 0
+        if persistent and not _decidable(database.get("CONN_HEALTH_CHECKS", False)):
+            messages.append(
+                f"DATABASES['{alias}'] keeps persistent connections without CONN_HEALTH_CHECKS, "
+                "requests fail on connections closed by the database"
+            )
+    return messages
+
+
+def check_template_loaders(get: Lookup) -> list[str]:
+    messages = []
+    for index, template in enumerate(_list(_known(get("TEMPLATES")), "TEMPLATES")):
+        template = _mapping(_known(template), f"TEMPLATES[{index}]")
+        if _decidable(template.get("BACKEND")) != DJANGO_TEMPLATES:
+            continue
+        options = _mapping(_known(template.get("OPTIONS", {})), f"TEMPLATES[{index}] OPTIONS")
+        loaders = _decidable(options.get("loaders"))
+        if loaders is None:
+            # Django wraps default loaders with the cached loader
+            continue
+        loaders = _list(loaders, f"TEMPLATES[{index}] loaders")
+        names = [loader[0] if isinstance(loader, (list, tuple)) and loader else loader for loader in loaders]
+        if CACHED_LOADER not in names:
+            messages.append(f"TEMPLATES[{index}] loaders are not cached, templates are compiled on every render")
+    return messages
+
+
+def check_local_cache(get: Lookup) -> list[str]:
+    messages = []
+    for alias, cache in _mapping(_known(get("CACHES")), "CACHES").items():
+        backend = _decidable(_mapping(_known(cache), f"CACHES['{alias}']").get("BACKEND"))
+        if backend in LOCAL_CACHES:
+            messages.append(f"CACHES['{alias}'] uses {backend.rpartition('.')[2]}, it {LOCAL_CACHES[backend]}")
+    return messages
+
+
+def check_db_sessions(get: Lookup) -> list[str]:
+    if "django.contrib.sessions" not in _list(_decidable(get("INSTALLED_APPS")), "INSTALLED_APPS"):
+        return []
+    if _decidable(get("SESSION_ENGINE")) != DB_SESSION_ENGINE:
+        return []
+    return ["sessions are read from the database on every request, use the cached_db or cache SESSION_ENGINE"]
+
+
+def check_upload_size(get: Lookup) -> list[str]:
+    if _decidable(get("DATA_UPLOAD_MAX_MEMORY_SIZE")) is None:
+        return ["DATA_UPLOAD_MAX_MEMORY_SIZE is None, request bodies of any size are read into memory"]
+    return []
+
+
+def check_use_tz(get: Lookup) -> list[str]:
+    if _decidable(get("USE_TZ")) and _decidable(get("TIME_ZONE")) != "UTC":
+        return [
+            f"USE_TZ is enabled with TIME_ZONE = {get('TIME_ZONE')!r}, aware datetimes are converted to the local "
+            "time zone for every rendered value, use UTC"
+        ]
+    return []
+
+
+def check_debug_apps(get: Lookup) -> list[str]:
+    messages = []
+    for setting in ("INSTALLED_APPS", "MIDDLEWARE"):
+        for name in _list(_decidable(get(setting)), setting):
+            if isinstance(name, str) and name.split(".")[0] in DEBUG_PACKAGES:
+                messages.append(f"{setting} contains {name}, it slows down every request")
+    return messages
+
+
+# Rule name -> (default severity, check)
+RULES: dict[str, tuple[str, Callable[[Lookup], list[str]]]] = {
+    "conn-max-age": (WARNING, check_conn_max_age),
+    "conn-health-checks": (WARNING, check_conn_health_checks),
+    "template-loaders": (WARNING, check_template_loaders),
+    "local-cache": (ERROR, check_local_cache),
+    "db-sessions": (WARNING, check_db_sessions),
+    "upload-size": (ERROR, check_upload_size),
+    "use-tz": (WARNING, check_use_tz),
+    "debug-apps": (ERROR, check_debug_apps),
+}
+
+
+def load_severities(project_folder: str = ".") -> dict[str, str]:
+    """
+    Loads severities of rules, defaults are overridden by [tool.django-check.settings-performance].
+
+    Args:
+        project_folder: Path to the project folder
+
+    Returns:
+        Severity of every rule
+    """
+    config, _ = load_config(project_folder)
+    configured = config.get(CONFIG_SECTION, {}).get("severity", {})
+    severities = {name: severity for name, (severity, _) in RULES.items()}
+    for name, severity in configured.items():
+        if name not in RULES or severity not in SEVERITIES:
+            print(f"Unknown rule or severity in [tool.django-check.{CONFIG_SECTION}]: {name} = {severity!r}")
+            continue
+        severities[name] = severity
+    return severities
+
+
+def audit_settings(get: Lookup, severities: dict[str, str]) -> tuple[list[Finding], list[str]]:
+    """
+    Runs all enabled rules over the same settings.
+
+    Args:
+        get: Lookup of settings values
+        severities: Severity of every rule
+
+    Returns:
+        Findings, with warnings about rules skipped for settings of unexpected shape, and names of
+        rules which need settings that can not be evaluated statically
+    """
+    findings = []
+    undecidable = []
+    with span("audit settings", CHECK):
+        for name, (_, check) in RULES.items():
+            if severities[name] == OFF:
+                continue
+            try:
+                messages = check(get)
+            except Undecidable:
+                undecidable.append(name)
+                continue
+            except Skipped as e:
+                findings.append(Finding(WARNING, name, f"skipped, {e}"))
+                continue
+            findings.extend(Finding(severities[name], name, message) for message in messages)
+    return findings, undecidable
+
+
+def static_lookup(
+    project_folder: str = ".", use_cache: bool = True, settings_module: str | None = None
+) -> Lookup | None:
+    """Returns the lookup of statically evaluated settings, None if the settings are not found."""
+    # Imported here, settings of the other modes are not evaluated statically
+    from .static_settings import evaluate_settings_module
+    from .utils_django import find_settings_module
+
+    settings_module = settings_module or find_settings_module(project_folder, use_cache=use_cache)
+    if not settings_module:
+        return None
+    namespace = evaluate_settings_module(settings_module, project_folder)
+    if namespace is None:
+        return None
+    return lambda name: namespace.lookup(name, DEFAULTS.get(name))
+
+
+def settings_lookup(settings: "Settings") -> Lookup:
+    """Returns the lookup of imported Django settings."""
+    return lambda name: getattr(settings, name, DEFAULTS.get(name))
+
+
+def import_lookup(
+    project_folder: str = ".", use_cache: bool = True, settings_module: str | None = None
+) -> Lookup | None:
+    """Returns the lookup of imported settings, None if they can not be imported."""
+    from .utils_django import init_django_settings
+
+    settings = init_django_settings(project_folder, use_cache=use_cache, settings_module=settings_module)
+    if settings is None:
+        return None
+    return settings_lookup(settings)
+
+
+def print_findings(findings: list[Finding], undecidable: Sequence[str] = ()) -> int:
+    """
+    Prints findings and rules which could not be evaluated.
+
+    Returns:
+        1 if any finding is an error, 0 otherwise
+    """
+    for name in undecidable:
+        print(f"WARNING {name}: settings can not be evaluated statically, use --mode import")
+    for finding in findings:
+        print(f"{finding.severity.upper()} {finding.rule}: {finding.message}")
+    return 1 if any(finding.severity == ERROR for finding in findings) else 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for auditing performance related settings."""
+    parser = argparse.ArgumentParser(description="Check Django settings for production performance problems")
+    parser.add_argument(
+        "filenames",
+        nargs="*",
+        help="Changed files, the check is skipped if none of them affects settings (if not specified, always check)",
+    )
+    parser.add_argument("--project-folder", default=".", help="Project folder path")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the settings discovery cache")
+    parser.add_argument("--settings-module", help="Settings module to check (if not specified, search automatically)")
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default=AUTO,
+        help="How to evaluate settings: statically, by importing them, or statically with import as fallback",
+    )
+    add_timings_argument(parser)
+    args = parser.parse_args(argv)
+
+    with record_timings(args.timings, "check-settings-performance"):
+        use_cache = not args.no_cache
+        if args.filenames and not has_relevant_changes(args.filenames, args.project_folder, SETTINGS, use_cache):
+            print("No settings files changed")
+            return 0
+
+        severities = load_severities(args.project_folder)
+        findings: list[Finding] = []
+        undecidable: list[str] = []
+        get = None
+        if args.mode in (AUTO, STATIC):
+            get = static_lookup(args.project_folder, use_cache, args.settings_module)
+            if get is not None:
+                findings, undecidable = audit_settings(get, severities)
+        if args.mode == IMPORT or (args.mode == AUTO and (get is None or undecidable)):
+            # Settings are imported once for all rules
+            get = import_lookup(args.project_folder, use_cache, args.settings_module)
+            if get is not None:
+                findings, undecidable = audit_settings(get, severities)
+        if get is None:
+            print("ERROR: Django settings can not be evaluated")
+            return 1
+
+        return print_findings(findings, undecidable)
+
+
+if __name__ == "__main__":
+    exit(main())
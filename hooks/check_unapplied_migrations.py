@@ -0,0 +1,76 @@
+import argparse
+from collections.abc import Sequence
+
+from .relevance import MIGRATIONS
+from .relevance import has_relevant_changes
+from .timings import IMPORT
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
+from .utils_django import setup_django
+from .utils_migrations import MigrationIssue
+from .utils_migrations import find_conflicts
+from .utils_migrations import print_migration_issues
+
+
+def find_unapplied_migrations(database: str = "default") -> list[MigrationIssue]:
+    """
+    Find migrations which are not applied to the database.
+
+    Django must be set up before calling this function.
+
+    Args:
+        database: Database alias
+
+    Returns:
+        Issue for every conflicting leaf and every unapplied migration
+    """
+    from django.db import connections
+    from django.db.migrations.executor import MigrationExecutor
+
+    with span("load migrations", IMPORT):
+        executor = MigrationExecutor(connections[database])
+    issues = find_conflicts(executor.loader)
+    if issues:
+        # Migration plan can not be built for conflicting migrations
+        return issues
+
+    with span("migration plan"):
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    for migration, backwards in plan:
+        reason = "applied but should be unapplied" if backwards else "unapplied"
+        issues.append(MigrationIssue(migration.app_label, migration.name, reason))
+    return issues
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for checking unapplied migrations."""
+    parser = argparse.ArgumentParser(description="Check that all migrations are applied to the database")
+    parser.add_argument(
+        "filenames",
+        nargs="*",
+        help="Changed files, the check is skipped if none of them affects migrations (if not specified, always check)",
+    )
+    parser.add_argument("--project-folder", default=".", help="Project folder path")
+    parser.add_argument("--database", default="default", help="Database alias to check")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the settings discovery cache")
+    parser.add_argument("--json", action="store_true", help="Print found issues as JSON")
+    add_timings_argument(parser)
+    args = parser.parse_args(argv)
+
+    with record_timings(args.timings, "check-unapplied-migrations"):
+        use_cache = not args.no_cache
+        if args.filenames and not has_relevant_changes(args.filenames, args.project_folder, MIGRATIONS, use_cache):
+            print("No migration files changed")
+            return 0
+
+        if setup_django(args.project_folder, use_cache=use_cache) is None:
+            return 1
+
+        issues = find_unapplied_migrations(args.database)
+        print_migration_issues(issues, "Unapplied migration", as_json=args.json)
+        return 1 if issues else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,27 +1,74 @@
 import argparse
-import re
+import subprocess
 from collections.abc import Sequence
 
-from .utils import get_current_branch
-from .utils import get_untracked_files
+from .daemon import run_in_daemon
+from .timings import add_timings_argument
+from .timings import record_timings
+from .utils import iter_branch_and_untracked_files
+
+MIGRATIONS_PATHSPEC = "*/migrations/*.py"
+
+
+def check_repository(path: str = ".", branches: Sequence[str] | None = None) -> tuple[int, list[str]]:
+    """
+    Check repository or worktree for untracked migrations.
+
+    Args:
+        path: Repository folder
+        branches: Branches to work on, all branches by default
+
+    Returns:
+        Exit code and messages to print
+    """
+    messages = []
+    found = False
+    try:
+        for kind, value in iter_branch_and_untracked_files([MIGRATIONS_PATHSPEC], cwd=path):
+            if kind == "branch" and branches and value not in branches:
+                return 1, [f"{value} is not present in --branches arg"]
+            if kind == "untracked":
+                found = True
+                messages.append(f"Untracked migration file found: {value}")
+    except (OSError, subprocess.CalledProcessError) as e:
+        return 1, [f"Failed to check {path}: {e}"]
+    return (1 if found else 0), messages
 
 
 def main(argv: Sequence[str] | None = None) -> int:
+    exit_code = run_in_daemon("check-untracked-migrations", argv)
+    if exit_code is not None:
+        return exit_code
     parser = argparse.ArgumentParser()
     parser.add_argument("--branches", nargs="*", help="Choose which branches to work on")
+    parser.add_argument(
+        "--repo",
+        action="append",
+        dest="repos",
+        help="Repository or worktree to check, can be repeated (default is current folder)",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Number of repositories checked in parallel")
+    add_timings_argument(parser)
     args = parser.parse_args(argv)
-    current_branch = get_current_branch()
-    if args.branches and current_branch not in args.branches:
-        print(f"{current_branch} is not present in --branches arg")
-        return 1
-    found = False
-    for filename in get_untracked_files():
-        if re.match(r".*/migrations/.*\.py", filename):
-            found = True
-            print(f"Untracked migration file found: {filename}")
-    if found:
-        return 1
-    return 0
+
+    with record_timings(args.timings, "check-untracked-migrations"):
+        repos = args.repos or ["."]
+
+        if len(repos) > 1 and args.jobs > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+                results = list(executor.map(lambda repo: check_repository(repo, args.branches), repos))
+        else:
+            results = [check_repository(repo, args.branches) for repo in repos]
+
+        exit_code = 0
+        for repo, (code, messages) in zip(repos, results):
+            prefix = f"{repo}: " if len(repos) > 1 else ""
+            for message in messages:
+                print(f"{prefix}{message}")
+            exit_code = max(exit_code, code)
+        return exit_code
 
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+import argparse
+from collections.abc import Callable
+from collections.abc import Sequence
+
+from . import check_untracked_migrations
+from . import daemon
+from .check_absent_migrations import find_absent_migrations
+from .check_unapplied_migrations import find_unapplied_migrations
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
+from .utils_django import setup_django
+from .utils_migrations import print_migration_issues
+
+DEBUG = "debug"
+UNAPPLIED = "unapplied"
+ABSENT = "absent"
+UNTRACKED = "untracked"
+PERFORMANCE = "performance"
+
+
+def _check_debug(args: argparse.Namespace) -> int:
+    from django.conf import settings
+
+    print(f"DEBUG mode: {settings.DEBUG}")
+    if settings.DEBUG is not False:
+        print("ERROR: DEBUG mode is not disabled in Django settings")
+        return 1
+    return 0
+
+
+def _check_performance(args: argparse.Namespace) -> int:
+    from django.conf import settings
+
+    from .check_settings_performance import audit_settings
+    from .check_settings_performance import load_severities
+    from .check_settings_performance import print_findings
+    from .check_settings_performance import settings_lookup
+
+    findings, _ = audit_settings(settings_lookup(settings), load_severities(args.project_folder))
+    return print_findings(findings)
+
+
+def _check_unapplied(args: argparse.Namespace) -> int:
+    issues = find_unapplied_migrations()
+    print_migration_issues(issues, "Unapplied migration")
+    return 1 if issues else 0
+
+
+def _check_absent(args: argparse.Namespace) -> int:
+    issues = find_absent_migrations()
+    print_migration_issues(issues, "Absent migration")
+    return 1 if issues else 0
+
+
+def _check_untracked(args: argparse.Namespace) -> int:
+    argv = ["--branches", *args.branches] if args.branches else []
+    return check_untracked_migrations.main(argv)
+
+
+# Check name -> (whether Django must be set up, check function)
+CHECKS: dict[str, tuple[bool, Callable[[argparse.Namespace], int]]] = {
+    DEBUG: (True, _check_debug),
+    UNAPPLIED: (True, _check_unapplied),
+    ABSENT: (True, _check_absent),
+    UNTRACKED: (False, _check_untracked),
+    PERFORMANCE: (True, _check_performance),
+}
+# Checks run when --hooks is not given
+DEFAULT_CHECKS = [DEBUG, UNAPPLIED, ABSENT, UNTRACKED]
+
+
+def _hooks_list(value: str) -> list[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CHECKS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown hooks: {', '.join(unknown)} (choose from {', '.join(CHECKS)})")
+    return names
+
+
+def run_checks(args: argparse.Namespace) -> int:
+    """
+    Run selected checks in one process, setting Django up at most once.
+
+    Args:
+        args: Parsed arguments of the run command
+
+    Returns:
+        0 if all checks passed, 1 otherwise
+    """
+    django_ready = None
+    results = {}
+    for name in args.hooks:
+        needs_django, check = CHECKS[name]
+        print(f"--- {name}")
+        if needs_django and django_ready is None:
+            django_ready = setup_django(args.project_folder, use_cache=not args.no_cache) is not None
+        if needs_django and not django_ready:
+            results[name] = 1
+            continue
+        try:
+            with span(name):
+                results[name] = check(args)
+        except Exception as e:
+            print(f"ERROR: {name} check failed: {e}")
+            results[name] = 1
+
+    print("---")
+    for name, code in results.items():
+        print(f"{name}: {'OK' if code == 0 else f'FAILED (exit code {code})'}")
+    return 1 if any(results.values()) else 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Main function for running several checks at once."""
+    parser = argparse.ArgumentParser(prog="django-check", description="Django checks for pre-commit")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run several checks in one process")
+    run_parser.add_argument(
+        "--hooks",
+        type=_hooks_list,
+        default=DEFAULT_CHECKS,
+        help=f"Comma separated checks to run (default is {','.join(DEFAULT_CHECKS)})",
+    )
+    run_parser.add_argument("--project-folder", default=".", help="Project folder path")
+    run_parser.add_argument("--no-cache", action="store_true", help="Do not use the settings discovery cache")
+    run_parser.add_argument("--branches", nargs="*", help="Branches for the untracked check")
+    add_timings_argument(run_parser)
+
+    serve_parser = subparsers.add_parser("serve", help="Run hooks for clients, keeping Django loaded")
+    serve_parser.add_argument("--project-folder", default=".", help="Project folder path")
+    serve_parser.add_argument("--idle-timeout", type=float, help="Exit after this many seconds without requests")
+    serve_parser.add_argument("--no-cache", action="store_true", help="Do not use the settings discovery cache")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        return daemon.serve(args.project_folder, idle_timeout=args.idle_timeout, use_cache=not args.no_cache)
+    with record_timings(args.timings, "django-check run"):
+        return run_checks(args)
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,79 @@
+import functools
+import os
+import sys
+from typing import Any
+
+CONFIG_FILE_NAME = "pyproject.toml"
+# Section of pyproject.toml: [tool.django-check], the key may be quoted or split by spaces
+CONFIG_SECTION = "django-check"
+
+
+def find_config_file(start_path: str = ".") -> str | None:
+    """
+    Finds the nearest pyproject.toml in the path or its parents.
+
+    Args:
+        start_path: Folder to start search from
+
+    Returns:
+        Path to pyproject.toml or None if there is no such file
+    """
+    current = os.path.abspath(start_path)
+    while True:
+        config_path = os.path.join(current, CONFIG_FILE_NAME)
+        if os.path.isfile(config_path):
+            return config_path
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+@functools.lru_cache(maxsize=16)
+def _read_config(config_path: str, mtime_ns: int) -> dict[str, Any]:
+    # The modification time is a part of the key, so the daemon sees changes of the file
+    try:
+        with open(config_path, "rb") as f:
+            content = f.read()
+    except OSError:
+        return {}
+    if CONFIG_SECTION.encode() not in content:
+        # Most pyproject.toml files have no config, they are not parsed
+        return {}
+
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            print(f"Install tomli to read {config_path} on Python < 3.11", file=sys.stderr)
+            return {}
+
+    try:
+        data = tomllib.loads(content.decode())
+    except ValueError as e:
+        print(f"Failed to read {config_path}: {e}", file=sys.stderr)
+        return {}
+    section = data.get("tool", {}).get(CONFIG_SECTION, {})
+    return section if isinstance(section, dict) else {}
+
+
+def load_config(start_path: str = ".") -> tuple[dict[str, Any], str | None]:
+    """
+    Loads the [tool.django-check] section of the nearest pyproject.toml.
+
+    Args:
+        start_path: Folder to start search from
+
+    Returns:
+        Section content (empty if there is no config) and the folder of pyproject.toml
+    """
+    config_path = find_config_file(start_path)
+    if config_path is None:
+        return {}, None
+    try:
+        mtime_ns = os.stat(config_path).st_mtime_ns
+    except OSError:
+        return {}, None
+    return _read_config(config_path, mtime_ns), os.path.dirname(config_path)
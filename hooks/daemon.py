@@ -0,0 +1,299 @@
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from .cache import get_cache_dir
+
+SOCKET_NAME = "daemon.sock"
+NO_DAEMON_ENV = "DJANGO_CHECK_NO_DAEMON"
+CONNECT_TIMEOUT = 0.5
+# Unix socket paths are limited to about 100 bytes
+MAX_SOCKET_PATH = 100
+# Environment variables which may differ between the client and the daemon, they can not change
+# imported settings: shell state, and variables pre-commit sets to run hooks in its virtualenv
+# (the daemon keeps its own interpreter anyway)
+VOLATILE_ENV = {"_", "COLUMNS", "LINES", "OLDPWD", "PWD", "SHLVL", "PATH", "VIRTUAL_ENV", "PRE_COMMIT"}
+VOLATILE_ENV_PREFIX = "PRE_COMMIT_"
+
+# Hook name -> module with main(argv)
+HOOKS = {
+    "check-debug-mode": "hooks.check_debug_mode",
+    "check-untracked-migrations": "hooks.check_untracked_migrations",
+    "po-location-format": "hooks.po_location_format",
+}
+
+# Set in the daemon process, so hooks run there do not connect to it
+_serving = False
+
+
+def get_socket_path(start_path: str = ".", create: bool = True) -> str | None:
+    """
+    Returns the socket path of the daemon of the repository.
+
+    Args:
+        start_path: Path inside the repository
+        create: Whether to create the cache directory, clients only look for a running daemon
+
+    Returns:
+        Path to the socket or None if there is no cache directory
+    """
+    cache_dir = get_cache_dir(start_path, create=create)
+    if cache_dir is None:
+        return None
+    socket_path = os.path.join(cache_dir, SOCKET_NAME)
+    if len(socket_path) > MAX_SOCKET_PATH:
+        import hashlib
+        import tempfile
+
+        digest = hashlib.sha256(os.path.abspath(cache_dir).encode()).hexdigest()[:16]
+        socket_path = os.path.join(tempfile.gettempdir(), f"django-check-{digest}.sock")
+    return socket_path
+
+
+def _send(sock: socket.socket, data: dict[str, Any]) -> None:
+    sock.sendall(json.dumps(data).encode())
+    sock.shutdown(socket.SHUT_WR)
+
+
+def _receive(sock: socket.socket) -> Any:
+    chunks = []
+    for chunk in iter(lambda: sock.recv(1 << 16), b""):
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def run_in_daemon(hook: str, argv: Sequence[str] | None = None) -> int | None:
+    """
+    Runs the hook in the daemon of the repository if it is running.
+
+    Args:
+        hook: Hook name from HOOKS
+        argv: Hook arguments, sys.argv by default
+
+    Returns:
+        Exit code of the hook, or None if the hook must run in this process
+    """
+    if _serving or os.environ.get(NO_DAEMON_ENV):
+        return None
+    socket_path = get_socket_path(create=False)
+    if socket_path is None or not os.path.exists(socket_path):
+        return None
+
+    request = {
+        "hook": hook,
+        "argv": list(sys.argv[1:] if argv is None else argv),
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+            # Hooks may run for long
+            sock.settimeout(None)
+            _send(sock, request)
+            response = _receive(sock)
+    except (OSError, ValueError):
+        return None
+
+    if response.get("fallback"):
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+
+class Daemon:
+    """
+    Runs hooks for clients, keeping Django, settings and imported project modules in memory.
+
+    Requests are handled one by one, hooks use process-wide state like the current folder and
+    the environment.
+    """
+
+    def __init__(
+        self,
+        project_folder: str,
+        socket_path: str,
+        idle_timeout: float | None = None,
+        environ: dict[str, str] | None = None,
+    ):
+        self.project_folder = os.path.abspath(project_folder)
+        self.cwd = os.getcwd()
+        # Environment settings were imported with, before Django setup changed it
+        self.environ = dict(os.environ) if environ is None else environ
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.module_mtimes: dict[str, int] = {}
+
+    def _project_module_files(self) -> list[str]:
+        prefix = os.path.join(self.project_folder, "")
+        files = []
+        for module in list(sys.modules.values()):
+            file_path = getattr(module, "__file__", None)
+            if file_path and file_path.startswith(prefix) and "site-packages" not in file_path:
+                files.append(file_path)
+        return files
+
+    def _mtime(self, file_path: str) -> int | None:
+        try:
+            return os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def remember_modules(self) -> None:
+        """Remembers modification times of newly imported project modules."""
+        for file_path in self._project_module_files():
+            if file_path not in self.module_mtimes:
+                self.module_mtimes[file_path] = self._mtime(file_path)
+
+    def is_stale(self) -> bool:
+        """Checks whether imported project modules changed, they can not be reloaded reliably."""
+        return any(self._mtime(file_path) != mtime for file_path, mtime in self.module_mtimes.items())
+
+    def is_environment_different(self, env: dict[str, str]) -> bool:
+        """Checks whether the client environment differs from the one settings were imported with."""
+        names = (set(env) | set(self.environ)) - VOLATILE_ENV
+        return any(
+            env.get(name) != self.environ.get(name) for name in names if not name.startswith(VOLATILE_ENV_PREFIX)
+        )
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Runs the requested hook, capturing its output.
+
+        Returns:
+            Response with output and exit code, or with fallback if the client must run the hook itself
+        """
+        cwd = os.path.abspath(request["cwd"])
+        module_name = HOOKS.get(request["hook"])
+        if module_name is None or os.path.commonpath([cwd, self.project_folder]) != self.project_folder:
+            return {"fallback": True}
+        if self.is_environment_different(request["env"]):
+            # Imported settings and modules could depend on the environment
+            return {"fallback": True}
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        saved_env = dict(os.environ)
+        os.environ.update(request["env"])
+        try:
+            os.chdir(cwd)
+            module = importlib.import_module(module_name)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    exit_code = module.main(request["argv"])
+                except SystemExit as e:
+                    # argparse errors
+                    exit_code = e.code if isinstance(e.code, int) else 1
+                except Exception as e:
+                    print(f"ERROR: {request['hook']} failed in django-check daemon: {e}", file=sys.stderr)
+                    exit_code = 1
+        finally:
+            os.chdir(self.cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+    def serve(self) -> bool:
+        """
+        Serves requests until idle timeout or until project modules change.
+
+        Returns:
+            True if the daemon must be restarted because project modules changed
+        """
+        global _serving
+        _serving = True
+
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            # Only the owner may connect, the socket is never accessible to others even briefly
+            umask = os.umask(0o177)
+            try:
+                server.bind(self.socket_path)
+            finally:
+                os.umask(umask)
+            server.listen(16)
+            server.settimeout(self.idle_timeout)
+            self.remember_modules()
+            try:
+                while True:
+                    try:
+                        connection, _ = server.accept()
+                    except socket.timeout:
+                        return False
+                    with connection:
+                        try:
+                            request = _receive(connection)
+                        except (OSError, ValueError):
+                            # Liveness checks connect without sending a request
+                            continue
+                        if self.is_stale():
+                            # Stop accepting connections before the client may retry
+                            server.close()
+                            with contextlib.suppress(FileNotFoundError):
+                                os.unlink(self.socket_path)
+                            _send(connection, {"fallback": True})
+                            return True
+                        _send(connection, self.handle(request))
+                    self.remember_modules()
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(self.socket_path)
+
+
+def is_daemon_running(socket_path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+    except OSError:
+        return False
+    return True
+
+
+def serve(project_folder: str = ".", idle_timeout: float | None = None, use_cache: bool = True) -> int:
+    """
+    Runs the daemon for the repository of the project folder.
+
+    Django is set up once if the project has settings, the daemon restarts itself when imported
+    project modules (settings, models, migrations) change.
+
+    Args:
+        project_folder: Path to the project folder
+        idle_timeout: Seconds without requests before the daemon exits, no limit if None
+        use_cache: Whether to use the settings discovery cache
+
+    Returns:
+        Exit code
+    """
+    from .utils_django import find_settings_module
+    from .utils_django import setup_django
+
+    socket_path = get_socket_path(project_folder)
+    if socket_path is None:
+        print("Cache directory is not available, can not create the daemon socket")
+        return 1
+    if is_daemon_running(socket_path):
+        print(f"Daemon is already running on {socket_path}")
+        return 1
+
+    started = time.perf_counter()
+    environ = dict(os.environ)
+    if find_settings_module(project_folder, use_cache=use_cache):
+        setup_django(project_folder, use_cache=use_cache)
+    print(f"Serving on {socket_path} (ready in {time.perf_counter() - started:.2f}s)", flush=True)
+
+    daemon = Daemon(project_folder, socket_path, idle_timeout, environ=environ)
+    if daemon.serve():
+        print("Project modules changed, restarting", flush=True)
+        # Django setup changes the environment, e.g. TZ, the new daemon starts with the original one
+        os.execve(sys.executable, [sys.executable, "-m", "hooks.cli", *sys.argv[1:]], environ)
+    return 0
@@ -0,0 +1,157 @@
+import os
+import sys
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any
+
+from .cache import file_fingerprint
+from .cache import is_file_unchanged
+
+# Folders whose files are never project sources
+SKIPPED_DIRS = {"__pycache__", "site-packages", ".git"}
+
+
+class Dependencies:
+    """Project files and environment variables a check result depends on."""
+
+    def __init__(self, project_folder: str = "."):
+        self.project_folder = os.path.abspath(project_folder)
+        self.files: set[str] = set()
+        self.environ_names: set[str] = set()
+        # False if the result may depend on something that was not recorded
+        self.complete = True
+
+    def add_file(self, file_path: str) -> None:
+        """Adds the file if it is a source file of the project."""
+        file_path = os.path.abspath(file_path)
+        if os.path.commonpath([file_path, self.project_folder]) != self.project_folder:
+            return
+        if SKIPPED_DIRS.intersection(file_path.split(os.sep)) or not os.path.isfile(file_path):
+            return
+        self.files.add(file_path)
+
+    def add_files(self, file_paths: Iterable[str]) -> None:
+        for file_path in file_paths:
+            self.add_file(file_path)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Builds a snapshot of the dependencies to detect their changes later.
+
+        Modification times of the folders of dependencies are stored as well, so files added next to them,
+        e.g. optional local settings, invalidate the snapshot.
+        """
+        folders = {os.path.dirname(file_path) for file_path in self.files}
+        return {
+            "files": {file_path: file_fingerprint(file_path) for file_path in sorted(self.files)},
+            "dirs": {folder: os.stat(folder).st_mtime_ns for folder in sorted(folders)},
+            "env": {name: os.environ.get(name) for name in sorted(self.environ_names)},
+        }
+
+
+def is_snapshot_unchanged(snapshot: dict[str, Any]) -> bool:
+    """
+    Checks that dependencies still match the snapshot built by Dependencies.snapshot.
+
+    Args:
+        snapshot: Stored snapshot
+
+    Returns:
+        True if no file, folder or environment variable of the snapshot changed
+    """
+    try:
+        if any(os.environ.get(name) != value for name, value in snapshot["env"].items()):
+            return False
+        for folder, mtime in snapshot["dirs"].items():
+            if os.stat(folder).st_mtime_ns != mtime:
+                return False
+        return all(is_file_unchanged(file_path, fingerprint) for file_path, fingerprint in snapshot["files"].items())
+    except (OSError, KeyError, AttributeError):
+        return False
+
+
+class RecordingEnviron(MutableMapping):
+    """Wrapper of os.environ remembering names of looked up variables."""
+
+    def __init__(self, environ: MutableMapping, dependencies: Dependencies):
+        self.environ = environ
+        self.dependencies = dependencies
+        self.recording = True
+
+    def _record(self, name: Any) -> None:
+        if self.recording and isinstance(name, str):
+            self.dependencies.environ_names.add(name)
+
+    def __getitem__(self, name: str) -> str:
+        self._record(name)
+        return self.environ[name]
+
+    def __contains__(self, name: object) -> bool:
+        self._record(name)
+        return name in self.environ
+
+    def __setitem__(self, name: str, value: str) -> None:
+        self.environ[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        del self.environ[name]
+
+    def __iter__(self) -> Iterator[str]:
+        # The whole environment is read, e.g. copied, names can not be recorded
+        if self.recording:
+            self.dependencies.complete = False
+        return iter(self.environ)
+
+    def __len__(self) -> int:
+        return len(self.environ)
+
+    def copy(self) -> dict[str, str]:
+        return dict(self)
+
+
+# Dependencies collecting files opened by the audit hook
+_tracked: Dependencies | None = None
+_audit_hook_installed = False
+
+
+def _audit(event: str, args: tuple) -> None:
+    if _tracked is not None and event == "open" and isinstance(args[0], str):
+        _tracked.add_file(args[0])
+
+
+@contextmanager
+def track_imports(dependencies: Dependencies, module_name: str | None = None) -> Iterator[Dependencies]:
+    """
+    Records project modules imported and project files opened in the block, and environment variables read.
+
+    Args:
+        dependencies: Collector of dependencies
+        module_name: Module imported in the block. If it is already imported, its dependencies are unknown
+    """
+    global _tracked, _audit_hook_installed
+
+    if module_name is not None and module_name in sys.modules:
+        dependencies.complete = False
+    if not _audit_hook_installed:
+        # Audit hooks can not be removed, the hook does nothing outside of the block
+        sys.addaudithook(_audit)
+        _audit_hook_installed = True
+
+    imported_modules = set(sys.modules)
+    original_environ = os.environ
+    recording_environ = RecordingEnviron(original_environ, dependencies)
+    os.environ = recording_environ  # type: ignore[assignment]
+    _tracked = dependencies
+    try:
+        yield dependencies
+    finally:
+        _tracked = None
+        # Modules may keep the wrapper, e.g. "from os import environ"
+        recording_environ.recording = False
+        os.environ = original_environ
+        for name in set(sys.modules) - imported_modules:
+            file_path = getattr(sys.modules[name], "__file__", None)
+            if file_path:
+                dependencies.add_file(file_path)
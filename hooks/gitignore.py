@@ -0,0 +1,174 @@
+import os
+import re
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from .config import load_config
+
+GITIGNORE_FILE_NAME = ".gitignore"
+
+
+class IgnorePattern(NamedTuple):
+    regex: re.Pattern[str]
+    negated: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translates a gitignore glob to a regular expression matching a whole relative path."""
+    parts = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", index + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                content = pattern[index + 1 : end]
+                if content.startswith("!"):
+                    content = "^" + content[1:]
+                parts.append(f"[{content}]")
+                index = end
+        elif char == "\\" and index + 1 < len(pattern):
+            index += 1
+            parts.append(re.escape(pattern[index]))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+def compile_pattern(line: str) -> IgnorePattern | None:
+    """
+    Compiles a line of a .gitignore file.
+
+    Args:
+        line: Line without the line ending
+
+    Returns:
+        Compiled pattern or None for blank lines and comments
+    """
+    line = line.rstrip(" ")
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith("\\"):
+        # "\#" and "\!" escape a leading special character
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # Patterns with a slash are relative to the .gitignore folder, others match names at any level
+    anchored = "/" in line
+    regex = _translate(line.lstrip("/"))
+    if not anchored:
+        regex = f"(?:.*/)?{regex}"
+    return IgnorePattern(re.compile(regex + r"\Z"), negated, dir_only)
+
+
+class IgnoreRules:
+    """Patterns of one .gitignore file (or of the exclude setting), matched against paths relative to its folder."""
+
+    def __init__(self, patterns: Iterable[IgnorePattern], prefix: str = ""):
+        self.patterns = list(patterns)
+        # Path of the walked root relative to the rules folder, with a trailing slash
+        self.prefix = prefix
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], prefix: str = "") -> "IgnoreRules":
+        return cls((pattern for line in lines if (pattern := compile_pattern(line.rstrip("\r\n")))), prefix)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "IgnoreRules":
+        try:
+            with open(file_path, encoding="utf-8", errors="surrogateescape") as f:
+                return cls.from_lines(f)
+        except OSError:
+            return cls([])
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """
+        Matches the path, the last matching pattern wins.
+
+        Args:
+            rel_path: Path relative to the rules folder with "/" separators
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if ignored, False if re-included by a negated pattern, None if no pattern matches
+        """
+        path = self.prefix + rel_path
+        for pattern in reversed(self.patterns):
+            if pattern.dir_only and not is_dir:
+                continue
+            if pattern.regex.match(path):
+                return not pattern.negated
+        return None
+
+
+# (folder relative to the walked root with a trailing slash or "", rules), the deepest rules are the last
+RulesStack = tuple[tuple[str, IgnoreRules], ...]
+
+
+def is_ignored(rules_stack: RulesStack, rel_path: str, is_dir: bool) -> bool:
+    """
+    Checks the path against nested rules, deeper .gitignore files override upper ones.
+
+    Args:
+        rules_stack: Rules of the path folder and its parents
+        rel_path: Path relative to the walked root with "/" separators
+        is_dir: Whether the path is a directory
+    """
+    for base, rules in reversed(rules_stack):
+        result = rules.match(rel_path[len(base) :], is_dir)
+        if result is not None:
+            return result
+    return False
+
+
+def load_exclude_rules(root_path: str = ".") -> IgnoreRules | None:
+    """
+    Loads the exclude setting of [tool.django-check] in pyproject.toml.
+
+    Exclude is a list of gitignore-style patterns relative to the pyproject.toml folder,
+    e.g. ["docs", "/deploy/", "*_generated.py"].
+
+    Args:
+        root_path: Root of the searched tree
+
+    Returns:
+        Rules for paths relative to the root path, None if nothing is excluded
+    """
+    config, config_folder = load_config(root_path)
+    exclude = config.get("exclude")
+    if not exclude or config_folder is None:
+        return None
+    prefix = os.path.relpath(os.path.abspath(root_path), config_folder).replace(os.sep, "/")
+    prefix = "" if prefix == "." else prefix + "/"
+    return IgnoreRules.from_lines(exclude, prefix)
+
+
+def is_ignored_path(rules_stack: RulesStack, rel_path: str) -> bool:
+    """Checks the file path and its parent folders, like a walk pruning ignored folders does."""
+    parts = rel_path.split("/")
+    for index in range(1, len(parts)):
+        if is_ignored(rules_stack, "/".join(parts[:index]), True):
+            return True
+    return is_ignored(rules_stack, rel_path, False)
@@ -0,0 +1,401 @@
+import ast
+import hashlib
+import os
+import re
+from typing import NamedTuple
+
+from .cache import load_cache
+from .cache import save_cache
+from .settings import EXCLUDE_DIRS
+from .timings import DISCOVERY
+from .timings import PARSE
+from .timings import span
+from .timings import timed
+from .utils import get_git_files
+from .utils import iter_files_with_extension
+from .utils_django import ast_parse
+from .utils_django import discover_projects
+from .utils_django import read_file
+
+MIGRATIONS_PATHSPEC = "*/migrations/*.py"
+MIGRATION_FILE_RE = re.compile(r".*/migrations/(?!__init__\.py$)[^/]+\.py$")
+MIGRATIONS_EXCLUDE_DIRS = [d for d in EXCLUDE_DIRS if d != "migrations"]
+GRAPH_CACHE_NAME = "migration_graph.json"
+# Parsing fewer files is faster than starting worker processes
+MIN_FILES_FOR_POOL = 64
+
+Key = tuple[str, str]
+
+
+class MigrationNode(NamedTuple):
+    """Migration parsed from its source."""
+
+    app: str
+    name: str
+    path: str
+    dependencies: list[Key]
+    replaces: list[Key]
+    run_before: list[Key]
+
+
+@timed(DISCOVERY)
+def get_migration_files(root_path: str = ".") -> list[str]:
+    """
+    Finds migration files (*/migrations/*.py except __init__.py).
+
+    Args:
+        root_path: Root directory for search (default is current)
+
+    Returns:
+        Paths to migration files
+    """
+    files = get_git_files([MIGRATIONS_PATHSPEC], root_path, MIGRATIONS_EXCLUDE_DIRS)
+    if files is None:
+        files = iter_files_with_extension(".py", root_path, MIGRATIONS_EXCLUDE_DIRS)
+    return sorted(f for f in files if MIGRATION_FILE_RE.match(f.replace(os.sep, "/")))
+
+
+def _literal_keys(node: ast.expr) -> list[Key]:
+    """Extracts (app, name) tuples from a list literal, skipping non-literal items like swappable_dependency."""
+    if not isinstance(node, (ast.List, ast.Tuple)):
+        return []
+    keys = []
+    for element in node.elts:
+        try:
+            value = ast.literal_eval(element)
+        except ValueError:
+            continue
+        if isinstance(value, (tuple, list)) and len(value) == 2 and all(isinstance(v, str) for v in value):
+            keys.append((value[0], value[1]))
+    return keys
+
+
+def parse_migration(file_content: str) -> dict[str, list[Key]] | None:
+    """
+    Extracts graph attributes from the Migration class.
+
+    Args:
+        file_content: Migration file content
+
+    Returns:
+        Dictionary with dependencies, replaces and run_before, or None if there is no Migration class
+    """
+    try:
+        tree = ast_parse(file_content)
+    except SyntaxError:
+        return None
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "Migration":
+            attributes: dict[str, list[Key]] = {"dependencies": [], "replaces": [], "run_before": []}
+            for statement in node.body:
+                if isinstance(statement, ast.Assign):
+                    for target in statement.targets:
+                        if isinstance(target, ast.Name) and target.id in attributes:
+                            attributes[target.id] = _literal_keys(statement.value)
+            return attributes
+    return None
+
+
+def parse_app_config_label(file_content: str) -> str | None:
+    """
+    Extracts the label set in an AppConfig class body.
+
+    Args:
+        file_content: Content of apps.py
+
+    Returns:
+        The first string label assigned in a class body, or None
+    """
+    try:
+        tree = ast_parse(file_content)
+    except SyntaxError:
+        return None
+
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for statement in node.body:
+            if (
+                isinstance(statement, ast.Assign)
+                and any(isinstance(target, ast.Name) and target.id == "label" for target in statement.targets)
+                and isinstance(statement.value, ast.Constant)
+                and isinstance(statement.value.value, str)
+            ):
+                return statement.value.value
+    return None
+
+
+def get_app_label(file_path: str) -> str:
+    """
+    Returns app label of a migration file at <app>/migrations/<name>.py.
+
+    It is the label of the AppConfig in <app>/apps.py if it sets one, the <app> folder name otherwise.
+    """
+    return _get_app_folder_label(os.path.dirname(os.path.dirname(os.path.abspath(file_path))))
+
+
+def _get_app_folder_label(app_path: str) -> str:
+    apps_path = os.path.join(app_path, "apps.py")
+    if os.path.isfile(apps_path):
+        content = read_file(apps_path)
+        label = parse_app_config_label(content) if content is not None else None
+        if label:
+            return label
+    return os.path.basename(app_path)
+
+
+class MigrationGraph:
+    """Migration graph built from migration sources, without importing Django."""
+
+    def __init__(self, nodes: list[MigrationNode], root: str = "."):
+        # Folder of the Django project the migrations belong to
+        self.root = root
+        self.nodes: dict[Key, MigrationNode] = {}
+        for node in nodes:
+            self.nodes[(node.app, node.name)] = node
+        self._apply_run_before()
+        self._apply_replacements()
+
+    def _apply_run_before(self) -> None:
+        """Turns run_before of a migration into dependencies of the migrations it must run before."""
+        for key, node in list(self.nodes.items()):
+            for target in node.run_before:
+                if target in self.nodes:
+                    target_node = self.nodes[target]
+                    self.nodes[target] = target_node._replace(dependencies=[*target_node.dependencies, key])
+
+    def _apply_replacements(self) -> None:
+        """Replaces squashed migrations by the squashing one, like Django does without applied migrations."""
+        replacements = {}
+        for key, node in self.nodes.items():
+            for replaced in node.replaces:
+                replacements[replaced] = key
+        for replaced in replacements:
+            self.nodes.pop(replaced, None)
+        for key, node in list(self.nodes.items()):
+            dependencies = [replacements.get(dependency, dependency) for dependency in node.dependencies]
+            self.nodes[key] = node._replace(dependencies=[d for d in dependencies if d != key])
+
+    @property
+    def apps(self) -> list[str]:
+        return sorted({app for app, _ in self.nodes})
+
+    def resolve(self, key: Key) -> Key | None:
+        """Resolves __first__/__latest__ dependencies and drops dependencies on apps outside of the graph."""
+        app, name = key
+        if name in ("__first__", "__latest__"):
+            nodes = self.root_nodes(app) if name == "__first__" else self.leaf_nodes(app)
+            return nodes[0] if nodes else None
+        return key if key in self.nodes else None
+
+    def dependencies(self, key: Key) -> list[Key]:
+        resolved = [self.resolve(dependency) for dependency in self.nodes[key].dependencies]
+        return [dependency for dependency in resolved if dependency is not None]
+
+    def leaf_nodes(self, app: str) -> list[Key]:
+        """Nodes of the app no other node of the same app depends on."""
+        nodes = {key for key in self.nodes if key[0] == app}
+        parents = {dependency for key in nodes for dependency in self.nodes[key].dependencies if dependency[0] == app}
+        return sorted(nodes - parents)
+
+    def root_nodes(self, app: str) -> list[Key]:
+        """Nodes of the app without dependencies in the same app."""
+        return sorted(
+            key
+            for key, node in self.nodes.items()
+            if key[0] == app and not any(dependency[0] == app for dependency in node.dependencies)
+        )
+
+    def ancestors(self, keys: list[Key]) -> set[Key]:
+        """Nodes the given nodes depend on, including themselves."""
+        result: set[Key] = set()
+        stack = [key for key in keys if key in self.nodes]
+        while stack:
+            key = stack.pop()
+            if key in result:
+                continue
+            result.add(key)
+            stack.extend(self.dependencies(key))
+        return result
+
+    def dangling_dependencies(self) -> list[tuple[Key, Key]]:
+        """
+        Dependencies on missing migrations of apps present in the graph.
+
+        Dependencies on apps outside of the project (e.g. django.contrib) can not be checked.
+        """
+        apps = set(self.apps)
+        dangling = []
+        for key, node in sorted(self.nodes.items()):
+            for dependency in [*node.dependencies, *node.run_before]:
+                if dependency[0] in apps and self.resolve(dependency) is None:
+                    dangling.append((key, dependency))
+        return dangling
+
+    def fingerprint(self) -> str:
+        """Hash of graph structure, changes when migrations are added, removed or reordered."""
+        digest = hashlib.sha256()
+        for key in sorted(self.nodes):
+            dependencies = ",".join(f"{app}.{name}" for app, name in sorted(self.nodes[key].dependencies))
+            digest.update(f"{key[0]}.{key[1]}:{dependencies}\n".encode())
+        return digest.hexdigest()
+
+
+def parse_migration_files(
+    file_paths: list[str],
+    jobs: int | None = None,
+    use_cache: bool = True,
+    root_path: str = ".",
+) -> dict[str, dict[str, list[Key]] | None]:
+    """
+    Parses migration files, in parallel for many files.
+
+    Results are cached by content hash, so only new and changed files are parsed.
+
+    Args:
+        file_paths: Paths to migration files
+        jobs: Number of worker processes, CPU count by default, 1 to parse in this process
+        use_cache: Whether to use the parsed migrations cache
+        root_path: Path inside the repository the cache belongs to
+
+    Returns:
+        Parsed attributes (or None for files without Migration class) by file path
+    """
+    cache = load_cache(GRAPH_CACHE_NAME, root_path) if use_cache else {}
+
+    hashes: dict[str, str | None] = {}
+    missing: dict[str, str] = {}
+    for file_path in file_paths:
+        content = read_file(file_path)
+        if content is None:
+            hashes[file_path] = None
+            continue
+        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        hashes[file_path] = content_hash
+        if content_hash not in cache:
+            missing[content_hash] = content
+
+    if missing:
+        contents = list(missing.values())
+        with span("parse migrations", PARSE, files=len(contents)):
+            if jobs != 1 and len(contents) >= MIN_FILES_FOR_POOL:
+                # Imports multiprocessing, only needed for many files
+                from concurrent.futures import ProcessPoolExecutor
+
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    parsed = list(executor.map(parse_migration, contents, chunksize=32))
+            else:
+                parsed = [parse_migration(content) for content in contents]
+        cache.update(zip(missing, parsed))
+
+    results = {}
+    for file_path, content_hash in hashes.items():
+        # Non-utf-8 files are skipped like files without Migration class
+        attributes = cache[content_hash] if content_hash is not None else None
+        if attributes is not None:
+            # JSON cache stores tuples as lists
+            attributes = {key: [tuple(item) for item in value] for key, value in attributes.items()}
+        results[file_path] = attributes
+
+    if use_cache and missing:
+        # Keep only entries of current files
+        current = {
+            content_hash: cache[content_hash] for content_hash in set(hashes.values()) if content_hash is not None
+        }
+        save_cache(GRAPH_CACHE_NAME, current, root_path)
+    return results
+
+
+def group_by_project(file_paths: list[str], root_path: str = ".") -> dict[str, list[str]]:
+    """
+    Groups migration files by the Django project they belong to, e.g. in a monorepo.
+
+    A file belongs to the innermost discovered project folder containing it. With a single project,
+    or none, all files form one group of the root path.
+
+    Args:
+        file_paths: Paths to migration files
+        root_path: Root directory of the search
+
+    Returns:
+        Paths to migration files by project folder
+    """
+    project_roots = sorted({os.path.abspath(project_root) for project_root, _ in discover_projects(root_path)})
+    if len(project_roots) < 2:
+        return {root_path: list(file_paths)} if file_paths else {}
+
+    groups: dict[str, list[str]] = {}
+    for file_path in file_paths:
+        abs_path = os.path.abspath(file_path)
+        containing = [root for root in project_roots if abs_path.startswith(os.path.join(root, ""))]
+        # Sorted roots put the innermost folder last
+        groups.setdefault(containing[-1] if containing else root_path, []).append(file_path)
+    return groups
+
+
+def _app_folder(file_path: str) -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(file_path)))
+
+
+def _build_graph(
+    parsed: dict[str, dict[str, list[Key]] | None], root: str, labels: dict[str, str] | None = None
+) -> MigrationGraph:
+    nodes = []
+    # apps.py is read once per app, not per migration
+    labels = {} if labels is None else labels
+    for file_path, attributes in parsed.items():
+        if attributes is None:
+            continue
+        app_path = _app_folder(file_path)
+        if app_path not in labels:
+            labels[app_path] = _get_app_folder_label(app_path)
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        nodes.append(MigrationNode(labels[app_path], name, file_path, **attributes))
+    return MigrationGraph(nodes, root)
+
+
+def build_migration_graph(root_path: str = ".", jobs: int | None = None, use_cache: bool = True) -> MigrationGraph:
+    """
+    Builds one migration graph from all migration files under the root path.
+
+    Args:
+        root_path: Root directory for search (default is current)
+        jobs: Number of worker processes to parse files
+        use_cache: Whether to use the parsed migrations cache
+
+    Returns:
+        Migration graph
+    """
+    parsed = parse_migration_files(get_migration_files(root_path), jobs=jobs, use_cache=use_cache, root_path=root_path)
+    return _build_graph(parsed, root_path)
+
+
+def build_migration_graphs(
+    root_path: str = ".", jobs: int | None = None, use_cache: bool = True
+) -> list[MigrationGraph]:
+    """
+    Builds a migration graph per Django project under the root path.
+
+    Apps with the same label in different projects of a monorepo are kept in separate graphs,
+    if all labels are distinct there is one graph.
+
+    Args:
+        root_path: Root directory for search (default is current)
+        jobs: Number of worker processes to parse files
+        use_cache: Whether to use the parsed migrations cache
+
+    Returns:
+        Migration graphs sorted by project folder
+    """
+    parsed = parse_migration_files(get_migration_files(root_path), jobs=jobs, use_cache=use_cache, root_path=root_path)
+    labels = {app_path: _get_app_folder_label(app_path) for app_path in {_app_folder(path) for path in parsed}}
+    if len(set(labels.values())) == len(labels):
+        # Projects are discovered only if apps share a label, apps with distinct labels can not merge
+        groups = {root_path: list(parsed)} if parsed else {}
+    else:
+        groups = group_by_project(list(parsed), root_path)
+    return [
+        _build_graph({file_path: parsed[file_path] for file_path in file_paths}, project_root, labels)
+        for project_root, file_paths in sorted(groups.items())
+    ]
@@ -0,0 +1,210 @@
+import ast
+from collections.abc import Iterator
+from typing import Any
+from typing import NamedTuple
+
+from .migration_graph import MIN_FILES_FOR_POOL
+from .timings import PARSE
+from .timings import span
+from .utils_django import ast_parse
+
+# Value of keyword arguments which are not literals
+EXPRESSION = "<expr>"
+
+# Parts of SeparateDatabaseAndState
+STATE = "state"
+DATABASE = "database"
+
+# Positional arguments of operations, as in django.db.migrations.operations
+POSITIONAL_ARGUMENTS = {
+    "CreateModel": ["name", "fields"],
+    "AddField": ["model_name", "name", "field"],
+    "AlterField": ["model_name", "name", "field"],
+    "RemoveField": ["model_name", "name"],
+    "AddIndex": ["model_name", "index"],
+    "AddIndexConcurrently": ["model_name", "index"],
+    "RunPython": ["code", "reverse_code"],
+    "RunSQL": ["sql", "reverse_sql"],
+    "SeparateDatabaseAndState": ["database_operations", "state_operations"],
+}
+
+
+class Operation(NamedTuple):
+    """Migration operation parsed from its source."""
+
+    # Operation class name, e.g. "AddField"
+    name: str
+    line: int
+    # Lower-case model name
+    model: str | None = None
+    field: str | None = None
+    # Field class name, e.g. "CharField"
+    field_class: str | None = None
+    # Keyword arguments of the field, EXPRESSION for values which are not literals
+    field_options: dict[str, Any] = {}
+    # "" for usual operations, STATE or DATABASE inside SeparateDatabaseAndState
+    scope: str = ""
+    elidable: bool = False
+    # RunPython code iterates in batches (.iterator(), batch_size=...)
+    batched: bool = False
+
+
+class MigrationOperations(NamedTuple):
+    operations: list[Operation]
+    atomic: bool
+
+
+def _call_name(node: ast.expr) -> str | None:
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _literal(node: ast.expr) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return EXPRESSION
+
+
+def _arguments(call: ast.Call, name: str) -> dict[str, ast.expr]:
+    arguments = dict(zip(POSITIONAL_ARGUMENTS.get(name, []), call.args))
+    arguments.update((keyword.arg, keyword.value) for keyword in call.keywords if keyword.arg)
+    return arguments
+
+
+def _string(node: ast.expr | None) -> str | None:
+    value = _literal(node) if node is not None else None
+    return value if isinstance(value, str) else None
+
+
+def _field(node: ast.expr | None) -> tuple[str | None, dict[str, Any]]:
+    if not isinstance(node, ast.Call):
+        return None, {}
+    return _call_name(node.func), {kw.arg: _literal(kw.value) for kw in node.keywords if kw.arg}
+
+
+def _is_batched(function: ast.FunctionDef | None) -> bool:
+    if function is None:
+        return False
+    for node in ast.walk(function):
+        if isinstance(node, ast.Call):
+            if _call_name(node.func) == "iterator" or any(kw.arg == "batch_size" for kw in node.keywords):
+                return True
+    return False
+
+
+def _iter_operations(
+    nodes: list[ast.expr],
+    functions: dict[str, ast.FunctionDef],
+    scope: str = "",
+) -> Iterator[Operation]:
+    for node in nodes:
+        if not isinstance(node, ast.Call):
+            continue
+        name = _call_name(node.func)
+        if name is None:
+            continue
+        arguments = _arguments(node, name)
+        line = node.lineno
+
+        if name == "SeparateDatabaseAndState":
+            for part, part_scope in (("database_operations", DATABASE), ("state_operations", STATE)):
+                part_node = arguments.get(part)
+                if isinstance(part_node, (ast.List, ast.Tuple)):
+                    yield from _iter_operations(part_node.elts, functions, part_scope)
+            continue
+
+        if name == "CreateModel":
+            model = (_string(arguments.get("name")) or "").lower() or None
+            fields = arguments.get("fields")
+            for item in fields.elts if isinstance(fields, (ast.List, ast.Tuple)) else []:
+                if isinstance(item, ast.Tuple) and len(item.elts) == 2:
+                    field_class, options = _field(item.elts[1])
+                    yield Operation(name, line, model, _string(item.elts[0]), field_class, options, scope)
+            continue
+
+        model = _string(arguments.get("model_name"))
+        field_class, options = _field(arguments.get("field"))
+        elidable = _literal(arguments["elidable"]) is True if "elidable" in arguments else False
+        batched = False
+        if name == "RunPython":
+            code = arguments.get("code")
+            batched = _is_batched(functions.get(code.id)) if isinstance(code, ast.Name) else False
+        yield Operation(
+            name,
+            line,
+            model.lower() if model else None,
+            _string(arguments.get("name")),
+            field_class,
+            options,
+            scope,
+            elidable,
+            batched,
+        )
+
+
+def parse_operations(file_content: str) -> MigrationOperations | None:
+    """
+    Extracts operations of the Migration class.
+
+    Args:
+        file_content: Migration file content
+
+    Returns:
+        Operations in the order of the file, or None if there is no Migration class
+    """
+    try:
+        tree = ast_parse(file_content)
+    except SyntaxError:
+        return None
+
+    functions = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "Migration":
+            operations: list[Operation] = []
+            atomic = True
+            for statement in node.body:
+                if not isinstance(statement, ast.Assign):
+                    continue
+                for target in statement.targets:
+                    if isinstance(target, ast.Name) and target.id == "operations":
+                        if isinstance(statement.value, (ast.List, ast.Tuple)):
+                            operations = list(_iter_operations(statement.value.elts, functions))
+                    elif isinstance(target, ast.Name) and target.id == "atomic":
+                        atomic = _literal(statement.value) is not False
+            return MigrationOperations(operations, atomic)
+    return None
+
+
+def _parse_operations_file(file_path: str) -> MigrationOperations | None:
+    try:
+        with open(file_path, "rb") as fb:
+            return parse_operations(fb.read().decode())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def parse_operation_files(file_paths: list[str], jobs: int | None = None) -> dict[str, MigrationOperations | None]:
+    """
+    Parses operations of migration files, in parallel for many files.
+
+    Args:
+        file_paths: Paths to migration files
+        jobs: Number of worker processes, CPU count by default, 1 to parse in this process
+
+    Returns:
+        Parsed operations (or None for files without Migration class) by file path
+    """
+    with span("parse migration operations", PARSE, files=len(file_paths)):
+        if jobs != 1 and len(file_paths) >= MIN_FILES_FOR_POOL:
+            # Imports multiprocessing, only needed for many files
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                parsed = list(executor.map(_parse_operations_file, file_paths, chunksize=32))
+        else:
+            parsed = [_parse_operations_file(file_path) for file_path in file_paths]
+    return dict(zip(file_paths, parsed))
@@ -0,0 +1,5 @@
+# How hooks evaluating settings get their values, shared by hooks which do not import each other
+AUTO = "auto"
+STATIC = "static"
+IMPORT = "import"
+MODES = [AUTO, STATIC, IMPORT]
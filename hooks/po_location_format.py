@@ -1,42 +1,239 @@
 import argparse
+import os
 import shutil
 import tempfile
+from collections.abc import Iterator
 from collections.abc import Sequence
-from contextlib import closing
+from typing import Any
+from typing import BinaryIO
 
-LOCATION_START = "#: "
+from .cache import file_fingerprint
+from .cache import load_cache
+from .cache import save_cache
+from .daemon import run_in_daemon
+from .timings import IO
+from .timings import add_timings_argument
+from .timings import record_timings
+from .timings import span
+
+LOCATION_START = b"#: "
 FILE = "file"
 NEVER = "never"
+COPY_CHUNK_SIZE = 1024 * 1024
+PO_CACHE_NAME = "po_location_format.json"
+
+
+def _extract_location_file_name(line: bytes) -> set[bytes]:
+    file_names = line[len(LOCATION_START) :].split()
+    return {n.split(b":")[0] for n in file_names}
+
+
+def _line_ending(line: bytes) -> bytes:
+    if line.endswith(b"\r\n"):
+        return b"\r\n"
+    if line.endswith(b"\n"):
+        return b"\n"
+    return b""
+
+
+def _format_locations(lines: list[bytes], add_location: str) -> bytes:
+    """Formats consecutive location lines, keeping their line endings."""
+    if add_location == NEVER:
+        return b""
+
+    names: set[bytes] = set()
+    # Location lines without file names have nothing to format, they are kept as they are
+    empty: list[bytes] = []
+    for line in lines:
+        line_names = _extract_location_file_name(line)
+        if not line_names:
+            empty.append(line.rstrip(b"\r\n"))
+        names.update(line_names)
+    # The last line may have no line ending at the end of file
+    newline = next((_line_ending(line) for line in lines if _line_ending(line)), b"\n")
+    last_newline = _line_ending(lines[-1])
+    formatted = [line + newline for line in empty] + [LOCATION_START + name + newline for name in sorted(names)]
+    formatted[-1] = formatted[-1][: -len(newline)] + last_newline
+    return b"".join(formatted)
+
+
+def iter_blocks(source: BinaryIO, add_location: str) -> Iterator[tuple[bytes, bytes]]:
+    """
+    Streams formatted .po file content.
+
+    Only consecutive location lines are kept in memory, so memory does not depend on the file size.
+
+    Args:
+        source: Binary file opened for reading
+        add_location: Location format, file or never
+
+    Returns:
+        Iterator of (source block, formatted block)
+    """
+    locations: list[bytes] = []
+    for line in source:
+        if line.startswith(LOCATION_START):
+            locations.append(line)
+            continue
+        if locations:
+            yield b"".join(locations), _format_locations(locations, add_location)
+            locations = []
+        yield line, line
+    if locations:
+        yield b"".join(locations), _format_locations(locations, add_location)
+
+
+def _copy_prefix(filename: str, size: int, target: BinaryIO) -> None:
+    with open(filename, "rb") as source:
+        while size:
+            chunk = source.read(min(size, COPY_CHUNK_SIZE))
+            if not chunk:
+                break
+            target.write(chunk)
+            size -= len(chunk)
+
+
+def format_file(filename: str, add_location: str, check: bool = False) -> bool:
+    """
+    Formats locations of a .po file in place.
 
+    The file is written only if its content changes: formatted content goes to a temporary
+    file next to it, which then replaces the original.
 
-def _extract_location_file_name(line):
-    file_names = line.rstrip().replace(LOCATION_START, "").split(" ")
-    return sorted({n.split(":")[0] for n in file_names})
+    Args:
+        filename: Path to the .po file
+        add_location: Location format, file or never
+        check: Only report whether the file would change, never write it
+
+    Returns:
+        True if the file was (or would be) changed
+    """
+    offset = 0
+    temp_file = None
+    try:
+        with span("format file", IO, path=filename), open(filename, "rb") as source:
+            for block, formatted in iter_blocks(source, add_location):
+                if temp_file is None:
+                    if block == formatted:
+                        offset += len(block)
+                        continue
+                    if check:
+                        return True
+                    directory, basename = os.path.split(os.path.abspath(filename))
+                    temp_file = tempfile.NamedTemporaryFile(
+                        dir=directory, prefix=f".{basename}.", suffix=".tmp", delete=False
+                    )
+                    _copy_prefix(filename, offset, temp_file)
+                temp_file.write(formatted)
+
+        if temp_file is None:
+            return False
+        temp_file.close()
+        shutil.copymode(filename, temp_file.name)
+        os.replace(temp_file.name, filename)
+        temp_file = None
+        return True
+    finally:
+        if temp_file is not None:
+            temp_file.close()
+            os.unlink(temp_file.name)
+
+
+def _format_file_job(filename: str, add_location: str, check: bool) -> tuple[bool, dict[str, Any] | None]:
+    """Formats the file, returning whether it changed and the fingerprint of the formatted content."""
+    changed = format_file(filename, add_location, check=check)
+    if changed and check:
+        return changed, None
+    return changed, file_fingerprint(filename)
+
+
+class NormalizedFiles:
+    """
+    Cache of files already formatted with an add-location mode.
+
+    Formatted content is recorded by (content hash, mode). Fingerprints of the files let
+    unchanged files skip hashing: only size and mtime are compared.
+    """
+
+    def __init__(self, add_location: str, use_cache: bool = True):
+        self.add_location = add_location
+        self.use_cache = use_cache
+        cache = load_cache(PO_CACHE_NAME) if use_cache else {}
+        self.files: dict[str, dict[str, Any]] = cache.get("files", {})
+        self.normalized: set[str] = set(cache.get("normalized", []))
+
+    def _key(self, content_hash: str) -> str:
+        return f"{self.add_location}:{content_hash}"
+
+    def is_normalized(self, filename: str) -> bool:
+        if not self.use_cache:
+            return False
+        path = os.path.abspath(filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        fingerprint = self.files.get(path)
+        if not fingerprint or (stat.st_size, stat.st_mtime_ns) != (fingerprint["size"], fingerprint["mtime"]):
+            fingerprint = file_fingerprint(path)
+            self.files[path] = fingerprint
+        return self._key(fingerprint["hash"]) in self.normalized
+
+    def add(self, filename: str, fingerprint: dict[str, Any]) -> None:
+        self.files[os.path.abspath(filename)] = fingerprint
+        self.normalized.add(self._key(fingerprint["hash"]))
+
+    def save(self) -> None:
+        if not self.use_cache:
+            return
+        files = {path: fingerprint for path, fingerprint in self.files.items() if os.path.exists(path)}
+        hashes = {fingerprint["hash"] for fingerprint in files.values()}
+        # Keep normalized content of existing files only, for every mode
+        normalized = sorted(key for key in self.normalized if key.split(":", 1)[1] in hashes)
+        save_cache(PO_CACHE_NAME, {"files": files, "normalized": normalized})
 
 
 def main(argv: Sequence[str] | None = None) -> int:
+    exit_code = run_in_daemon("po-location-format", argv)
+    if exit_code is not None:
+        return exit_code
     parser = argparse.ArgumentParser()
     parser.add_argument("filenames", nargs="*", help="Filenames to process")
     parser.add_argument("--add-location", choices=[FILE, NEVER], required=True)
+    parser.add_argument("--check", action="store_true", help="Only report files which would be changed")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of files processed in parallel")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the formatted files cache")
+    add_timings_argument(parser)
     args = parser.parse_args(argv)
-    add_location = args.add_location
-    for filename in args.filenames:
-        with tempfile.NamedTemporaryFile() as temp_file:
-            with closing(open(filename)) as source_file:
-                location = set()
-                for line in source_file:
-                    if line.startswith(LOCATION_START):
-                        if add_location == FILE:
-                            location.update(_extract_location_file_name(line))
-                    else:
-                        if add_location == FILE:
-                            for name in sorted(location):
-                                temp_file.write(f"{LOCATION_START}{name}\n".encode())
-                            location = set()
-                        temp_file.write(line.encode())
-            temp_file.seek(0)
-            shutil.copyfile(temp_file.name, filename)
-    return 1
+
+    with record_timings(args.timings, "po-location-format"):
+        cache = NormalizedFiles(args.add_location, use_cache=not args.no_cache)
+        filenames = [filename for filename in args.filenames if not cache.is_normalized(filename)]
+
+        jobs = min(max(1, args.jobs), len(filenames))
+        add_location = [args.add_location] * len(filenames)
+        check = [args.check] * len(filenames)
+        if jobs > 1:
+            # Imports multiprocessing, only needed for parallel runs
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_format_file_job, filenames, add_location, check))
+        else:
+            results = list(map(_format_file_job, filenames, add_location, check))
+
+        changed = False
+        for filename, (file_changed, fingerprint) in zip(filenames, results):
+            if fingerprint is not None:
+                cache.add(filename, fingerprint)
+            if file_changed:
+                changed = True
+                print(f"{'Would reformat' if args.check else 'Reformatted'} {filename}")
+        cache.save()
+
+        if changed:
+            return 1
+        return 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+import os
+import re
+from collections.abc import Iterable
+from typing import Any
+
+from .cache import load_cache
+from .cache import save_cache
+from .dependencies import Dependencies
+from .dependencies import is_snapshot_unchanged
+from .settings import DJANGO_FILES
+from .timings import DISCOVERY
+from .timings import span
+
+RELEVANCE_CACHE_NAME = "relevance_index.json"
+
+# What a hook depends on, every kind includes the previous ones
+SETTINGS = "settings"
+MIGRATIONS = "migrations"
+MODELS = "models"
+
+APP_FILES_PATHSPECS = ["*/models.py", "*/models/__init__.py", "*/migrations/__init__.py"]
+# Paths of models and migrations, also of apps which are not in the index yet
+MIGRATIONS_PATH_RE = re.compile(r"(^|/)migrations/[^/]+\.py$")
+MODELS_PATH_RE = re.compile(r"(^|/)models(\.py|/[^/]+\.py)$")
+
+
+def _relative(path: str, project_folder: str) -> str:
+    return os.path.relpath(os.path.abspath(path), project_folder).replace(os.sep, "/")
+
+
+def find_app_dirs(project_folder: str = ".") -> list[str]:
+    """
+    Finds folders of apps, i.e. folders with models or migrations, without setting up Django.
+
+    Args:
+        project_folder: Path to the project folder
+
+    Returns:
+        Paths to app folders
+    """
+    from .migration_graph import MIGRATIONS_EXCLUDE_DIRS
+    from .utils import get_git_files
+    from .utils import iter_files_with_extension
+
+    files = get_git_files(APP_FILES_PATHSPECS, project_folder, MIGRATIONS_EXCLUDE_DIRS)
+    if files is None:
+        files = iter_files_with_extension(".py", project_folder, MIGRATIONS_EXCLUDE_DIRS)
+
+    app_dirs = set()
+    for file_path in files:
+        path = file_path.replace(os.sep, "/")
+        if path.endswith(("/models.py", "/models/__init__.py", "/migrations/__init__.py")):
+            app_dirs.add(os.path.dirname(path.removesuffix("/__init__.py")))
+    return sorted(app_dirs)
+
+
+def build_relevance_index(project_folder: str = ".", settings_module: str | None = None) -> dict[str, Any]:
+    """
+    Collects files the Django checks depend on: settings, entry points and app folders.
+
+    Args:
+        project_folder: Path to the project folder
+        settings_module: Settings module of the project
+
+    Returns:
+        Index with paths relative to the project folder and the snapshot of the layout files
+    """
+    from .static_settings import StaticSettingsEvaluator
+    from .static_settings import is_decidable
+    from .utils_django import iter_django_files
+
+    abs_project_folder = os.path.abspath(project_folder)
+    entry_points = list(iter_django_files(project_folder))
+    settings_files: list[str] = []
+    complete = False
+    if settings_module:
+        evaluator = StaticSettingsEvaluator(project_folder)
+        namespace = evaluator.evaluate_module(settings_module)
+        settings_files = evaluator.visited_files
+        # Skipped branches, failed includes and unknown calls may import any project module
+        complete = (
+            namespace is not None
+            and not evaluator.partial
+            and not any(module.tainted for module in evaluator.modules.values())
+            and is_decidable(namespace.lookup("INSTALLED_APPS", []))
+        )
+
+    # The index is rebuilt when settings or entry points change, e.g. when an app is added to INSTALLED_APPS
+    layout = Dependencies(project_folder)
+    layout.add_files([*entry_points, *settings_files])
+    return {
+        "settings_module": settings_module,
+        # Settings which can not be evaluated statically may import any project module
+        "complete": complete,
+        "settings_files": sorted({_relative(path, abs_project_folder) for path in settings_files}),
+        "entry_points": sorted({_relative(path, abs_project_folder) for path in entry_points}),
+        "app_dirs": [_relative(path, abs_project_folder) for path in find_app_dirs(project_folder)],
+        "layout": layout.snapshot(),
+    }
+
+
+def load_relevance_index(project_folder: str = ".", use_cache: bool = True) -> dict[str, Any]:
+    """
+    Returns the relevance index of the project, rebuilding it only when layout files changed.
+
+    Args:
+        project_folder: Path to the project folder
+        use_cache: Whether to read and update the cached index
+
+    Returns:
+        Relevance index built by build_relevance_index
+    """
+    from .utils_django import find_settings_module
+
+    settings_module = find_settings_module(project_folder, use_cache=use_cache)
+    abs_project_folder = os.path.abspath(project_folder)
+    cache = load_cache(RELEVANCE_CACHE_NAME, project_folder) if use_cache else {}
+    index = cache.get(abs_project_folder)
+    if index and index.get("settings_module") == settings_module and is_snapshot_unchanged(index.get("layout", {})):
+        return index
+
+    with span("build relevance index", DISCOVERY):
+        index = build_relevance_index(project_folder, settings_module)
+    if use_cache:
+        cache[abs_project_folder] = index
+        save_cache(RELEVANCE_CACHE_NAME, cache, project_folder)
+    return index
+
+
+def is_relevant_file(path: str, index: dict[str, Any], kind: str = SETTINGS) -> bool:
+    """
+    Checks whether a change of the file can change the result of checks of the kind.
+
+    Args:
+        path: Path relative to the project folder with "/" separators
+        index: Relevance index
+        kind: One of SETTINGS, MIGRATIONS, MODELS
+
+    Returns:
+        True if the file is relevant
+    """
+    if path.startswith("../"):
+        return False
+    name = path.rpartition("/")[2]
+    if path in index["settings_files"] or path in index["entry_points"] or name in DJANGO_FILES:
+        return True
+    if name.startswith(".env"):
+        # Settings may read environment files
+        return True
+    if not index["complete"]:
+        return path.endswith(".py")
+    if any(path.startswith(f"{os.path.dirname(settings_file)}/") for settings_file in index["settings_files"]):
+        # New modules next to settings, e.g. optional local settings
+        return True
+    if kind == SETTINGS:
+        return False
+
+    if MIGRATIONS_PATH_RE.search(path):
+        return True
+    if kind == MIGRATIONS:
+        return False
+    if MODELS_PATH_RE.search(path):
+        return True
+    # Models may be defined or changed by any module of an app
+    return path.endswith(".py") and any(path.startswith(f"{app_dir}/") for app_dir in index["app_dirs"])
+
+
+def has_relevant_changes(
+    filenames: Iterable[str],
+    project_folder: str = ".",
+    kind: str = SETTINGS,
+    use_cache: bool = True,
+) -> bool:
+    """
+    Checks whether any of the changed files can change the result of checks of the kind.
+
+    Args:
+        filenames: Changed files, e.g. staged files passed by pre-commit
+        project_folder: Path to the project folder
+        kind: One of SETTINGS, MIGRATIONS, MODELS
+        use_cache: Whether to use the cached relevance index
+
+    Returns:
+        True if the checks must run
+    """
+    index = load_relevance_index(project_folder, use_cache=use_cache)
+    abs_project_folder = os.path.abspath(project_folder)
+    return any(is_relevant_file(_relative(filename, abs_project_folder), index, kind) for filename in filenames)
@@ -9,6 +9,21 @@ DJANGO_FILES = [
     "settings.py",
 ]
 
+# Directories skipped while searching project files
+EXCLUDE_DIRS = [
+    "venv",
+    "__pycache__",
+    "node_modules",
+    "build",
+    "dist",
+    "migrations",
+    "media",
+    "static",
+    "staticfiles",
+    "templates",
+    "deactivate",
+]
+
 
 def get_project_root() -> str:
     """Получает корневую папку проекта."""
@@ -0,0 +1,947 @@
+import ast
+import glob
+import operator
+import os
+from collections.abc import Iterator
+from collections.abc import Mapping
+from typing import Any
+
+from .timings import PARSE
+from .timings import span
+from .utils_django import ast_parse
+from .utils_django import read_file
+
+
+class _Undecidable:
+    def __repr__(self) -> str:
+        return "<undecidable>"
+
+    def __bool__(self) -> bool:
+        raise TypeError("undecidable value has no truth value")
+
+
+# Value which can not be evaluated without executing the settings
+UNDECIDABLE: Any = _Undecidable()
+
+BOOLEAN_TRUE_STRINGS = ("true", "on", "ok", "y", "yes", "1")
+
+INCLUDE_REFS = {"split_settings.tools.include", "split_settings.include"}
+OPTIONAL_REFS = {"split_settings.tools.optional", "split_settings.optional"}
+ENV_REFS = {"environ.Env", "environ.environ.Env"}
+READ_ENV_REFS = {"environ.Env.read_env", "environ.environ.Env.read_env"}
+GETENV_REFS = {"os.getenv", "os.environ.get"}
+# Imported callables without side effects on settings or the environment
+PURE_REFS = {
+    "pathlib.Path",
+    "pathlib.PurePath",
+    "os.getcwd",
+    "os.path.abspath",
+    "os.path.basename",
+    "os.path.dirname",
+    "os.path.expanduser",
+    "os.path.join",
+    "os.path.normpath",
+    "os.path.realpath",
+    "datetime.timedelta",
+    "django.urls.reverse_lazy",
+    "django.utils.translation.gettext",
+    "django.utils.translation.gettext_lazy",
+    "django.utils.translation.gettext_noop",
+    "dj_database_url.config",
+    "dj_database_url.parse",
+}
+KNOWN_REFS = INCLUDE_REFS | OPTIONAL_REFS | ENV_REFS | READ_ENV_REFS | GETENV_REFS | PURE_REFS
+# Methods of values which can not be evaluated, e.g. of paths, without side effects
+PURE_METHOD_NAMES = {
+    "absolute",
+    "as_posix",
+    "expanduser",
+    "joinpath",
+    "relative_to",
+    "resolve",
+    "with_name",
+    "with_suffix",
+}
+# Calls that can change module globals in a way that can not be followed statically
+DYNAMIC_NAMES = {"globals", "locals", "vars", "exec", "setattr", "__import__", "import_module"}
+
+SAFE_BUILTINS = {
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "bool": bool,
+    "dict": dict,
+    "float": float,
+    "frozenset": frozenset,
+    "int": int,
+    "len": len,
+    "list": list,
+    "max": max,
+    "min": min,
+    "round": round,
+    "set": set,
+    "sorted": sorted,
+    "str": str,
+    "sum": sum,
+    "tuple": tuple,
+}
+
+SAFE_METHODS = {
+    str: {
+        "casefold",
+        "endswith",
+        "format",
+        "join",
+        "lower",
+        "lstrip",
+        "removeprefix",
+        "removesuffix",
+        "replace",
+        "rsplit",
+        "rstrip",
+        "split",
+        "startswith",
+        "strip",
+        "title",
+        "upper",
+    },
+    list: {"append", "copy", "count", "extend", "index", "insert", "remove"},
+    tuple: {"count", "index"},
+    dict: {"copy", "get", "items", "keys", "setdefault", "update", "values"},
+    set: {"add", "copy", "discard", "union", "update"},
+}
+
+SIMPLE_STATEMENTS = (ast.Assign, ast.AnnAssign, ast.AugAssign, ast.Expr, ast.Delete)
+
+MUTATING_METHODS = {"append", "extend", "insert", "remove", "setdefault", "update", "add", "discard", "pop", "clear"}
+
+# Bounds of folded values, bigger ones could hang the evaluation, e.g. 10**10**10
+MAX_INT_BITS = 4096
+MAX_SEQUENCE_LENGTH = 1_000_000
+
+
+def _bounded_pow(left: Any, right: Any) -> Any:
+    if isinstance(left, int) and isinstance(right, int) and right > 0:
+        if max(left.bit_length(), 1) * right > MAX_INT_BITS:
+            raise ValueError("power is too big")
+    return operator.pow(left, right)
+
+
+def _bounded_mul(left: Any, right: Any) -> Any:
+    for sequence, count in ((left, right), (right, left)):
+        if isinstance(sequence, (str, bytes, list, tuple)) and isinstance(count, int):
+            if len(sequence) * count > MAX_SEQUENCE_LENGTH:
+                raise ValueError("sequence is too long")
+    return operator.mul(left, right)
+
+
+def _bounded_lshift(left: Any, right: Any) -> Any:
+    if isinstance(left, int) and isinstance(right, int) and left.bit_length() + right > MAX_INT_BITS:
+        raise ValueError("shift is too big")
+    return operator.lshift(left, right)
+
+
+BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _bounded_mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _bounded_pow,
+    ast.BitOr: operator.or_,
+    ast.BitAnd: operator.and_,
+    ast.BitXor: operator.xor,
+    ast.LShift: _bounded_lshift,
+    ast.RShift: operator.rshift,
+}
+
+UNARY_OPS = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Invert: operator.invert,
+}
+
+COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+
+class Ref:
+    """Reference to an imported object which is not evaluated."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"<ref {self.name}>"
+
+
+class OptionalPath:
+    """Path wrapped with split_settings.tools.optional."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+class Env:
+    """Static stand-in for environ.Env with its cast schema."""
+
+    def __init__(self, schema: dict[str, Any]):
+        self.schema = schema
+
+
+class BoundMethod:
+    def __init__(self, obj: Any, name: str):
+        self.obj = obj
+        self.name = name
+
+
+class Namespace(dict):
+    """
+    Module globals collected by the static evaluation.
+
+    The namespace is tainted when names could have been defined in a way that can not be
+    followed, e.g. by a star import from a module outside of the project.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.tainted = False
+
+    def lookup(self, name: str, default: Any = UNDECIDABLE) -> Any:
+        """
+        Returns the value of the name.
+
+        Args:
+            name: Global name
+            default: Value for names that are certainly not defined
+
+        Returns:
+            Value of the name, UNDECIDABLE or the default
+        """
+        if name in self:
+            return self[name]
+        if self.tainted:
+            return UNDECIDABLE
+        return default
+
+    def taint(self) -> None:
+        """Marks that any global could have been redefined."""
+        for name in self:
+            if not name.startswith("__"):
+                self[name] = UNDECIDABLE
+        self.tainted = True
+
+
+def is_decidable(value: Any) -> bool:
+    """Checks that the value does not contain UNDECIDABLE parts."""
+    stack = [value]
+    seen = set()
+    while stack:
+        item = stack.pop()
+        if item is UNDECIDABLE:
+            return False
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, Mapping):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return True
+
+
+def parse_env_value(value: str, cast: Any) -> Any:
+    """
+    Casts the environment variable value like django-environ does for simple types.
+
+    Args:
+        value: Raw value of the environment variable
+        cast: Cast type
+
+    Returns:
+        Casted value or UNDECIDABLE for casts that are not supported
+    """
+    if cast is None or cast is str:
+        return value
+    if cast is bool:
+        try:
+            return bool(int(value))
+        except ValueError:
+            return value.lower().strip() in BOOLEAN_TRUE_STRINGS
+    if cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            return UNDECIDABLE
+    return UNDECIDABLE
+
+
+class _Environ(dict):
+    """Environment variables remembering the names looked up by settings."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.looked_up: set[str] = set()
+
+    def __getitem__(self, name: str) -> str:
+        self.looked_up.add(name)
+        return super().__getitem__(name)
+
+    def __contains__(self, name: object) -> bool:
+        if isinstance(name, str):
+            self.looked_up.add(name)
+        return super().__contains__(name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        self.looked_up.add(name)
+        return super().get(name, default)
+
+
+class _FileContext:
+    def __init__(self, path: str, module_name: str, package: str):
+        self.path = path
+        self.module_name = module_name
+        self.package = package
+
+
+class StaticSettingsEvaluator:
+    """
+    Evaluates Django settings modules from their AST without importing them.
+
+    Constant expressions are folded, star imports of project modules, split_settings includes and
+    environment lookups (os.environ, django-environ) are followed. Everything else is UNDECIDABLE.
+    """
+
+    def __init__(self, project_folder: str = ".", environ: Mapping[str, str] | None = None):
+        self.project_folder = os.path.abspath(project_folder)
+        self.environ = _Environ(os.environ if environ is None else environ)
+        self.visited_files: list[str] = []
+        self.modules: dict[str, Namespace] = {}
+        self.env_file_loaded = False
+        # Code was skipped, e.g. a branch with an undecidable test or a project module which can not be parsed
+        self.partial = False
+
+    def resolve_module(self, module_name: str) -> tuple[str, str] | None:
+        """
+        Finds the project file of the module.
+
+        Args:
+            module_name: Dotted module name
+
+        Returns:
+            Tuple of the file path and the package name, or None if the module is not in the project
+        """
+        base_path = os.path.join(self.project_folder, *module_name.split("."))
+        package_init = os.path.join(base_path, "__init__.py")
+        if os.path.isfile(package_init):
+            return package_init, module_name
+        if os.path.isfile(f"{base_path}.py"):
+            return f"{base_path}.py", module_name.rpartition(".")[0]
+        return None
+
+    def evaluate_module(self, module_name: str) -> Namespace | None:
+        """
+        Evaluates the project module.
+
+        Args:
+            module_name: Dotted module name
+
+        Returns:
+            Namespace of the module or None if the module is not in the project or can not be parsed
+        """
+        resolved = self.resolve_module(module_name)
+        if resolved is None:
+            return None
+
+        file_path, package = resolved
+        if file_path in self.modules:
+            # Already evaluated or is being evaluated (circular import)
+            return self.modules[file_path]
+
+        namespace = Namespace(__name__=module_name, __file__=file_path, __package__=package)
+        self.modules[file_path] = namespace
+        if not self.evaluate_file(file_path, namespace, _FileContext(file_path, module_name, package)):
+            del self.modules[file_path]
+            return None
+        return namespace
+
+    def evaluate_file(self, file_path: str, namespace: Namespace, context: _FileContext) -> bool:
+        """
+        Executes statements of the file in the namespace.
+
+        Returns:
+            False if the file can not be read or parsed
+        """
+        file_content = read_file(file_path)
+        if file_content is None:
+            return False
+        try:
+            tree = ast_parse(file_content)
+        except SyntaxError:
+            return False
+
+        self.visited_files.append(file_path)
+        with span("evaluate settings file", PARSE, path=file_path):
+            self._exec_body(tree.body, namespace, context)
+        return True
+
+    def _exec_body(self, body: list[ast.stmt], namespace: Namespace, context: _FileContext) -> None:
+        for stmt in body:
+            self._exec(stmt, namespace, context)
+
+    def _exec(self, stmt: ast.stmt, namespace: Namespace, context: _FileContext) -> None:
+        if isinstance(stmt, SIMPLE_STATEMENTS):
+            self._taint_unknown_calls(stmt, namespace)
+        elif isinstance(stmt, ast.If):
+            self._taint_unknown_calls(stmt.test, namespace)
+
+        if isinstance(stmt, SIMPLE_STATEMENTS) and _uses_dynamic_names(stmt):
+            namespace.taint()
+        elif isinstance(stmt, ast.Assign):
+            value = self.fold(stmt.value, namespace)
+            for target in stmt.targets:
+                self._assign(target, value, namespace)
+        elif isinstance(stmt, ast.AnnAssign):
+            if stmt.value is not None:
+                self._assign(stmt.target, self.fold(stmt.value, namespace), namespace)
+        elif isinstance(stmt, ast.AugAssign):
+            operation = ast.BinOp(left=_as_load(stmt.target), op=stmt.op, right=stmt.value)
+            self._assign(stmt.target, self.fold(operation, namespace), namespace)
+        elif isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                if alias.asname:
+                    namespace[alias.asname] = self._import_value(alias.name)
+                else:
+                    top_level = alias.name.split(".")[0]
+                    namespace[top_level] = self._import_value(top_level)
+        elif isinstance(stmt, ast.ImportFrom):
+            self._exec_import_from(stmt, namespace, context)
+        elif isinstance(stmt, ast.Expr):
+            if isinstance(stmt.value, ast.Call) and self._is_include(stmt.value, namespace):
+                self._exec_include(stmt.value, namespace, context)
+            else:
+                self.fold(stmt.value, namespace)
+        elif isinstance(stmt, ast.If):
+            test = self.fold(stmt.test, namespace)
+            if _is_plain(test):
+                self._exec_body(stmt.body if test else stmt.orelse, namespace, context)
+            else:
+                self._invalidate(stmt, namespace)
+        elif isinstance(stmt, ast.Try):
+            self._exec_try(stmt, namespace, context)
+        elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            namespace[stmt.name] = UNDECIDABLE
+        elif isinstance(stmt, ast.Delete):
+            for target in stmt.targets:
+                if isinstance(target, ast.Name):
+                    namespace.pop(target.id, None)
+                else:
+                    self._invalidate(target, namespace)
+        elif isinstance(stmt, (ast.Pass, ast.Assert, ast.Global, ast.Nonlocal)):
+            pass
+        else:
+            # Loops, with blocks and other statements are not executed
+            self._invalidate(stmt, namespace)
+
+    def _assign(self, target: ast.expr, value: Any, namespace: Namespace) -> None:
+        if isinstance(target, ast.Name):
+            namespace[target.id] = value
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            values = list(value) if is_decidable(value) and isinstance(value, (list, tuple)) else None
+            if values is None or len(values) != len(target.elts) or _has_starred(target):
+                self._invalidate(target, namespace)
+                return
+            for item_target, item_value in zip(target.elts, values):
+                self._assign(item_target, item_value, namespace)
+        elif isinstance(target, ast.Subscript):
+            container = self.fold(target.value, namespace)
+            key = self.fold(target.slice, namespace)
+            if isinstance(container, (dict, list)) and is_decidable(key):
+                try:
+                    container[key] = value
+                    return
+                except (TypeError, IndexError):
+                    pass
+            self._invalidate(target, namespace)
+        else:
+            self._invalidate(target, namespace)
+
+    def _is_known_call(self, call: ast.Call, namespace: Namespace) -> bool:
+        """Checks that the call can not change globals or the environment in a way that is not followed."""
+        func = self.fold(call.func, namespace)
+        if isinstance(func, Ref):
+            return func.name in KNOWN_REFS
+        if isinstance(func, (Env, BoundMethod)) or any(func is builtin for builtin in SAFE_BUILTINS.values()):
+            return True
+        if isinstance(call.func, ast.Attribute) and call.func.attr in PURE_METHOD_NAMES:
+            # Functions of project modules may do anything, e.g. rebind globals of the settings
+            return not isinstance(self.fold(call.func.value, namespace), (Namespace, Ref))
+        return False
+
+    def _taint_unknown_calls(self, node: ast.AST, namespace: Namespace) -> None:
+        """
+        Taints the namespace if the node calls anything that is not known to be pure.
+
+        Such calls, e.g. load_dotenv() or a helper with "global DEBUG", may change globals and the
+        environment, so environment variables which are not set become UNDECIDABLE as well.
+        """
+        if any(not self._is_known_call(call, namespace) for call in _iter_executed_calls(node)):
+            namespace.taint()
+            self.env_file_loaded = True
+
+    def _invalidate(self, node: ast.AST, namespace: Namespace) -> None:
+        """Marks every global the node could change as UNDECIDABLE."""
+        self.partial = True
+        self._taint_unknown_calls(node, namespace)
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name) and isinstance(child.ctx, (ast.Store, ast.Del)):
+                namespace[child.id] = UNDECIDABLE
+            elif isinstance(child, (ast.Subscript, ast.Attribute)) and isinstance(child.ctx, (ast.Store, ast.Del)):
+                root = _root_name(child)
+                if root:
+                    namespace[root] = UNDECIDABLE
+            elif isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute):
+                root = _root_name(child.func.value)
+                if root and child.func.attr in MUTATING_METHODS:
+                    namespace[root] = UNDECIDABLE
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                namespace[child.name] = UNDECIDABLE
+            elif isinstance(child, (ast.Import, ast.ImportFrom)):
+                for alias in child.names:
+                    if alias.name == "*":
+                        namespace.taint()
+                    else:
+                        namespace[(alias.asname or alias.name).split(".")[0]] = UNDECIDABLE
+        if _uses_dynamic_names(node) or any(
+            isinstance(child, ast.Call) and self._is_include(child, namespace) for child in ast.walk(node)
+        ):
+            namespace.taint()
+
+    def _import_value(self, module_name: str) -> Any:
+        if self.resolve_module(module_name) is not None:
+            module_namespace = self.evaluate_module(module_name)
+            if module_namespace is None:
+                self.partial = True
+                return UNDECIDABLE
+            return module_namespace
+        return Ref(module_name)
+
+    def _absolute_module(self, stmt: ast.ImportFrom, context: _FileContext) -> str | None:
+        if not stmt.level:
+            return stmt.module
+        parts = context.package.split(".") if context.package else []
+        if stmt.level - 1 > len(parts):
+            return None
+        base = parts[: len(parts) - (stmt.level - 1)]
+        if stmt.module:
+            base.append(stmt.module)
+        return ".".join(base) or None
+
+    def _exec_import_from(self, stmt: ast.ImportFrom, namespace: Namespace, context: _FileContext) -> None:
+        module_name = self._absolute_module(stmt, context)
+        module_namespace = None
+        if module_name is not None and self.resolve_module(module_name) is not None:
+            module_namespace = self.evaluate_module(module_name)
+            self.partial = self.partial or module_namespace is None
+
+        for alias in stmt.names:
+            if alias.name == "*":
+                if module_namespace is None:
+                    namespace.taint()
+                    continue
+                if module_namespace.tainted:
+                    namespace.taint()
+                public_names = module_namespace.get("__all__")
+                if not isinstance(public_names, (list, tuple)):
+                    public_names = [name for name in module_namespace if not name.startswith("_")]
+                for name in public_names:
+                    namespace[name] = module_namespace.lookup(name)
+                continue
+
+            bound_name = alias.asname or alias.name
+            if module_name is None:
+                self.partial = True
+                namespace[bound_name] = UNDECIDABLE
+            elif module_namespace is not None:
+                if alias.name in module_namespace:
+                    namespace[bound_name] = module_namespace[alias.name]
+                else:
+                    namespace[bound_name] = self._import_value(f"{module_name}.{alias.name}")
+            elif self.resolve_module(f"{module_name}.{alias.name}") is not None:
+                namespace[bound_name] = self._import_value(f"{module_name}.{alias.name}")
+            else:
+                namespace[bound_name] = Ref(f"{module_name}.{alias.name}")
+
+    def _is_include(self, call: ast.Call, namespace: Namespace) -> bool:
+        func = self.fold(call.func, namespace)
+        return isinstance(func, Ref) and func.name in INCLUDE_REFS
+
+    def _exec_include(self, call: ast.Call, namespace: Namespace, context: _FileContext) -> None:
+        """Executes files included with split_settings.tools.include in the same namespace."""
+        base_dir = os.path.dirname(context.path)
+        for arg in call.args:
+            value = self.fold(arg, namespace)
+            is_optional = isinstance(value, OptionalPath)
+            pattern = value.path if is_optional else value
+            if not isinstance(pattern, str):
+                namespace.taint()
+                continue
+
+            files = sorted(glob.glob(os.path.join(base_dir, pattern)))
+            if not files and not is_optional:
+                # include() fails with an error, the settings can not be loaded
+                namespace.taint()
+            for included_path in files:
+                included_context = _FileContext(included_path, context.module_name, context.package)
+                namespace["__included_file__"] = included_path
+                if not self.evaluate_file(included_path, namespace, included_context):
+                    namespace.taint()
+        namespace.pop("__included_file__", None)
+
+    def _exec_try(self, stmt: ast.Try, namespace: Namespace, context: _FileContext) -> None:
+        """
+        Executes try blocks made of imports, e.g. optional local settings.
+
+        If all imports in the body resolve to project modules the body is executed, if the first
+        import certainly fails the first handler is executed. Other try blocks are not executed.
+        """
+        imports = [node for node in stmt.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+        if not imports or len(imports) != len(stmt.body):
+            self._invalidate(stmt, namespace)
+            return
+
+        resolved = [self._import_resolves(node, context) for node in imports]
+        if all(resolved):
+            self._exec_body(stmt.body, namespace, context)
+            self._exec_body(stmt.orelse, namespace, context)
+        elif resolved[0] is False and stmt.handlers:
+            self._exec_body(stmt.handlers[0].body, namespace, context)
+        else:
+            self._invalidate(stmt, namespace)
+            return
+        self._exec_body(stmt.finalbody, namespace, context)
+
+    def _import_resolves(self, node: ast.Import | ast.ImportFrom, context: _FileContext) -> bool | None:
+        """
+        Checks if the import resolves to project modules.
+
+        Returns:
+            True if it does, False if it is a relative import of a missing module, None if unknown
+        """
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        else:
+            module_name = self._absolute_module(node, context)
+            if module_name is None:
+                return False
+            modules = [module_name]
+            if node.level and self.resolve_module(module_name) is None:
+                return False
+        if all(self.resolve_module(module) is not None for module in modules):
+            return True
+        return None
+
+    def fold(self, node: ast.expr, namespace: Namespace) -> Any:
+        """
+        Evaluates the expression if it is possible without executing any code.
+
+        Args:
+            node: Expression node
+            namespace: Namespace to look names up
+
+        Returns:
+            Value of the expression or UNDECIDABLE
+        """
+        try:
+            return self._fold(node, namespace)
+        except Exception:
+            return UNDECIDABLE
+
+    def _fold(self, node: ast.expr, namespace: Namespace) -> Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id in namespace:
+                return namespace[node.id]
+            if node.id in SAFE_BUILTINS:
+                return SAFE_BUILTINS[node.id]
+            return UNDECIDABLE
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            items = []
+            for element in node.elts:
+                if isinstance(element, ast.Starred):
+                    value = self._fold(element.value, namespace)
+                    if not is_decidable(value):
+                        return UNDECIDABLE
+                    items.extend(value)
+                else:
+                    items.append(self._fold(element, namespace))
+            if isinstance(node, ast.Tuple):
+                return tuple(items)
+            if isinstance(node, ast.Set):
+                return set(items) if is_decidable(items) else UNDECIDABLE
+            return items
+        if isinstance(node, ast.Dict):
+            result = {}
+            for key_node, value_node in zip(node.keys, node.values):
+                if key_node is None:
+                    value = self._fold(value_node, namespace)
+                    if not isinstance(value, Mapping):
+                        return UNDECIDABLE
+                    result.update(value)
+                    continue
+                key = self._fold(key_node, namespace)
+                if not is_decidable(key):
+                    return UNDECIDABLE
+                result[key] = self._fold(value_node, namespace)
+            return result
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for value_node in node.values:
+                if isinstance(value_node, ast.FormattedValue):
+                    value = self._fold(value_node.value, namespace)
+                    if not _is_plain(value):
+                        return UNDECIDABLE
+                    spec = self._fold(value_node.format_spec, namespace) if value_node.format_spec else ""
+                    if value_node.conversion == ord("r"):
+                        value = repr(value)
+                    elif value_node.conversion == ord("s"):
+                        value = str(value)
+                    parts.append(format(value, spec))
+                else:
+                    parts.append(self._fold(value_node, namespace))
+            return "".join(parts)
+        if isinstance(node, ast.BoolOp):
+            value = UNDECIDABLE
+            for index, value_node in enumerate(node.values):
+                value = self._fold(value_node, namespace)
+                if index == len(node.values) - 1:
+                    break
+                if not _is_plain(value):
+                    return UNDECIDABLE
+                if isinstance(node.op, ast.And) and not value:
+                    return value
+                if isinstance(node.op, ast.Or) and value:
+                    return value
+            return value
+        if isinstance(node, ast.UnaryOp):
+            operand = self._fold(node.operand, namespace)
+            if not _is_plain(operand):
+                return UNDECIDABLE
+            return UNARY_OPS[type(node.op)](operand)
+        if isinstance(node, ast.BinOp):
+            left = self._fold(node.left, namespace)
+            right = self._fold(node.right, namespace)
+            if not (_is_plain(left) and _is_plain(right)):
+                return UNDECIDABLE
+            return BIN_OPS[type(node.op)](left, right)
+        if isinstance(node, ast.Compare):
+            left = self._fold(node.left, namespace)
+            for op, comparator_node in zip(node.ops, node.comparators):
+                right = self._fold(comparator_node, namespace)
+                if not (_is_plain(left) and _is_plain(right)):
+                    return UNDECIDABLE
+                if not COMPARE_OPS[type(op)](left, right):
+                    return False
+                left = right
+            return True
+        if isinstance(node, ast.IfExp):
+            test = self._fold(node.test, namespace)
+            if not _is_plain(test):
+                return UNDECIDABLE
+            return self._fold(node.body if test else node.orelse, namespace)
+        if isinstance(node, ast.Subscript):
+            container = self._fold(node.value, namespace)
+            key = self._fold(node.slice, namespace)
+            if not (_is_plain(container) and is_decidable(key)):
+                return UNDECIDABLE
+            return container[key]
+        if isinstance(node, ast.Slice):
+            parts = [self._fold(part, namespace) if part else None for part in (node.lower, node.upper, node.step)]
+            return slice(*parts) if is_decidable(parts) else UNDECIDABLE
+        if isinstance(node, ast.Attribute):
+            return self._fold_attribute(self._fold(node.value, namespace), node.attr)
+        if isinstance(node, ast.Call):
+            return self._fold_call(node, namespace)
+        return UNDECIDABLE
+
+    def _fold_attribute(self, value: Any, attr: str) -> Any:
+        if isinstance(value, Namespace):
+            return value.lookup(attr)
+        if isinstance(value, Ref):
+            name = f"{value.name}.{attr}"
+            if name == "os.environ":
+                return self.environ
+            return Ref(name)
+        if isinstance(value, Env):
+            return BoundMethod(value, attr)
+        for value_type, methods in SAFE_METHODS.items():
+            if isinstance(value, value_type) and attr in methods:
+                return BoundMethod(value, attr)
+        return UNDECIDABLE
+
+    def _fold_call(self, node: ast.Call, namespace: Namespace) -> Any:
+        func = self._fold(node.func, namespace)
+        args = []
+        for arg_node in node.args:
+            if isinstance(arg_node, ast.Starred):
+                value = self._fold(arg_node.value, namespace)
+                if not is_decidable(value):
+                    return UNDECIDABLE
+                args.extend(value)
+            else:
+                args.append(self._fold(arg_node, namespace))
+        kwargs = {}
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                return UNDECIDABLE
+            kwargs[keyword.arg] = self._fold(keyword.value, namespace)
+
+        if isinstance(func, Ref):
+            if func.name in ENV_REFS:
+                return Env(kwargs)
+            if func.name in READ_ENV_REFS:
+                self.env_file_loaded = True
+                return None
+            if func.name in OPTIONAL_REFS and len(args) == 1 and isinstance(args[0], str):
+                return OptionalPath(args[0])
+            if func.name in GETENV_REFS:
+                return self._getenv(*args, **kwargs)
+            return UNDECIDABLE
+        if isinstance(func, Env):
+            return self._env_value(func, None, *args, **kwargs)
+        if isinstance(func, BoundMethod) and isinstance(func.obj, Env):
+            if func.name == "read_env":
+                self.env_file_loaded = True
+                return None
+            return self._env_value(func.obj, func.name, *args, **kwargs)
+
+        if not (is_decidable(args) and is_decidable(kwargs)):
+            return UNDECIDABLE
+        if isinstance(func, BoundMethod):
+            return getattr(func.obj, func.name)(*args, **kwargs)
+        if func in SAFE_BUILTINS.values():
+            return func(*args, **kwargs)
+        return UNDECIDABLE
+
+    def _getenv(self, name: Any, default: Any = None) -> Any:
+        if not isinstance(name, str):
+            return UNDECIDABLE
+        if name in self.environ:
+            return self.environ[name]
+        if self.env_file_loaded:
+            return UNDECIDABLE
+        return default
+
+    def _env_value(self, env: Env, method: str | None, var: Any = UNDECIDABLE, *args: Any, **kwargs: Any) -> Any:
+        """Returns value of the environ.Env call, e.g. env("DEBUG") or env.bool("DEBUG", default=False)."""
+        if not isinstance(var, str):
+            return UNDECIDABLE
+
+        cast: Any = None
+        default: Any = UNDECIDABLE
+        schema = env.schema.get(var)
+        if isinstance(schema, tuple) and len(schema) == 2:
+            cast, default = schema
+        elif schema is not None:
+            cast = schema
+
+        if method is None:
+            if args:
+                cast = args[0]
+            if len(args) > 1:
+                default = args[1]
+            cast = kwargs.get("cast", cast)
+        else:
+            cast = {"bool": bool, "str": str, "int": int, "float": float}.get(method, UNDECIDABLE)
+            if args:
+                default = args[0]
+        default = kwargs.get("default", default)
+
+        if var in self.environ:
+            return parse_env_value(self.environ[var], cast)
+        if self.env_file_loaded:
+            return UNDECIDABLE
+        return default
+
+
+def _iter_executed_calls(node: ast.AST) -> Iterator[ast.Call]:
+    """Yields calls of the node, except calls in bodies of functions, which are not executed."""
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, ast.Call):
+            yield item
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            # Decorators and default values are executed
+            stack.extend(item.args.defaults)
+            stack.extend(default for default in item.args.kw_defaults if default is not None)
+            stack.extend(getattr(item, "decorator_list", []))
+            continue
+        stack.extend(ast.iter_child_nodes(item))
+
+
+def _is_plain(value: Any) -> bool:
+    return is_decidable(value) and not isinstance(value, (Ref, Env, BoundMethod, OptionalPath, Namespace))
+
+
+def _as_load(target: ast.expr) -> ast.expr:
+    if isinstance(target, ast.Name):
+        return ast.Name(id=target.id, ctx=ast.Load())
+    if isinstance(target, ast.Subscript):
+        return ast.Subscript(value=target.value, slice=target.slice, ctx=ast.Load())
+    if isinstance(target, ast.Attribute):
+        return ast.Attribute(value=target.value, attr=target.attr, ctx=ast.Load())
+    return target
+
+
+def _root_name(node: ast.expr) -> str | None:
+    while isinstance(node, (ast.Subscript, ast.Attribute)):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _has_starred(target: ast.Tuple | ast.List) -> bool:
+    return any(isinstance(element, ast.Starred) for element in target.elts)
+
+
+def _uses_dynamic_names(node: ast.AST) -> bool:
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and child.id in DYNAMIC_NAMES:
+            return True
+        if isinstance(child, ast.Attribute) and child.attr in DYNAMIC_NAMES:
+            return True
+    return False
+
+
+def evaluate_settings_module(
+    settings_module: str,
+    project_folder: str = ".",
+    environ: Mapping[str, str] | None = None,
+) -> Namespace | None:
+    """
+    Statically evaluates the settings module.
+
+    Args:
+        settings_module: Dotted name of the settings module
+        project_folder: Path to the project folder
+        environ: Environment variables, os.environ by default
+
+    Returns:
+        Namespace of the settings module or None if it is not a project module
+    """
+    evaluator = StaticSettingsEvaluator(project_folder, environ)
+    return evaluator.evaluate_module(settings_module)
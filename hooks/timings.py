@@ -0,0 +1,203 @@
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+from typing import TypeVar
+
+TIMINGS_ENV = "DJANGO_CHECK_TIMINGS"
+# --timings without a path and "1" in the environment variable print the summary table
+SUMMARY = "-"
+# Values of the environment variable which are not a trace path
+ENABLED_VALUES = {"1", "true", "yes", "on"}
+DISABLED_VALUES = {"0", "false", "no", "off"}
+
+DISCOVERY = "discovery"
+PARSE = "parse"
+IMPORT = "import"
+SUBPROCESS = "subprocess"
+IO = "io"
+CHECK = "check"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Span:
+    """Timed part of a hook run."""
+
+    __slots__ = ("recorder", "name", "category", "args", "start")
+
+    def __init__(self, recorder: "Recorder", name: str, category: str, args: dict[str, Any]):
+        self.recorder = recorder
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        end = time.perf_counter_ns()
+        event = (self.name, self.category, self.start, end - self.start, threading.get_ident(), self.args)
+        self.recorder.events.append(event)
+
+
+class _NullSpan:
+    """Span used when timings are disabled, it costs one function call."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Recorder:
+    """Collects spans of the current process."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter_ns()
+        # (name, category, start ns, duration ns, thread id, args), list.append is atomic, so threads share it
+        self.events: list[tuple[str, str, int, int, int, dict[str, Any]]] = []
+
+    def summary(self) -> list[tuple[str, str, int, int, int]]:
+        """
+        Aggregates spans by name.
+
+        Returns:
+            (category, name, count, total ns, max ns) sorted by total time
+        """
+        totals: dict[tuple[str, str], list[int]] = {}
+        for name, category, _, duration, _, _ in self.events:
+            total = totals.setdefault((category, name), [0, 0, 0])
+            total[0] += 1
+            total[1] += duration
+            total[2] = max(total[2], duration)
+        rows = [(category, name, *total) for (category, name), total in totals.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Returns spans in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.start) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": thread_id,
+                "args": args,
+            }
+            for name, category, start, duration, thread_id, args in self.events
+        ]
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+_recorder: Recorder | None = None
+
+
+def span(name: str, category: str = CHECK, **args: Any) -> Span | _NullSpan:
+    """
+    Times the enclosed block if timings are enabled.
+
+    Args:
+        name: Span name
+        category: One of DISCOVERY, PARSE, IMPORT, SUBPROCESS, IO, CHECK
+        args: Details shown in the trace, e.g. the file path
+    """
+    if _recorder is None:
+        return _NULL_SPAN
+    return Span(_recorder, name, category, args)
+
+
+def timed(category: str, name: str | None = None) -> Callable[[F], F]:
+    """Decorator timing every call of the function."""
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _recorder is None:
+                return func(*args, **kwargs)
+            with Span(_recorder, span_name, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def add_timings_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const=SUMMARY,
+        metavar="PATH",
+        help=f"Print time spent in hook phases, or write a Chrome trace to PATH (also set by {TIMINGS_ENV})",
+    )
+
+
+def print_summary(recorder: Recorder, title: str, file: Any = None) -> None:
+    file = file or sys.stderr
+    total = (time.perf_counter_ns() - recorder.start) / 1e6
+    print(f"Timings of {title}: {total:.1f} ms", file=file)
+    print(f"{'category':<12} {'span':<48} {'calls':>6} {'total ms':>10} {'max ms':>10}", file=file)
+    for category, name, count, total_ns, max_ns in recorder.summary():
+        print(f"{category:<12} {name:<48} {count:>6} {total_ns / 1e6:>10.2f} {max_ns / 1e6:>10.2f}", file=file)
+
+
+def write_chrome_trace(recorder: Recorder, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(recorder.chrome_trace(), f)
+
+
+@contextmanager
+def record_timings(destination: str | None, title: str) -> Iterator[None]:
+    """
+    Records spans of the enclosed hook run and reports them at the end.
+
+    Args:
+        destination: Value of --timings, DJANGO_CHECK_TIMINGS is used if it is None
+        title: Hook name for the whole run span and the summary
+    """
+    global _recorder
+
+    if destination is None:
+        destination = os.environ.get(TIMINGS_ENV) or None
+        if destination is not None and destination.lower() in ENABLED_VALUES:
+            destination = SUMMARY
+        elif destination is not None and destination.lower() in DISABLED_VALUES:
+            destination = None
+    if destination is None or _recorder is not None:
+        # Disabled, or nested in an already recorded run, e.g. django-check run calling a hook
+        yield
+        return
+
+    recorder = _recorder = Recorder()
+    try:
+        with Span(recorder, title, CHECK, {}):
+            yield
+    finally:
+        _recorder = None
+        if destination == SUMMARY:
+            print_summary(recorder, title)
+        else:
+            try:
+                write_chrome_trace(recorder, destination)
+            except OSError as e:
+                print(f"Failed to write timings to {destination}: {e}", file=sys.stderr)
@@ -1,20 +1,170 @@
 import os
 import subprocess
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from typing import IO
+
+from .gitignore import GITIGNORE_FILE_NAME
+from .gitignore import IgnoreRules
+from .gitignore import RulesStack
+from .gitignore import is_ignored
+from .gitignore import is_ignored_path
+from .gitignore import load_exclude_rules
+from .settings import EXCLUDE_DIRS
+from .timings import SUBPROCESS
+from .timings import span
 
 UNTRACKED_CMD = ["git", "ls-files", "--others", "--exclude-standard"]
 BRANCH_CMD = ["git", "symbolic-ref", "--short", "HEAD"]
+LS_FILES_CMD = ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"]
+STATUS_CMD = ["git", "--no-optional-locks", "status", "--porcelain=v2", "--branch", "-z", "--untracked-files=all"]
 
 
 def get_untracked_files() -> list[str]:
-    output = subprocess.check_output(UNTRACKED_CMD)
+    with span("git ls-files --others", SUBPROCESS):
+        output = subprocess.check_output(UNTRACKED_CMD)
     return output.decode().split("\n")
 
 
 def get_current_branch() -> str:
-    output = subprocess.check_output(BRANCH_CMD)
+    with span("git symbolic-ref", SUBPROCESS):
+        output = subprocess.check_output(BRANCH_CMD)
     return output.decode().rstrip()
 
 
+def iter_null_separated(stream: IO[bytes], chunk_size: int = 1 << 16) -> Iterator[str]:
+    """
+    Lazily splits NUL-delimited output, e.g. of git commands with -z.
+
+    Args:
+        stream: Binary stream
+        chunk_size: Size of chunks to read
+
+    Yields:
+        Decoded items
+    """
+    rest = b""
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        *items, rest = (rest + chunk).split(b"\0")
+        for item in items:
+            yield os.fsdecode(item)
+    if rest:
+        yield os.fsdecode(rest)
+
+
+def iter_branch_and_untracked_files(pathspecs: Iterable[str] = (), cwd: str = ".") -> Iterator[tuple[str, str]]:
+    """
+    Streams current branch and untracked files from one git status process.
+
+    The branch is always yielded first, so the caller can stop early.
+    Untracked files are filtered by git with the pathspecs and respect .gitignore.
+
+    Args:
+        pathspecs: Git pathspecs to filter untracked files (e.g., "*/migrations/*.py")
+        cwd: Repository folder
+
+    Yields:
+        ("branch", name) and then ("untracked", path) tuples
+    """
+    with span("git status", SUBPROCESS, cwd=cwd):
+        process = subprocess.Popen([*STATUS_CMD, "--", *pathspecs], cwd=cwd, stdout=subprocess.PIPE)
+        assert process.stdout is not None
+        try:
+            items = iter_null_separated(process.stdout)
+            for item in items:
+                if item.startswith("# branch.head "):
+                    yield "branch", item[len("# branch.head ") :]
+                elif item.startswith("? "):
+                    yield "untracked", item[2:]
+                elif item.startswith("2 "):
+                    # Renamed entries are followed by the original path
+                    next(items, None)
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, process.args)
+        finally:
+            # The caller may stop early, e.g. on a branch which is not checked
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+
+def is_excluded_path(file_path: str, exclude_dirs: list[str] | None = None) -> bool:
+    """
+    Checks if any directory of the relative file path is excluded from search.
+
+    Args:
+        file_path: Relative path to the file
+        exclude_dirs: List of directories to exclude
+
+    Returns:
+        True if the file is inside an excluded or hidden directory
+    """
+    if exclude_dirs is None:
+        exclude_dirs = EXCLUDE_DIRS
+
+    dirs = file_path.replace(os.sep, "/").split("/")[:-1]
+    return any(d in exclude_dirs or d.startswith(".") for d in dirs)
+
+
+def get_git_files(
+    pathspecs: Iterable[str],
+    root_path: str = ".",
+    exclude_dirs: list[str] | None = None,
+) -> list[str] | None:
+    """
+    Lists tracked and untracked (but not ignored) files matching git pathspecs.
+
+    Files matching the exclude setting of [tool.django-check] in pyproject.toml are skipped.
+
+    Args:
+        pathspecs: Git pathspecs relative to the root path (e.g., "manage.py", "*/manage.py")
+        root_path: Root directory for search (default is current)
+        exclude_dirs: List of directories to exclude
+
+    Returns:
+        List of paths to existing files or None if the root path is not inside a git repository
+    """
+    try:
+        with span("git ls-files", SUBPROCESS, cwd=root_path):
+            output = subprocess.check_output(
+                [*LS_FILES_CMD, "--", *pathspecs],
+                cwd=root_path,
+                stderr=subprocess.DEVNULL,
+            )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    exclude_rules = load_exclude_rules(root_path)
+    rules: RulesStack = (("", exclude_rules),) if exclude_rules else ()
+    found_files = []
+    for name in os.fsdecode(output).split("\0"):
+        if not name or is_excluded_path(name, exclude_dirs) or (rules and is_ignored_path(rules, name)):
+            continue
+        file_path = os.path.join(root_path, name)
+        # Files deleted from the working tree are still listed by the index
+        if os.path.isfile(file_path):
+            found_files.append(file_path)
+    return found_files
+
+
+def build_file_index(file_paths: Iterable[str]) -> dict[str, list[str]]:
+    """
+    Groups file paths by their base names.
+
+    Args:
+        file_paths: Paths to files
+
+    Returns:
+        Dictionary mapping base name to the list of paths with that name
+    """
+    index: dict[str, list[str]] = {}
+    for file_path in file_paths:
+        index.setdefault(os.path.basename(file_path), []).append(file_path)
+    return index
+
+
 def get_files_with_extension(
     extension: str,
     root_path: str = ".",
@@ -31,29 +181,81 @@ def get_files_with_extension(
     Returns:
         List of paths to files with the specified extension
     """
+    return list(iter_files_with_extension(extension, root_path, exclude_dirs))
+
+
+def iter_files_with_extension(
+    extension: str,
+    root_path: str = ".",
+    exclude_dirs: list[str] | None = None,
+    priority_names: Sequence[str] = (),
+) -> Iterator[str]:
+    """
+    Lazily finds files with the specified extension, excluding specified, hidden and ignored directories.
+
+    The tree is walked with os.scandir, directories are pruned by name before they are listed.
+    Files ignored by .gitignore files of the walked folders or by the exclude setting of
+    [tool.django-check] in pyproject.toml are skipped.
+
+    Args:
+        extension: File extension (e.g., ".py", ".txt", ".json")
+        root_path: Root directory for search (default is current)
+        exclude_dirs: List of directories to exclude
+        priority_names: If set, only files with these names are yielded, in the order of the names.
+            Files with the first name are yielded as soon as they are found, the others after the walk,
+            so the caller can stop at the first match.
+
+    Yields:
+        Paths to files with the specified extension
+    """
     if exclude_dirs is None:
-        exclude_dirs = [
-            "venv",
-            "__pycache__",
-            "node_modules",
-            "build",
-            "dist",
-            "migrations",
-            "media",
-            "static",
-            "staticfiles",
-            "templates",
-            "deactivate",
-        ]
+        exclude_dirs = EXCLUDE_DIRS
+    exclude_names = frozenset(exclude_dirs)
+    priorities = {name: index for index, name in enumerate(priority_names)}
+    # Only found files with lower priority names are kept in memory
+    delayed: list[list[str]] = [[] for _ in priority_names]
 
-    found_files = []
+    exclude_rules = load_exclude_rules(root_path)
+    root_rules: RulesStack = (("", exclude_rules),) if exclude_rules else ()
+    # (folder path, folder path relative to the root with a trailing slash, rules of the folder)
+    stack = [(root_path, "", root_rules)]
+    while stack:
+        folder, rel_folder, rules = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        if any(entry.name == GITIGNORE_FILE_NAME for entry in entries):
+            rules = (*rules, (rel_folder, IgnoreRules.from_file(os.path.join(folder, GITIGNORE_FILE_NAME))))
 
-    for root, dirs, files in os.walk(root_path):
-        dirs[:] = [d for d in dirs if d not in exclude_dirs and not d.startswith(".")]
+        subfolders = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                # Like os.walk, symlinks to directories are not followed
+                if name in exclude_names or name.startswith(".") or entry.is_symlink():
+                    continue
+                if rules and is_ignored(rules, rel_folder + name, True):
+                    continue
+                subfolders.append((entry.path, f"{rel_folder}{name}/", rules))
+                continue
 
-        for file in files:
-            if file.endswith(extension):
-                file_path = os.path.join(root, file)
-                found_files.append(file_path)
+            if not name.endswith(extension):
+                continue
+            priority = priorities.get(name) if priorities else 0
+            if priority is None or (rules and is_ignored(rules, rel_folder + name, False)):
+                continue
+            if priority == 0:
+                yield entry.path
+            else:
+                delayed[priority].append(entry.path)
+        # Depth-first, so only the siblings of the walked folders wait in the stack
+        stack.extend(reversed(subfolders))
 
-    return found_files
+    for paths in delayed[1:]:
+        yield from paths
@@ -1,29 +1,48 @@
 import ast
+import importlib.util
+import io
 import os
 import sys
+import tokenize
 import warnings
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
 
-try:
+from .cache import file_fingerprint
+from .cache import is_file_unchanged
+from .cache import load_cache
+from .cache import save_cache
+from .settings import DJANGO_FILES
+from .timings import DISCOVERY
+from .timings import IMPORT
+from .timings import IO
+from .timings import PARSE
+from .timings import span
+from .timings import timed
+from .utils import build_file_index
+from .utils import get_git_files
+from .utils import iter_files_with_extension
+
+if TYPE_CHECKING:
     from django.conf import Settings
 
-    DJANGO_AVAILABLE = True
-except ImportError:
-    DJANGO_AVAILABLE = False
-    Settings = None
+# Django is imported only when it is set up, finding it is much cheaper
+DJANGO_AVAILABLE = importlib.util.find_spec("django") is not None
 
-from .settings import DJANGO_FILES
-from .utils import get_files_with_extension
+SETTINGS_CACHE_NAME = "settings_module.json"
+SETTINGS_MODULE_VARIABLE = "DJANGO_SETTINGS_MODULE"
 
 
 def ast_parse(contents_text: str) -> ast.Module:
     # intentionally ignore warnings, we can't do anything about them
-    with warnings.catch_warnings():
+    with span("ast.parse", PARSE), warnings.catch_warnings():
         warnings.simplefilter("ignore")
         return ast.parse(contents_text.encode())
 
 
 def read_file(file_path: str) -> str | None:
-    with open(file_path, "rb") as fb:
+    with span("read file", IO, path=file_path), open(file_path, "rb") as fb:
         contents_bytes = fb.read()
 
     try:
@@ -42,73 +61,321 @@ def parse_file(file_content):
         return ast_obj
 
 
-def extract_django_settings_module(file_content: str) -> str | None:
+def _match_settings_module(node: ast.stmt) -> str | None:
     """
-    Extract DJANGO_SETTINGS_MODULE via AST analysis.
+    Match statement setting DJANGO_SETTINGS_MODULE.
 
     Args:
-        content: File content
+        node: Statement node
 
     Returns:
         Value of DJANGO_SETTINGS_MODULE or None
     """
-    try:
-        tree = ast.parse(file_content)
-
-        for node in ast.walk(tree):
-            # Looking for os.environ.setdefault("DJANGO_SETTINGS_MODULE", "value")
-            if isinstance(node, ast.Call):
-                if (
-                    isinstance(node.func, ast.Attribute)
-                    and isinstance(node.func.value, ast.Attribute)
-                    and isinstance(node.func.value.value, ast.Name)
-                    and node.func.value.value.id == "os"
-                    and node.func.value.attr == "environ"
-                    and node.func.attr == "setdefault"
-                ):
-                    if (
-                        len(node.args) >= 2
-                        and isinstance(node.args[0], ast.Constant)
-                        and node.args[0].value == "DJANGO_SETTINGS_MODULE"
-                        and isinstance(node.args[1], ast.Constant)
-                    ):
-                        return node.args[1].value
+    # Looking for os.environ.setdefault("DJANGO_SETTINGS_MODULE", "value"), the result may be assigned
+    if isinstance(node, (ast.Expr, ast.Assign, ast.AnnAssign)) and isinstance(node.value, ast.Call):
+        call = node.value
+        if (
+            isinstance(call.func, ast.Attribute)
+            and isinstance(call.func.value, ast.Attribute)
+            and isinstance(call.func.value.value, ast.Name)
+            and call.func.value.value.id == "os"
+            and call.func.value.attr == "environ"
+            and call.func.attr == "setdefault"
+            and len(call.args) >= 2
+            and isinstance(call.args[0], ast.Constant)
+            and call.args[0].value == SETTINGS_MODULE_VARIABLE
+            and isinstance(call.args[1], ast.Constant)
+        ):
+            return call.args[1].value
 
+    if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+        for target in node.targets:
             # Looking for os.environ["DJANGO_SETTINGS_MODULE"] = "value"
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if (
-                        isinstance(target, ast.Subscript)
-                        and isinstance(target.value, ast.Attribute)
-                        and isinstance(target.value.value, ast.Name)
-                        and target.value.value.id == "os"
-                        and target.value.attr == "environ"
-                        and isinstance(target.slice, ast.Constant)
-                        and target.slice.value == "DJANGO_SETTINGS_MODULE"
-                        and isinstance(node.value, ast.Constant)
-                    ):
-                        return node.value.value
+            if (
+                isinstance(target, ast.Subscript)
+                and isinstance(target.value, ast.Attribute)
+                and isinstance(target.value.value, ast.Name)
+                and target.value.value.id == "os"
+                and target.value.attr == "environ"
+                and isinstance(target.slice, ast.Constant)
+                and target.slice.value == SETTINGS_MODULE_VARIABLE
+            ):
+                return node.value.value
 
             # Looking for DJANGO_SETTINGS_MODULE = "value"
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if (
-                        isinstance(target, ast.Name)
-                        and target.id == "DJANGO_SETTINGS_MODULE"
-                        and isinstance(node.value, ast.Constant)
-                    ):
-                        return node.value.value
+            if isinstance(target, ast.Name) and target.id == SETTINGS_MODULE_VARIABLE:
+                return node.value.value
+
+    return None
+
+
+def _find_settings_module_in_statements(statements: list[ast.stmt]) -> str | None:
+    """
+    Search statements and bodies of nested blocks (functions, `if __name__ == "__main__"`, etc.).
+
+    Expressions are not walked, DJANGO_SETTINGS_MODULE is always set by a statement.
+    """
+    for node in statements:
+        settings_module = _match_settings_module(node)
+        if settings_module:
+            return settings_module
+
+        for field in ("body", "orelse", "finalbody", "handlers"):
+            nested = getattr(node, field, None)
+            if isinstance(nested, list) and nested and isinstance(nested[0], (ast.stmt, ast.excepthandler)):
+                settings_module = _find_settings_module_in_statements(nested)
+                if settings_module:
+                    return settings_module
+
+    return None
+
+
+def _starts_statement(file_content: str, line_number: int) -> bool:
+    """
+    Checks that the line starts a statement, e.g. it is not inside a multi-line string or brackets.
+
+    Only tokens before the line are read.
+    """
+    # Brackets depth, line breaks inside brackets do not end statements
+    depth = 0
+    new_line = True
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(file_content).readline):
+            if token.start[0] >= line_number:
+                return token.start[0] == line_number and new_line
+            if token.end[0] >= line_number:
+                # Multi-line string covering the line
+                return False
+            if token.type == tokenize.OP and token.string in "([{":
+                depth += 1
+            elif token.type == tokenize.OP and token.string in ")]}":
+                depth -= 1
+            new_line = depth == 0 and token.type in (tokenize.NEWLINE, tokenize.NL, tokenize.COMMENT, tokenize.DEDENT)
+    except (tokenize.TokenError, SyntaxError):
+        return False
+    return False
+
+
+def extract_django_settings_module(file_content: str) -> str | None:
+    """
+    Extract DJANGO_SETTINGS_MODULE via AST analysis.
+
+    Only lines mentioning DJANGO_SETTINGS_MODULE are parsed first, a match counts if the line
+    starts a statement. The whole file is parsed if no line matches, e.g. the statement spans
+    several lines.
+
+    Args:
+        file_content: File content
+
+    Returns:
+        Value of DJANGO_SETTINGS_MODULE or None
+    """
+    if SETTINGS_MODULE_VARIABLE not in file_content:
+        return None
 
+    # Lines are split like tokenize does
+    for line_number, line in enumerate(io.StringIO(file_content), 1):
+        if SETTINGS_MODULE_VARIABLE not in line:
+            continue
+        try:
+            tree = ast_parse(line.strip())
+        except SyntaxError:
+            continue
+        settings_module = _find_settings_module_in_statements(tree.body)
+        if settings_module and _starts_statement(file_content, line_number):
+            return settings_module
+
+    try:
+        tree = ast_parse(file_content)
     except SyntaxError:
-        pass
+        return None
+    return _find_settings_module_in_statements(tree.body)
+
+
+def extract_django_settings_module_from_file(file_path: str) -> str | None:
+    """
+    Extract DJANGO_SETTINGS_MODULE from the file.
+
+    Files not mentioning DJANGO_SETTINGS_MODULE are skipped without decoding or parsing.
 
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Value of DJANGO_SETTINGS_MODULE or None
+    """
+    try:
+        with span("read file", IO, path=file_path), open(file_path, "rb") as fb:
+            contents_bytes = fb.read()
+    except OSError:
+        return None
+
+    if SETTINGS_MODULE_VARIABLE.encode() not in contents_bytes:
+        return None
+
+    try:
+        file_content = contents_bytes.decode()
+    except UnicodeDecodeError:
+        print(f"{file_path} is non-utf-8 (not supported)", file=sys.stderr)
+        return None
+    return extract_django_settings_module(file_content)
+
+
+def find_settings_module_in_files(file_paths: Iterable[str]) -> tuple[str, str] | None:
+    """
+    Find the first file setting DJANGO_SETTINGS_MODULE.
+
+    Args:
+        file_paths: Paths to files in priority order, consumed lazily
+
+    Returns:
+        Tuple of settings module and path of the file it was found in, or None.
+    """
+    for file_path in file_paths:
+        settings_module = extract_django_settings_module_from_file(file_path)
+        if settings_module:
+            return settings_module, file_path
     return None
 
 
-def init_django_settings(project_folder: str = ".") -> Settings | None:
+def iter_django_files(project_folder: str = ".") -> Iterator[str]:
+    """
+    Find files with logic to start Django project, in the order of DJANGO_FILES.
+
+    Inside a git repository files are listed by git, otherwise the project tree is walked lazily,
+    so the walk stops as soon as the caller finds what it needs.
+
+    Args:
+        project_folder: Path to the project folder.
+
+    Yields:
+        Paths to files with names from DJANGO_FILES.
+    """
+    pathspecs = [pattern for name in DJANGO_FILES for pattern in (name, f"*/{name}")]
+    django_files = get_git_files(pathspecs, project_folder)
+    if django_files is None:
+        yield from iter_files_with_extension(".py", project_folder, priority_names=DJANGO_FILES)
+        return
+
+    files_index = build_file_index(django_files)
+    for name in DJANGO_FILES:
+        yield from files_index.get(name, [])
+
+
+@timed(DISCOVERY)
+def discover_settings_module(project_folder: str = ".") -> tuple[str, str] | None:
+    """
+    Search project files for DJANGO_SETTINGS_MODULE.
+
+    Args:
+        project_folder: Path to the project folder.
+
+    Returns:
+        Tuple of settings module and path of the file it was found in, or None.
+    """
+    return find_settings_module_in_files(iter_django_files(project_folder))
+
+
+def find_settings_module_root(file_path: str, settings_module: str, project_folder: str = ".") -> str | None:
+    """
+    Find the folder the settings module is imported from.
+
+    It is the folder of the file setting DJANGO_SETTINGS_MODULE or one of its parents inside the project folder.
+
+    Args:
+        file_path: Path to the file setting DJANGO_SETTINGS_MODULE.
+        settings_module: Dotted name of the settings module.
+        project_folder: Path to the project folder.
+
+    Returns:
+        Path to the folder or None if the settings module is not a file of the project.
+    """
+    module_path = os.path.join(*settings_module.split("."))
+    abs_project_folder = os.path.abspath(project_folder)
+    current = os.path.dirname(os.path.abspath(file_path))
+    while True:
+        base_path = os.path.join(current, module_path)
+        if os.path.isfile(f"{base_path}.py") or os.path.isfile(os.path.join(base_path, "__init__.py")):
+            return current
+        if current == abs_project_folder or os.path.dirname(current) == current:
+            return None
+        current = os.path.dirname(current)
+
+
+@timed(DISCOVERY)
+def discover_projects(project_folder: str = ".") -> list[tuple[str, str]]:
+    """
+    Find every Django project in the folder, e.g. in a monorepo.
+
+    Args:
+        project_folder: Path to the project folder.
+
+    Returns:
+        Sorted list of tuples of the folder of the project and its settings module.
+    """
+    projects = set()
+    for file_path in iter_django_files(project_folder):
+        settings_module = extract_django_settings_module_from_file(file_path)
+        if not settings_module:
+            continue
+        project_root = find_settings_module_root(file_path, settings_module, project_folder)
+        if project_root is not None:
+            projects.add((project_root, settings_module))
+    return sorted(projects)
+
+
+@timed(DISCOVERY)
+def find_settings_module(project_folder: str = ".", use_cache: bool = True) -> str | None:
+    """
+    Find DJANGO_SETTINGS_MODULE of the project, using the discovery cache when possible.
+
+    The cache remembers the file the settings module was found in. While that file is
+    unchanged the project tree is not scanned at all.
+
+    Args:
+        project_folder: Path to the project folder.
+        use_cache: Whether to read and update the discovery cache.
+
+    Returns:
+        Settings module or None if it is not found.
+    """
+    abs_project_folder = os.path.abspath(project_folder)
+
+    if use_cache:
+        cache = load_cache(SETTINGS_CACHE_NAME, project_folder)
+        entry = cache.get(abs_project_folder)
+        if entry and is_file_unchanged(entry["path"], entry["fingerprint"]):
+            return entry["settings_module"]
+
+    found = discover_settings_module(project_folder)
+    if found is None:
+        return None
+
+    settings_module, file_path = found
+    if use_cache:
+        abs_file_path = os.path.abspath(file_path)
+        cache[abs_project_folder] = {
+            "settings_module": settings_module,
+            "path": abs_file_path,
+            "fingerprint": file_fingerprint(abs_file_path),
+        }
+        save_cache(SETTINGS_CACHE_NAME, cache, project_folder)
+    return settings_module
+
+
+def init_django_settings(
+    project_folder: str = ".",
+    use_cache: bool = True,
+    settings_module: str | None = None,
+) -> "Settings | None":
     """
     Initialize Django settings.
 
+    Args:
+        project_folder: Path to the project folder.
+        use_cache: Whether to use the settings discovery cache.
+        settings_module: Settings module to use instead of searching project files.
+
     Returns:
         Settings object or None if Django is not available or settings are not found.
     """
@@ -117,24 +384,7 @@ def init_django_settings(project_folder: str = ".") -> Settings | None:
         return None
 
     # Looking for file with settings module
-    python_files = get_files_with_extension(".py", project_folder)
-    priority_files = DJANGO_FILES
-
-    settings_module = None
-
-    for priority_file in priority_files:
-        for file_path in python_files:
-            if not file_path.endswith(priority_file):
-                continue
-
-            # Extract settings module from file
-            file_content = read_file(file_path)
-            if file_content:
-                settings_module = extract_django_settings_module(file_content)
-                if settings_module:
-                    break
-        if settings_module:
-            break
+    settings_module = settings_module or find_settings_module(project_folder, use_cache=use_cache)
 
     # Configure settings by settings module
     if not settings_module:
@@ -142,13 +392,55 @@ def init_django_settings(project_folder: str = ".") -> Settings | None:
         return None
 
     try:
+        from django.conf import Settings
+
         abs_project_folder = os.path.abspath(project_folder)
         if abs_project_folder not in sys.path:
             sys.path.insert(0, abs_project_folder)
 
         os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
-        settings = Settings(settings_module)
+        with span("import settings", IMPORT, module=settings_module):
+            settings = Settings(settings_module)
         return settings
     except Exception as e:
         print(f"Failed to initialize Django settings: {e}")
         return None
+
+
+def setup_django(project_folder: str = ".", use_cache: bool = True) -> str | None:
+    """
+    Configure Django for the project and populate the app registry.
+
+    Django can be set up only once per process, so all checks needing apps or models
+    should share this call.
+
+    Args:
+        project_folder: Path to the project folder.
+        use_cache: Whether to use the settings discovery cache.
+
+    Returns:
+        Settings module or None if Django is not available or can not be set up.
+    """
+    if not DJANGO_AVAILABLE:
+        print("Django is not available")
+        return None
+
+    settings_module = find_settings_module(project_folder, use_cache=use_cache)
+    if not settings_module:
+        print("Settings module not found")
+        return None
+
+    try:
+        import django
+
+        abs_project_folder = os.path.abspath(project_folder)
+        if abs_project_folder not in sys.path:
+            sys.path.insert(0, abs_project_folder)
+
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+        with span("django.setup", IMPORT, module=settings_module):
+            django.setup()
+        return settings_module
+    except Exception as e:
+        print(f"Failed to set up Django: {e}")
+        return None
@@ -0,0 +1,45 @@
+import json
+from collections.abc import Sequence
+from typing import NamedTuple
+
+
+class MigrationIssue(NamedTuple):
+    """Problem found in migrations of an app."""
+
+    app: str
+    migration: str
+    reason: str
+
+
+def print_migration_issues(issues: Sequence[MigrationIssue], title: str, as_json: bool = False) -> None:
+    """
+    Prints found migration issues.
+
+    Args:
+        issues: Found issues
+        title: Description of the issues
+        as_json: Print issues as a JSON list of objects with app, migration and reason keys
+    """
+    if as_json:
+        print(json.dumps([issue._asdict() for issue in issues], indent=2))
+        return
+
+    for issue in issues:
+        print(f"{title}: {issue.app} {issue.migration} ({issue.reason})")
+
+
+def find_conflicts(loader) -> list[MigrationIssue]:
+    """
+    Finds apps with several leaf migrations.
+
+    Args:
+        loader: Django MigrationLoader
+
+    Returns:
+        Issue for every conflicting leaf migration
+    """
+    issues = []
+    for app_label, names in sorted(loader.detect_conflicts().items()):
+        for name in sorted(names):
+            issues.append(MigrationIssue(app_label, name, f"conflicting leaf nodes: {', '.join(sorted(names))}"))
+    return issues
@@ -26,6 +26,13 @@ def clean_django_state():
     forget_test_project()
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "django-check-cache"
+    monkeypatch.setenv("DJANGO_CHECK_CACHE_DIR", str(cache_dir))
+    yield cache_dir
+
+
 @pytest.fixture
 def temp_git_dir(tmpdir):
     git_dir = tmpdir.join("gits")
@@ -0,0 +1,237 @@
+import datetime
+import decimal
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from hooks.check_absent_migrations import _decode
+from hooks.check_absent_migrations import _encode
+from hooks.settings import get_project_root
+
+from .utils import DEFAULT_INSTALLED_APPS
+from .utils import TempDjangoProject
+from .utils import create_app
+from .utils import run_module
+
+MODELS = """
+from django.db import models
+
+
+class Product(models.Model):
+    name = models.CharField(max_length=100)
+"""
+
+INITIAL_MIGRATION = """
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Product",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=100)),
+            ],
+        ),
+    ]
+"""
+
+SECOND_LEAF_MIGRATION = """
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [("shop", "0001_initial")]
+
+    operations = []
+"""
+
+
+def test_no_absent_migrations():
+    with TempDjangoProject(custom_settings={"INSTALLED_APPS": [*DEFAULT_INSTALLED_APPS, "shop"]}) as project_path:
+        create_app(project_path, "shop", MODELS, {"0001_initial": INITIAL_MIGRATION})
+        result = run_module("hooks.check_absent_migrations", "--project-folder", project_path)
+    assert result.returncode == 0, result.stdout
+
+
+def test_absent_migrations():
+    with TempDjangoProject(custom_settings={"INSTALLED_APPS": [*DEFAULT_INSTALLED_APPS, "shop"]}) as project_path:
+        create_app(project_path, "shop", MODELS)
+        result = run_module("hooks.check_absent_migrations", "--project-folder", project_path, "--json")
+    assert result.returncode == 1
+    assert json.loads(result.stdout) == [
+        {"app": "shop", "migration": "0001_initial", "reason": "Create model Product"},
+    ]
+
+
+def test_conflicting_migrations():
+    with TempDjangoProject(custom_settings={"INSTALLED_APPS": [*DEFAULT_INSTALLED_APPS, "shop"]}) as project_path:
+        create_app(
+            project_path,
+            "shop",
+            MODELS,
+            {
+                "0001_initial": INITIAL_MIGRATION,
+                "0002_first": SECOND_LEAF_MIGRATION,
+                "0002_second": SECOND_LEAF_MIGRATION,
+            },
+        )
+        result = run_module("hooks.check_absent_migrations", "--project-folder", project_path)
+    assert result.returncode == 1
+    assert "shop 0002_first (conflicting leaf nodes: 0002_first, 0002_second)" in result.stdout
+
+
+def test_settings_not_found(tmpdir):
+    result = run_module("hooks.check_absent_migrations", "--project-folder", str(tmpdir))
+    assert result.returncode == 1
+
+
+BLOG_MODELS = """
+from django.conf import settings
+from django.db import models
+
+
+class Post(models.Model):
+    product = models.ForeignKey("shop.Product", on_delete=models.CASCADE)
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+"""
+
+BLOG_INITIAL_MIGRATION = """
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("shop", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Post",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("product", models.ForeignKey(on_delete=models.deletion.CASCADE, to="shop.product")),
+                ("author", models.ForeignKey(on_delete=models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
+"""
+
+WITHOUT_GRAPH_SCRIPT = """
+import django
+from django.db.migrations.loader import MigrationLoader
+
+django.setup()
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("migration graph must not be loaded")
+
+
+MigrationLoader.build_graph = fail
+
+from hooks.check_absent_migrations import find_absent_migrations_in_apps
+
+print(find_absent_migrations_in_apps(["blog"]))
+"""
+
+INSTALLED_APPS_WITH_BLOG = [*DEFAULT_INSTALLED_APPS, "shop", "blog"]
+
+
+def test_only_changed_apps_are_checked():
+    with TempDjangoProject(custom_settings={"INSTALLED_APPS": INSTALLED_APPS_WITH_BLOG}) as project_path:
+        create_app(project_path, "shop", MODELS, {"0001_initial": INITIAL_MIGRATION})
+        blog_path = create_app(project_path, "blog", BLOG_MODELS)
+        shop_models = os.path.join(project_path, "shop", "models.py")
+        blog_models = os.path.join(blog_path, "models.py")
+
+        result = run_module("hooks.check_absent_migrations", "--project-folder", project_path, shop_models)
+        assert result.returncode == 0, result.stdout
+
+        result = run_module("hooks.check_absent_migrations", "--project-folder", project_path, "README.md")
+        assert result.returncode == 0, result.stdout
+        assert "No app files changed" in result.stdout
+
+        result = run_module("hooks.check_absent_migrations", "--project-folder", project_path, blog_models)
+        assert result.returncode == 1
+        assert "Absent migration: blog 0001_initial (Create model Post)" in result.stdout
+
+
+def test_cached_state_of_unchanged_apps():
+    with TempDjangoProject(custom_settings={"INSTALLED_APPS": INSTALLED_APPS_WITH_BLOG}) as project_path:
+        create_app(project_path, "shop", MODELS, {"0001_initial": INITIAL_MIGRATION})
+        blog_path = create_app(project_path, "blog", BLOG_MODELS, {"0001_initial": BLOG_INITIAL_MIGRATION})
+        blog_models = os.path.join(blog_path, "models.py")
+
+        result = run_module("hooks.check_absent_migrations", "--project-folder", project_path, blog_models)
+        assert result.returncode == 0, result.stdout
+
+        script = subprocess.run(
+            [sys.executable, "-c", WITHOUT_GRAPH_SCRIPT],
+            cwd=get_project_root(),
+            env={**os.environ, "PYTHONPATH": project_path, "DJANGO_SETTINGS_MODULE": "testproject.settings"},
+            capture_output=True,
+            text=True,
+        )
+        assert script.returncode == 0, script.stderr
+        assert script.stdout.strip() == "[]"
+
+        with open(blog_models, "a", encoding="utf-8") as f:
+            f.write("    title = models.CharField(max_length=100, default='')\n")
+        with open(os.path.join(blog_path, "migrations", "0002_second.py"), "w", encoding="utf-8") as f:
+            f.write(SECOND_LEAF_MIGRATION.replace("shop", "blog"))
+
+        result = run_module("hooks.check_absent_migrations", "--project-folder", project_path, blog_models)
+        assert result.returncode == 1
+        assert "Absent migration: blog 0003_post_title (Add field title to post)" in result.stdout
+
+
+def test_state_values_round_trip():
+    from django.conf import SettingsReference
+    from django.core.validators import validate_ipv46_address
+    from django.db import models
+    from django.utils import timezone
+
+    value = {
+        "fields": [
+            ("created", models.DateTimeField(default=timezone.now)),
+            ("price", models.DecimalField(max_digits=5, decimal_places=2)),
+            ("ip", models.CharField(max_length=45, validators=[validate_ipv46_address])),
+        ],
+        "user_model": SettingsReference("auth.User", "AUTH_USER_MODEL"),
+        "on_delete": models.CASCADE,
+        "unique_together": {("created", "price")},
+        "since": datetime.date(2020, 1, 2),
+        "amount": decimal.Decimal("1.50"),
+        "bases": (models.Model, "shop.product"),
+    }
+    decoded = _decode(json.loads(json.dumps(_encode(value))))
+    assert [(name, field.deconstruct()) for name, field in decoded["fields"]] == [
+        (name, field.deconstruct()) for name, field in value["fields"]
+    ]
+    assert decoded["user_model"].setting_name == "AUTH_USER_MODEL"
+    assert {key: item for key, item in decoded.items() if key != "fields"} == {
+        key: item for key, item in value.items() if key != "fields"
+    }
+
+
+def test_state_values_are_not_executed():
+    with pytest.raises(TypeError):
+        _encode({"default": lambda: 1})
+    # Only classes which can be deconstructed are built, and only from imported modules
+    with pytest.raises(ValueError):
+        _decode({"object": "subprocess.Popen", "args": [["true"]], "kwargs": {"dict": []}})
+    with pytest.raises(ValueError):
+        _decode({"ref": "not_imported_module.function"})
@@ -1,7 +1,16 @@
+import os
+import re
+import shutil
+import sys
+
+from hooks import check_debug_mode
+from hooks import utils_django
 from hooks.check_debug_mode import main
 from hooks.settings import get_example_project_path
+from hooks.settings import get_project_root
 
 from .utils import TempDjangoProject
+from .utils import run_module
 
 
 def test_debug_mode_without_django():
@@ -35,3 +44,168 @@ def test_debug_mode_with_debug_not_set():
     with TempDjangoProject() as temp_project_path:
         result = main(["--project-folder", temp_project_path])
         assert result == 1
+
+
+def _write_debug_setting(project_path, source):
+    settings_path = os.path.join(project_path, "testproject", "settings.py")
+    with open(settings_path, "a", encoding="utf-8") as f:
+        f.write(f"\n{source}\n")
+
+
+def test_debug_mode_static(monkeypatch):
+    def fail_import(*args, **kwargs):
+        raise AssertionError("settings must not be imported")
+
+    monkeypatch.setattr(utils_django, "init_django_settings", fail_import)
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as temp_project_path:
+        assert main(["--project-folder", temp_project_path, "--mode", "static"]) == 0
+
+
+def test_debug_mode_static_undecidable():
+    with TempDjangoProject() as temp_project_path:
+        _write_debug_setting(temp_project_path, "DEBUG = BASE_DIR.name == 'production'")
+        assert main(["--project-folder", temp_project_path, "--mode", "static"]) == 1
+
+
+def test_debug_mode_auto_falls_back_to_import():
+    with TempDjangoProject() as temp_project_path:
+        _write_debug_setting(temp_project_path, "DEBUG = BASE_DIR.name == 'production'")
+        assert main(["--project-folder", temp_project_path]) == 0
+
+
+def test_debug_mode_auto_falls_back_to_import_after_unknown_calls():
+    with TempDjangoProject() as temp_project_path:
+        with open(os.path.join(temp_project_path, ".env"), "w", encoding="utf-8") as f:
+            f.write("DEBUG=True\n")
+        with open(os.path.join(temp_project_path, "testproject", "dotenv_loader.py"), "w", encoding="utf-8") as f:
+            f.write(
+                "import os\n\n\ndef load_dotenv():\n"
+                "    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')\n"
+                "    with open(path, encoding='utf-8') as f:\n"
+                "        os.environ.update(line.strip().split('=', 1) for line in f)\n"
+            )
+        _write_debug_setting(
+            temp_project_path,
+            "import os\nfrom testproject.dotenv_loader import load_dotenv\nload_dotenv()\n"
+            "DEBUG = os.environ.get('DEBUG', 'False') == 'True'",
+        )
+        result = run_module("hooks.check_debug_mode", "--project-folder", temp_project_path, "--no-cache")
+        assert result.returncode == 1, result.stdout
+
+
+def _install_prodflags(tmpdir, monkeypatch):
+    # A module outside of the project folder can be resolved only by importing it
+    tmpdir.join("prodflags.py").write("IS_PRODUCTION = False\nDEBUG = True\n")
+    monkeypatch.setenv("PYTHONPATH", str(tmpdir))
+
+
+def test_debug_mode_auto_falls_back_to_import_for_imported_condition(tmpdir, monkeypatch, capsys):
+    _install_prodflags(tmpdir, monkeypatch)
+    with TempDjangoProject() as temp_project_path:
+        _write_debug_setting(
+            temp_project_path, "import prodflags\nDEBUG = True\nif prodflags.IS_PRODUCTION:\n    DEBUG = False"
+        )
+        assert main(["--project-folder", temp_project_path, "--mode", "static"]) == 1
+        assert "undecidable" in capsys.readouterr().out
+        result = run_module("hooks.check_debug_mode", "--project-folder", temp_project_path, "--no-cache")
+        assert result.returncode == 1, result.stdout
+        assert "DEBUG mode: True" in result.stdout
+
+
+def test_debug_mode_auto_falls_back_to_import_for_imported_value(tmpdir, monkeypatch, capsys):
+    _install_prodflags(tmpdir, monkeypatch)
+    with TempDjangoProject() as temp_project_path:
+        _write_debug_setting(temp_project_path, "from prodflags import DEBUG")
+        assert main(["--project-folder", temp_project_path, "--mode", "static"]) == 1
+        assert "undecidable" in capsys.readouterr().out
+        result = run_module("hooks.check_debug_mode", "--project-folder", temp_project_path, "--no-cache")
+        assert result.returncode == 1, result.stdout
+        assert "DEBUG mode: True" in result.stdout
+
+
+def _make_monorepo(root, **debug_by_project):
+    for name, debug_source in debug_by_project.items():
+        shutil.copytree(
+            get_example_project_path(), os.path.join(root, name), ignore=shutil.ignore_patterns("__pycache__")
+        )
+        _write_debug_setting(os.path.join(root, name), debug_source)
+
+
+def test_debug_mode_with_settings_module(tmpdir):
+    _make_monorepo(str(tmpdir), project="DEBUG = False")
+    project_path = str(tmpdir.join("project"))
+    assert main(["--project-folder", project_path, "--settings-module", "testproject.settings"]) == 0
+    assert main(["--project-folder", project_path, "--settings-module", "missing.settings"]) == 1
+
+
+def test_debug_mode_all_projects(tmpdir, monkeypatch, capsys):
+    monkeypatch.setenv("PYTHONPATH", get_project_root())
+    _make_monorepo(str(tmpdir), first="DEBUG = False", second="DEBUG = True", third="DEBUG = False")
+
+    assert main(["--project-folder", str(tmpdir), "--all-projects", "--jobs", "3"]) == 1
+    out = capsys.readouterr().out
+    rows = {line.split()[0]: line.split()[2] for line in out.splitlines() if re.search(r"\d\.\d\ds$", line)}
+    assert rows == {"first": "OK", "second": "FAILED", "third": "OK"}
+    assert "second (testproject.settings):\nDEBUG mode: True" in out
+
+
+def test_debug_mode_all_projects_timeout(tmpdir, monkeypatch, capsys):
+    monkeypatch.setenv("PYTHONPATH", get_project_root())
+    _make_monorepo(str(tmpdir), slow="import time\ntime.sleep(30)\nDEBUG = False")
+
+    args = ["--project-folder", str(tmpdir), "--all-projects", "--mode", "import", "--timeout", "1"]
+    assert main(args) == 1
+    assert "TIMEOUT" in capsys.readouterr().out
+
+
+def test_debug_mode_all_projects_without_projects(tmpdir):
+    assert main(["--project-folder", str(tmpdir), "--all-projects"]) == 1
+
+
+def _forget_settings():
+    # Settings are imported once per process, the hook runs in a new process every time
+    for name in [name for name in sys.modules if name.startswith("testproject")]:
+        del sys.modules[name]
+
+
+def test_debug_mode_result_is_cached(monkeypatch, capsys):
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as temp_project_path:
+        args = ["--project-folder", temp_project_path, "--mode", "import"]
+        assert main(args) == 0
+
+        def fail_check(*args, **kwargs):
+            raise AssertionError("settings must not be evaluated")
+
+        with monkeypatch.context() as m:
+            m.setattr(check_debug_mode, "check_debug_mode", fail_check)
+            capsys.readouterr()
+            assert main(args) == 0
+            assert "cached" in capsys.readouterr().out
+
+        _write_debug_setting(temp_project_path, "DEBUG = True")
+        _forget_settings()
+        assert main(args) == 1
+
+
+def test_debug_mode_cache_depends_on_environment(monkeypatch):
+    monkeypatch.delenv("APP_DEBUG", raising=False)
+    with TempDjangoProject() as temp_project_path:
+        _write_debug_setting(temp_project_path, "import os\nDEBUG = os.environ.get('APP_DEBUG') == '1'")
+        args = ["--project-folder", temp_project_path, "--mode", "import"]
+        assert main(args) == 0
+
+        monkeypatch.setenv("APP_DEBUG", "1")
+        _forget_settings()
+        assert main(args) == 1
+
+
+def test_debug_mode_cache_depends_on_new_files(capsys):
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as temp_project_path:
+        _write_debug_setting(temp_project_path, "try:\n    from .local import *\nexcept ImportError:\n    pass")
+        args = ["--project-folder", temp_project_path, "--mode", "static"]
+        assert main(args) == 0
+
+        local_settings = os.path.join(temp_project_path, "testproject", "local.py")
+        with open(local_settings, "w", encoding="utf-8") as f:
+            f.write("DEBUG = True\n")
+        assert main(args) == 1
@@ -0,0 +1,110 @@
+import pytest
+
+from hooks import migration_graph
+from hooks.check_migration_graph import main
+from hooks.migration_graph import build_migration_graph
+from hooks.migration_graph import build_migration_graphs
+from hooks.migration_graph import parse_migration
+
+from .utils import create_migrations_project
+from .utils import migration_source
+from .utils import write_migration
+
+
+def test_no_problems(tmpdir):
+    create_migrations_project(tmpdir)
+    assert main(["--project-folder", str(tmpdir)]) == 0
+
+
+def test_conflicting_migrations(tmpdir, capsys):
+    create_migrations_project(tmpdir)
+    write_migration(tmpdir, "shop", "0003_stock", [("shop", "0002_price")])
+    write_migration(tmpdir, "shop", "0003_discount", [("shop", "0002_price")])
+    assert main(["--project-folder", str(tmpdir)]) == 1
+    assert "Conflicting migrations found: shop 0003_discount, 0003_stock" in capsys.readouterr().out
+
+
+def test_dangling_dependency(tmpdir, capsys):
+    create_migrations_project(tmpdir)
+    write_migration(tmpdir, "blog", "0002_tags", [("blog", "0001_initial"), ("shop", "0005_missing")])
+    assert main(["--project-folder", str(tmpdir)]) == 1
+    assert "blog 0002_tags depends on missing shop 0005_missing" in capsys.readouterr().out
+
+
+def test_run_before(tmpdir):
+    create_migrations_project(tmpdir)
+    write_migration(tmpdir, "blog", "0002_tags", [("blog", "0001_initial")])
+    tmpdir.join("blog", "migrations", "0002_tags.py").write("    run_before = [('shop', '0002_price')]\n", mode="a")
+
+    graph = build_migration_graph(str(tmpdir))
+    assert ("blog", "0002_tags") in graph.ancestors([("shop", "0002_price")])
+
+
+def test_app_label_from_app_config(tmpdir):
+    create_migrations_project(tmpdir)
+    tmpdir.join("blog", "apps.py").write(
+        "from django.apps import AppConfig\n\n\nclass BlogConfig(AppConfig):\n    name = 'blog'\n    label = 'news'\n"
+    )
+    graph = build_migration_graph(str(tmpdir))
+    assert graph.apps == ["news", "shop"]
+
+
+def _create_project(project):
+    project.join("manage.py").write(
+        "import os\nos.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')\n", ensure=True
+    )
+    project.join("conf", "settings.py").ensure()
+    create_migrations_project(project)
+
+
+def test_graph_per_project(tmpdir, capsys):
+    _create_project(tmpdir.join("first"))
+    _create_project(tmpdir.join("second"))
+    write_migration(tmpdir.join("second"), "shop", "0003_stock", [("shop", "0002_price")])
+
+    graphs = build_migration_graphs(str(tmpdir))
+    assert [len(graph.nodes) for graph in graphs] == [3, 4]
+    assert main(["--project-folder", str(tmpdir)]) == 0
+
+    write_migration(tmpdir.join("second"), "shop", "0003_discount", [("shop", "0002_price")])
+    assert main(["--project-folder", str(tmpdir)]) == 1
+    assert "Conflicting migrations found in second: shop 0003_discount, 0003_stock" in capsys.readouterr().out
+
+
+def test_parse_migration():
+    source = migration_source([("shop", "0001_initial")]).replace(
+        "dependencies =", "replaces = [('shop', '0001_old')]\n    dependencies ="
+    )
+    assert parse_migration(source) == {
+        "dependencies": [("shop", "0001_initial")],
+        "replaces": [("shop", "0001_old")],
+        "run_before": [],
+    }
+    assert parse_migration("x = 1") is None
+
+
+def test_parsed_files_are_cached(tmpdir, monkeypatch):
+    create_migrations_project(tmpdir)
+    graph = build_migration_graph(str(tmpdir))
+
+    def fail_parse(content):
+        raise AssertionError("cached migrations must not be parsed")
+
+    monkeypatch.setattr(migration_graph, "parse_migration", fail_parse)
+    assert build_migration_graph(str(tmpdir)).nodes == graph.nodes
+
+    with pytest.raises(AssertionError):
+        build_migration_graph(str(tmpdir), use_cache=False)
+
+
+def test_cache_of_project_repository(temp_git_dir, monkeypatch):
+    monkeypatch.delenv("DJANGO_CHECK_CACHE_DIR")
+    create_migrations_project(temp_git_dir)
+    build_migration_graph(str(temp_git_dir))
+    assert temp_git_dir.join(".git", "django-check", migration_graph.GRAPH_CACHE_NAME).isfile()
+
+
+def test_parallel_parsing(tmpdir, monkeypatch):
+    monkeypatch.setattr(migration_graph, "MIN_FILES_FOR_POOL", 2)
+    create_migrations_project(tmpdir)
+    assert main(["--project-folder", str(tmpdir), "--jobs", "2", "--no-cache"]) == 0
@@ -0,0 +1,167 @@
+import pytest
+
+from hooks.check_migration_safety import ADD_FIELD_DEFAULT
+from hooks.check_migration_safety import ADD_INDEX
+from hooks.check_migration_safety import ALTER_FIELD_TYPE
+from hooks.check_migration_safety import REMOVE_FIELD
+from hooks.check_migration_safety import RUN_PYTHON
+from hooks.check_migration_safety import check_migration_safety
+from hooks.check_migration_safety import load_safety_config
+from hooks.check_migration_safety import main
+from hooks.migration_operations import parse_operations
+
+from .utils import create_app
+from .utils import migration_source
+from .utils import write_migration
+
+INITIAL_OPERATIONS = """
+        migrations.CreateModel(
+            name="Order",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True)),
+                ("number", models.IntegerField()),
+                ("note", models.TextField()),
+            ],
+        ),
+"""
+
+FORWARD = """
+def forward(apps, schema_editor):
+    Order = apps.get_model("shop", "Order")
+    for order in Order.objects.all(){batching}:
+        order.save()
+"""
+
+
+def check(tmpdir, operations, functions=""):
+    write_migration(tmpdir, "shop", "0001_initial", operations=INITIAL_OPERATIONS)
+    path = write_migration(tmpdir, "shop", "0002_change", [("shop", "0001_initial")], operations, functions)
+    return [finding.rule for finding in check_migration_safety([path], str(tmpdir))]
+
+
+def test_parse_operations():
+    operations = parse_operations(migration_source(operations=INITIAL_OPERATIONS)).operations
+    assert [(operation.name, operation.model, operation.field) for operation in operations] == [
+        ("CreateModel", "order", "id"),
+        ("CreateModel", "order", "number"),
+        ("CreateModel", "order", "note"),
+    ]
+    assert operations[0].field_options == {"primary_key": True}
+
+
+def test_add_field_with_default(tmpdir):
+    assert check(tmpdir, 'migrations.AddField("order", "paid", models.BooleanField(default=False)),') == [
+        ADD_FIELD_DEFAULT
+    ]
+    assert check(tmpdir, 'migrations.AddField("order", "paid", models.BooleanField(null=True, default=False)),') == []
+
+
+def test_alter_field_type(tmpdir):
+    operations = 'migrations.AlterField(model_name="order", name="number", field=models.CharField(max_length=20)),'
+    assert check(tmpdir, operations) == [ALTER_FIELD_TYPE]
+    assert check(tmpdir, 'migrations.AlterField("order", "number", models.IntegerField(help_text="No")),') == []
+
+
+def test_indexes(tmpdir):
+    assert check(tmpdir, 'migrations.AddIndex("order", models.Index(fields=["number"], name="idx")),') == [ADD_INDEX]
+    assert check(tmpdir, 'migrations.AlterField("order", "number", models.IntegerField(db_index=True)),') == [
+        ADD_INDEX
+    ]
+    operations = (
+        'migrations.AddField("order", "user", models.ForeignKey(null=True, on_delete=models.CASCADE, to="auth.user")),'
+    )
+    assert check(tmpdir, operations) == [ADD_INDEX]
+    assert check(tmpdir, 'AddIndexConcurrently("order", models.Index(fields=["number"], name="idx")),') == []
+
+
+def test_run_python(tmpdir):
+    assert check(tmpdir, "migrations.RunPython(forward),", FORWARD.format(batching="")) == [RUN_PYTHON]
+    assert check(tmpdir, "migrations.RunPython(forward),", FORWARD.format(batching=".iterator()")) == []
+    assert check(tmpdir, "migrations.RunPython(forward, elidable=True),", FORWARD.format(batching="")) == []
+
+
+def test_remove_field(tmpdir):
+    assert check(tmpdir, 'migrations.RemoveField("order", "note"),') == [REMOVE_FIELD]
+
+    write_migration(tmpdir, "shop", "0001_initial", operations=INITIAL_OPERATIONS)
+    state_only = 'migrations.SeparateDatabaseAndState(state_operations=[migrations.RemoveField("order", "note")]),'
+    write_migration(tmpdir, "shop", "0002_state", [("shop", "0001_initial")], state_only)
+    database_only = (
+        'migrations.SeparateDatabaseAndState(database_operations=[migrations.RemoveField("order", "note")]),'
+    )
+    path = write_migration(tmpdir, "shop", "0003_database", [("shop", "0002_state")], database_only)
+    assert check_migration_safety([path], str(tmpdir)) == []
+
+
+def test_database_with_instant_defaults(tmpdir):
+    operations = 'migrations.AddField("order", "paid", models.BooleanField(default=False)),'
+    tmpdir.join("pyproject.toml").write(
+        '[tool.django-check.migration-safety]\ndatabase = "postgresql"\ndatabase-version = "10.5"\n'
+    )
+    assert check(tmpdir, operations) == [ADD_FIELD_DEFAULT]
+
+    tmpdir.join("pyproject.toml").write(
+        '[tool.django-check.migration-safety]\ndatabase = "PostgreSQL"\ndatabase-version = 15\n'
+    )
+    assert check(tmpdir, operations) == []
+
+
+def test_table_sizes_and_ignored_rules(tmpdir):
+    tmpdir.join("pyproject.toml").write(
+        "[tool.django-check.migration-safety]\n"
+        'ignore = ["run-python"]\n'
+        "min-rows = 1000\n"
+        '[tool.django-check.migration-safety.tables]\n"shop.order" = 10\n'
+    )
+    operations = (
+        'migrations.AddField("order", "paid", models.BooleanField(default=False)),\nmigrations.RunPython(forward),'
+    )
+    assert check(tmpdir, operations, FORWARD.format(batching="")) == []
+
+    tmpdir.join("pyproject.toml").write('[tool.django-check.migration-safety.tables]\n"shop.order" = 5000000\n')
+    assert check(tmpdir, operations, FORWARD.format(batching="")) == [ADD_FIELD_DEFAULT, RUN_PYTHON]
+
+
+def test_latest_definition_in_long_chain(tmpdir):
+    write_migration(tmpdir, "shop", "0001_initial", operations=INITIAL_OPERATIONS)
+    previous = ("shop", "0001_initial")
+    for number in range(2, 200):
+        name = f"{number:04}_number"
+        field_class = "CharField(max_length=20)" if number == 199 else f"IntegerField(help_text='{number}')"
+        operations = f'migrations.AlterField("order", "number", models.{field_class}),'
+        path = write_migration(tmpdir, "shop", name, [previous], operations)
+        previous = ("shop", name)
+    assert [finding.rule for finding in check_migration_safety([path], str(tmpdir))] == [ALTER_FIELD_TYPE]
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        'min-rows = "many"',
+        "min-rows = -1",
+        'ignore = ["run_python"]',
+        'database-version = "15.x"',
+        "database = 15",
+        '[tool.django-check.migration-safety.tables]\n"shop.order" = true',
+    ],
+)
+def test_invalid_config(tmpdir, capsys, config):
+    tmpdir.join("pyproject.toml").write(f"[tool.django-check.migration-safety]\n{config}\n")
+    with pytest.raises(ValueError):
+        load_safety_config(str(tmpdir))
+    assert main(["--project-folder", str(tmpdir)]) == 1
+    assert "Invalid [tool.django-check.migration-safety] config" in capsys.readouterr().out
+
+
+def test_main(tmpdir, capsys):
+    create_app(
+        str(tmpdir),
+        "shop",
+        migrations={"0001_initial": migration_source(operations=INITIAL_OPERATIONS)},
+    )
+    path = write_migration(
+        tmpdir, "shop", "0002_change", [("shop", "0001_initial")], 'migrations.RemoveField("order", "note"),'
+    )
+
+    assert main(["--project-folder", str(tmpdir), path, str(tmpdir.join("README.md"))]) == 1
+    assert f"{path}:10: remove-field: shop.order.note column is dropped" in capsys.readouterr().out
@@ -0,0 +1,126 @@
+from hooks.check_migration_squash import SquashConfig
+from hooks.check_migration_squash import app_chain
+from hooks.check_migration_squash import collect_app_stats
+from hooks.check_migration_squash import find_violations
+from hooks.check_migration_squash import main
+from hooks.check_migration_squash import suggest_squash_ranges
+from hooks.migration_graph import build_migration_graph
+from hooks.migration_operations import parse_operation_files
+
+from .utils import DEFAULT_INSTALLED_APPS
+from .utils import TempDjangoProject
+from .utils import create_app
+from .utils import run_module
+from .utils import write_migration
+
+DATA_MIGRATION = """
+from django.db import migrations
+
+
+def forward(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+    dependencies = [("shop", "0001_initial")]
+
+    operations = [
+        migrations.RunPython(forward, elidable=True),
+        migrations.RunSQL("UPDATE shop_order SET note = ''"),
+        migrations.RunSQL("SELECT 1"),
+    ]
+"""
+
+
+def _write_shop_chain(tmpdir, length):
+    names = ["0001_initial", *(f"{number:04d}_step" for number in range(2, length + 1))]
+    write_migration(tmpdir, "shop", names[0])
+    for previous, name in zip(names, names[1:]):
+        write_migration(tmpdir, "shop", name, [("shop", previous)])
+
+
+def _stats(tmpdir):
+    graph = build_migration_graph(str(tmpdir), jobs=1)
+    parsed = parse_operation_files([node.path for node in graph.nodes.values()], jobs=1)
+    return graph, {stats.app: stats for stats in collect_app_stats(graph, parsed)}
+
+
+def test_app_chain_order(tmpdir):
+    write_migration(tmpdir, "shop", "0001_initial")
+    write_migration(tmpdir, "shop", "0002_b", [("shop", "0003_a")])
+    write_migration(tmpdir, "shop", "0003_a", [("shop", "0001_initial")])
+    graph = build_migration_graph(str(tmpdir), jobs=1)
+    assert [name for _, name in app_chain(graph, "shop")] == ["0001_initial", "0003_a", "0002_b"]
+
+
+def test_collect_app_stats(tmpdir):
+    write_migration(tmpdir, "shop", "0001_initial")
+    tmpdir.join("shop", "migrations", "0002_data.py").write(DATA_MIGRATION)
+    _, stats = _stats(tmpdir)
+    assert stats["shop"].migrations == ["0001_initial", "0002_data"]
+    assert stats["shop"].run_operations == 3
+    assert stats["shop"].non_elidable == 2
+    assert round(stats["shop"].non_elidable_ratio, 2) == 0.67
+
+
+def test_find_violations(tmpdir):
+    _write_shop_chain(tmpdir, 4)
+    _, stats = _stats(tmpdir)
+    assert find_violations(stats["shop"], SquashConfig(4, None, None, None)) == []
+    assert find_violations(stats["shop"], SquashConfig(3, None, None, None)) == [
+        "4 migrations exceed max-migrations 3"
+    ]
+    assert find_violations(stats["shop"]._replace(state_time=2.0), SquashConfig(None, None, None, 1.0)) == [
+        "project state renders in 2.00s, over max-state-seconds 1.0"
+    ]
+
+
+def test_squash_ranges_stop_before_cycles(tmpdir):
+    _write_shop_chain(tmpdir, 4)
+    write_migration(tmpdir, "blog", "0001_initial", [("shop", "0002_step")])
+    # Squashing 0001-0004 would depend on blog, which depends on the squashed migration
+    write_migration(tmpdir, "shop", "0005_blog", [("shop", "0004_step"), ("blog", "0001_initial")])
+    write_migration(tmpdir, "shop", "0006_step", [("shop", "0005_blog")])
+    graph = build_migration_graph(str(tmpdir), jobs=1)
+    assert suggest_squash_ranges(graph, "shop") == [("0001_initial", "0004_step"), ("0005_blog", "0006_step")]
+
+
+def test_squash_ranges_skip_squashed_migrations(tmpdir):
+    _write_shop_chain(tmpdir, 3)
+    tmpdir.join("shop", "migrations", "0001_squashed_0003_step.py").write(
+        "from django.db import migrations\n\n\nclass Migration(migrations.Migration):\n"
+        '    replaces = [("shop", "0001_initial"), ("shop", "0002_step"), ("shop", "0003_step")]\n'
+    )
+    write_migration(tmpdir, "shop", "0004_step", [("shop", "0003_step")])
+    write_migration(tmpdir, "shop", "0005_step", [("shop", "0004_step")])
+    graph = build_migration_graph(str(tmpdir), jobs=1)
+    assert suggest_squash_ranges(graph, "shop") == [("0004_step", "0005_step")]
+
+
+def test_main(tmpdir, capsys):
+    _write_shop_chain(tmpdir, 4)
+    assert main(["--project-folder", str(tmpdir)]) == 0
+
+    tmpdir.join("pyproject.toml").write("[tool.django-check.migration-squash]\nmax-migrations = 3\n")
+    assert main(["--project-folder", str(tmpdir)]) == 1
+    output = capsys.readouterr().out
+    assert "ERROR shop: 4 migrations exceed max-migrations 3" in output
+    assert "Squash: python manage.py squashmigrations shop 0001_initial 0004_step" in output
+
+    assert main(["--project-folder", str(tmpdir), str(tmpdir.join("shop", "models.py"))]) == 0
+    assert "No migration files changed" in capsys.readouterr().out
+
+
+def test_main_measure():
+    with TempDjangoProject(custom_settings={"INSTALLED_APPS": [*DEFAULT_INSTALLED_APPS, "shop"]}) as project_path:
+        create_app(
+            project_path,
+            "shop",
+            migrations={"0001_initial": DATA_MIGRATION.replace('[("shop", "0001_initial")]', "[]")},
+        )
+        with open(f"{project_path}/pyproject.toml", "w", encoding="utf-8") as f:
+            f.write("[tool.django-check.migration-squash]\nmax-state-seconds = 60\n")
+        result = run_module("hooks.check_migration_squash", "--project-folder", project_path, "--measure")
+    assert result.returncode == 0, result.stdout
+    assert "MigrationLoader graph built in" in result.stdout
+    assert "state" in result.stdout.splitlines()[1]
@@ -0,0 +1,88 @@
+import json
+import sqlite3
+
+from hooks.check_migrations_lock import main
+
+from .utils import create_migrations_project
+from .utils import migration_source
+from .utils import write_migration
+
+
+def test_lockfile_up_to_date(tmpdir):
+    create_migrations_project(tmpdir)
+    with tmpdir.as_cwd():
+        assert main(["--update"]) == 0
+        lock = json.loads(tmpdir.join("migrations.lock").read())
+        assert lock["apps"] == {"blog": ["0001_initial"], "shop": ["0002_price"]}
+        assert main([]) == 0
+
+
+def test_lockfile_in_project_folder(tmpdir):
+    project = tmpdir.mkdir("project")
+    create_migrations_project(project)
+    with tmpdir.as_cwd():
+        assert main(["--project-folder", "project", "--update"]) == 0
+        assert project.join("migrations.lock").exists()
+        assert not tmpdir.join("migrations.lock").exists()
+        assert main(["--project-folder", "project"]) == 0
+        assert main(["--project-folder", "project", "--lockfile", str(tmpdir.join("other.lock"))]) == 1
+
+
+def test_lockfile_missing(tmpdir):
+    create_migrations_project(tmpdir)
+    with tmpdir.as_cwd():
+        assert main([]) == 1
+
+
+def test_lockfile_out_of_date(tmpdir):
+    create_migrations_project(tmpdir)
+    with tmpdir.as_cwd():
+        assert main(["--update"]) == 0
+        write_migration(tmpdir, "shop", "0003_stock", [("shop", "0002_price")])
+        assert main([]) == 1
+
+
+def test_conflicting_migrations(tmpdir, capsys):
+    create_migrations_project(tmpdir)
+    write_migration(tmpdir, "shop", "0003_stock", [("shop", "0002_price")])
+    write_migration(tmpdir, "shop", "0003_discount", [("shop", "0002_price")])
+    with tmpdir.as_cwd():
+        assert main(["--update"]) == 1
+    assert "shop 0003_discount, 0003_stock (multiple leaf nodes)" in capsys.readouterr().out
+
+
+def test_squashed_migrations(tmpdir):
+    create_migrations_project(tmpdir)
+    migrations_dir = tmpdir.join("shop", "migrations")
+    migrations_dir.join("0001_squashed_0002_price.py").write(
+        migration_source() + "    replaces = [('shop', '0001_initial'), ('shop', '0002_price')]\n"
+    )
+    with tmpdir.as_cwd():
+        assert main(["--update"]) == 0
+        lock = json.loads(tmpdir.join("migrations.lock").read())
+    assert lock["apps"]["shop"] == ["0001_squashed_0002_price"]
+
+
+def test_environment_drift(tmpdir, capsys):
+    create_migrations_project(tmpdir)
+    database = str(tmpdir.join("db.sqlite3"))
+    with sqlite3.connect(database) as connection:
+        connection.execute("CREATE TABLE django_migrations (id INTEGER PRIMARY KEY, app TEXT, name TEXT)")
+        connection.executemany(
+            "INSERT INTO django_migrations (app, name) VALUES (?, ?)",
+            [("shop", "0001_initial"), ("blog", "0001_initial"), ("auth", "0012_user")],
+        )
+
+    with tmpdir.as_cwd():
+        assert main(["--record-environment", "production", "--database", database]) == 0
+        lock = json.loads(tmpdir.join("migrations.lock").read())
+        assert lock["environments"]["production"] == {"blog": ["0001_initial"], "shop": ["0001_initial"]}
+
+        assert main([]) == 0
+        capsys.readouterr()
+        assert main(["--environment", "production"]) == 1
+        assert "Unapplied migration in production: shop 0002_price (unapplied)" in capsys.readouterr().out
+
+        assert main(["--record-environment", "production"]) == 0
+        assert main(["--environment", "production"]) == 0
+        assert main(["--environment", "staging"]) == 1
@@ -0,0 +1,141 @@
+import collections
+import os
+import sys
+
+from hooks import check_observability_overhead as observability
+from hooks.check_observability_overhead import check_observability_overhead
+from hooks.check_observability_overhead import check_option
+from hooks.check_observability_overhead import main
+
+from .utils import TempDjangoProject
+
+SENTRY_SETTINGS = """
+import os
+
+import sentry_sdk
+from sentry_sdk.integrations.django import DjangoIntegration
+
+SENTRY_DSN = os.environ.get("SENTRY_DSN")
+if SENTRY_DSN:
+    sentry_sdk.init(
+        dsn=SENTRY_DSN,
+        environment=os.environ.get("SENTRY_ENVIRONMENT", "production"),
+        traces_sample_rate=float(os.environ.get("TRACES_RATE", "1.0")),
+        profiles_sample_rate=0.05,
+        integrations=[DjangoIntegration(record_sql_params=True)],
+    )
+"""
+
+CELERY_MODULE = """
+from celery import Celery
+
+app = Celery("testproject")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.conf.update(task_acks_late=True)
+"""
+
+
+def _write(project_path, relative_path, content, append=False):
+    with open(os.path.join(project_path, relative_path), "a" if append else "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _options(findings):
+    return [(finding.option, finding.undecidable) for finding in findings]
+
+
+def test_check_option():
+    budget = {"traces_sample_rate": 0.2, "task_always_eager": False, "worker_prefetch_multiplier": 4}
+    assert check_option("traces_sample_rate", 0.1, budget, "production") is None
+    assert "exceeds the production budget 0.2" in check_option("traces_sample_rate", 1.0, budget, "production")
+    assert "is not allowed" in check_option("task_always_eager", True, budget, "production")
+    assert "(unlimited)" in check_option("worker_prefetch_multiplier", 0, budget, "production")
+    assert check_option("sample_rate", 1.0, budget, "production") is None
+
+
+def test_without_sentry_and_celery():
+    with TempDjangoProject() as temp_project_path:
+        assert check_observability_overhead(temp_project_path) == []
+        assert main(["--project-folder", temp_project_path]) == 0
+
+
+def test_sentry_init(monkeypatch):
+    monkeypatch.delenv("SENTRY_DSN", raising=False)
+    monkeypatch.delenv("TRACES_RATE", raising=False)
+    with TempDjangoProject() as temp_project_path:
+        _write(temp_project_path, os.path.join("testproject", "settings.py"), SENTRY_SETTINGS, append=True)
+        # The init call is found although the block is not executed without SENTRY_DSN
+        findings = check_observability_overhead(temp_project_path)
+        assert _options(findings) == [("traces_sample_rate", False), ("record_sql_params", False)]
+        assert findings[1].message.startswith("DjangoIntegration: ")
+
+        monkeypatch.setenv("TRACES_RATE", "0.1")
+        assert _options(check_observability_overhead(temp_project_path)) == [("record_sql_params", False)]
+
+
+def test_environment_budgets(monkeypatch):
+    with TempDjangoProject() as temp_project_path:
+        _write(temp_project_path, os.path.join("testproject", "settings.py"), SENTRY_SETTINGS, append=True)
+        _write(
+            temp_project_path,
+            "pyproject.toml",
+            "[tool.django-check.observability.budgets.staging]\ntraces_sample_rate = 1.0\nrecord_sql_params = true\n",
+        )
+        monkeypatch.setenv("SENTRY_ENVIRONMENT", "staging")
+        assert check_observability_overhead(temp_project_path) == []
+        assert len(check_observability_overhead(temp_project_path, environment="production")) == 2
+
+
+def test_celery_config():
+    with TempDjangoProject() as temp_project_path:
+        settings = "\nCELERY_TASK_ALWAYS_EAGER = True\nCELERY_WORKER_PREFETCH_MULTIPLIER = PREFETCH\n"
+        _write(temp_project_path, os.path.join("testproject", "settings.py"), settings, append=True)
+        _write(temp_project_path, os.path.join("testproject", "celery.py"), CELERY_MODULE)
+        _write(
+            temp_project_path,
+            "pyproject.toml",
+            "[tool.django-check.observability.budgets.production]\ntask_acks_late = false\n",
+        )
+        findings = check_observability_overhead(temp_project_path)
+        assert _options(findings) == [
+            ("worker_prefetch_multiplier", True),
+            ("task_acks_late", False),
+            ("task_always_eager", False),
+        ]
+        assert os.path.basename(findings[1].path) == "celery.py"
+        assert main(["--project-folder", temp_project_path]) == 1
+
+
+def test_settings_files_are_parsed_once_for_celery_options(monkeypatch):
+    parsed = collections.Counter()
+    parse = observability._parse
+
+    def counting_parse(file_path):
+        parsed[os.path.basename(file_path)] += 1
+        return parse(file_path)
+
+    monkeypatch.setattr(observability, "_parse", counting_parse)
+    with TempDjangoProject() as temp_project_path:
+        settings = "\nCELERY_TASK_ALWAYS_EAGER = True\nCELERY_TASK_ACKS_LATE = True\n"
+        _write(temp_project_path, os.path.join("testproject", "settings.py"), settings, append=True)
+        _write(temp_project_path, os.path.join("testproject", "celery.py"), CELERY_MODULE)
+        check_observability_overhead(temp_project_path)
+    # Once to find sentry_sdk.init calls and once to find locations of all Celery options
+    assert parsed["settings.py"] == 2
+
+
+def test_undecidable_values_do_not_fail(capsys):
+    with TempDjangoProject() as temp_project_path:
+        settings = "\nCELERY_WORKER_PREFETCH_MULTIPLIER = PREFETCH\n"
+        _write(temp_project_path, os.path.join("testproject", "settings.py"), settings, append=True)
+        assert main(["--project-folder", temp_project_path]) == 0
+        assert "WARNING worker_prefetch_multiplier: " in capsys.readouterr().out
+
+
+def test_sentry_and_celery_are_not_imported():
+    with TempDjangoProject() as temp_project_path:
+        _write(temp_project_path, os.path.join("testproject", "settings.py"), SENTRY_SETTINGS, append=True)
+        _write(temp_project_path, os.path.join("testproject", "celery.py"), CELERY_MODULE)
+        main(["--project-folder", temp_project_path])
+    assert "sentry_sdk" not in sys.modules
+    assert "celery" not in sys.modules
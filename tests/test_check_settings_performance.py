@@ -0,0 +1,154 @@
+import os
+import subprocess
+import sys
+
+from hooks import utils_django
+from hooks.check_settings_performance import DEFAULTS
+from hooks.check_settings_performance import ERROR
+from hooks.check_settings_performance import OFF
+from hooks.check_settings_performance import RULES
+from hooks.check_settings_performance import WARNING
+from hooks.check_settings_performance import audit_settings
+from hooks.check_settings_performance import load_severities
+from hooks.check_settings_performance import main
+from hooks.settings import get_project_root
+from hooks.static_settings import UNDECIDABLE
+
+from .utils import TempDjangoProject
+from .utils import run_module
+
+PRODUCTION_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache"}},
+    "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+}
+
+
+def _audit(**settings):
+    severities = {name: severity for name, (severity, _) in RULES.items()}
+    return audit_settings(lambda name: settings.get(name, DEFAULTS.get(name)), severities)
+
+
+def _rules(**settings):
+    findings, _ = _audit(**settings)
+    return [finding.rule for finding in findings]
+
+
+def test_defaults():
+    assert _rules() == ["local-cache", "use-tz"]
+
+
+def test_conn_max_age():
+    postgres = {"ENGINE": "django.db.backends.postgresql", "NAME": "shop"}
+    assert "conn-max-age" in _rules(DATABASES={"default": postgres})
+    assert "conn-health-checks" in _rules(DATABASES={"default": {**postgres, "CONN_MAX_AGE": 60}})
+    assert not {"conn-max-age", "conn-health-checks"} & set(
+        _rules(DATABASES={"default": {**postgres, "CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": True}})
+    )
+    # Opening SQLite connections is cheap
+    assert "conn-max-age" not in _rules(DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3"}})
+
+
+def test_template_loaders():
+    backend = "django.template.backends.django.DjangoTemplates"
+    loaders = ["django.template.loaders.filesystem.Loader", "django.template.loaders.app_directories.Loader"]
+    assert "template-loaders" not in _rules(TEMPLATES=[{"BACKEND": backend, "OPTIONS": {}}])
+    assert "template-loaders" in _rules(TEMPLATES=[{"BACKEND": backend, "OPTIONS": {"loaders": loaders}}])
+    cached = [("django.template.loaders.cached.Loader", loaders)]
+    assert "template-loaders" not in _rules(TEMPLATES=[{"BACKEND": backend, "OPTIONS": {"loaders": cached}}])
+
+
+def test_settings_of_unexpected_shape_skip_rules():
+    findings, _ = _audit(
+        DATABASES=[("default", {})],
+        TEMPLATES={"BACKEND": "django.template.backends.django.DjangoTemplates"},
+        CACHES=PRODUCTION_SETTINGS["CACHES"],
+        INSTALLED_APPS="debug_toolbar",
+    )
+    skipped = {finding.rule: finding.message for finding in findings if finding.message.startswith("skipped")}
+    assert skipped == {
+        "conn-max-age": "skipped, DATABASES is not a dict",
+        "conn-health-checks": "skipped, DATABASES is not a dict",
+        "template-loaders": "skipped, TEMPLATES is not a list",
+        "db-sessions": "skipped, INSTALLED_APPS is not a list",
+        "debug-apps": "skipped, INSTALLED_APPS is not a list",
+    }
+    assert all(finding.severity == WARNING for finding in findings if finding.rule in skipped)
+
+
+def test_caches_and_sessions():
+    assert _rules(TIME_ZONE="UTC", **PRODUCTION_SETTINGS) == []
+    dummy = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    assert _rules(TIME_ZONE="UTC", CACHES=dummy, SESSION_ENGINE=PRODUCTION_SETTINGS["SESSION_ENGINE"]) == [
+        "local-cache"
+    ]
+    assert "db-sessions" in _rules(INSTALLED_APPS=["django.contrib.sessions"])
+
+
+def test_upload_size_and_debug_apps():
+    assert "upload-size" in _rules(DATA_UPLOAD_MAX_MEMORY_SIZE=None)
+    findings, _ = _audit(INSTALLED_APPS=["debug_toolbar"], MIDDLEWARE=["silk.middleware.SilkyMiddleware"])
+    assert [(finding.severity, finding.rule) for finding in findings if finding.rule == "debug-apps"] == [
+        (ERROR, "debug-apps"),
+        (ERROR, "debug-apps"),
+    ]
+
+
+def test_undecidable_settings():
+    findings, undecidable = _audit(CACHES=UNDECIDABLE, DATABASES={"default": {"ENGINE": UNDECIDABLE}})
+    assert undecidable == ["conn-max-age", "conn-health-checks", "local-cache"]
+    assert "local-cache" not in [finding.rule for finding in findings]
+
+
+def test_severities_from_config(tmpdir, capsys):
+    tmpdir.join("pyproject.toml").write(
+        '[tool.django-check.settings-performance.severity]\n"local-cache" = "warning"\n"use-tz" = "off"\n'
+        '"unknown" = "error"\n'
+    )
+    severities = load_severities(str(tmpdir))
+    assert severities["local-cache"] == WARNING
+    assert severities["use-tz"] == OFF
+    assert "unknown" not in severities
+    assert "Unknown rule or severity" in capsys.readouterr().out
+
+
+def test_main_static(monkeypatch, capsys):
+    def fail_import(*args, **kwargs):
+        raise AssertionError("settings must not be imported")
+
+    monkeypatch.setattr(utils_django, "init_django_settings", fail_import)
+    with TempDjangoProject() as temp_project_path:
+        assert main(["--project-folder", temp_project_path]) == 1
+        assert "ERROR local-cache" in capsys.readouterr().out
+
+    with TempDjangoProject(custom_settings=PRODUCTION_SETTINGS) as temp_project_path:
+        assert main(["--project-folder", temp_project_path, "--mode", "static"]) == 0
+
+
+def test_main_undecidable_static():
+    with TempDjangoProject(custom_settings=PRODUCTION_SETTINGS) as temp_project_path:
+        settings_path = os.path.join(temp_project_path, "testproject", "settings.py")
+        with open(settings_path, "a", encoding="utf-8") as f:
+            f.write("\nDATA_UPLOAD_MAX_MEMORY_SIZE = None if BASE_DIR.name else 1024\n")
+
+        args = ["--project-folder", temp_project_path]
+        result = run_module("hooks.check_settings_performance", *args, "--mode", "static")
+        assert result.returncode == 0
+        assert "WARNING upload-size: settings can not be evaluated statically" in result.stdout
+
+        # The fallback imports settings once for all rules
+        result = run_module("hooks.check_settings_performance", *args)
+        assert result.returncode == 1
+        assert "ERROR upload-size" in result.stdout
+
+
+def test_main_skips_unrelated_files(capsys):
+    with TempDjangoProject() as temp_project_path:
+        readme = os.path.join(temp_project_path, "README.md")
+        assert main(["--project-folder", temp_project_path, readme]) == 0
+        assert "No settings files changed" in capsys.readouterr().out
+
+
+def test_debug_mode_hook_is_not_imported():
+    code = "import sys, hooks.check_settings_performance; print('hooks.check_debug_mode' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=get_project_root())
+    assert result.stdout.strip() == "False", result.stderr
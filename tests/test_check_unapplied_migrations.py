@@ -0,0 +1,28 @@
+import os
+import sqlite3
+
+from .utils import TempDjangoProject
+from .utils import run_module
+
+
+def test_unapplied_migrations():
+    with TempDjangoProject() as project_path:
+        result = run_module("hooks.check_unapplied_migrations", "--project-folder", project_path)
+    assert result.returncode == 1
+    assert "Unapplied migration: auth 0001_initial (unapplied)" in result.stdout
+
+
+def test_no_unapplied_migrations():
+    with TempDjangoProject() as project_path:
+        migrate = run_module("django", "migrate", "--settings", "testproject.settings", "--pythonpath", project_path)
+        assert migrate.returncode == 0, migrate.stderr
+
+        result = run_module("hooks.check_unapplied_migrations", "--project-folder", project_path)
+        assert result.returncode == 0, result.stdout
+
+        with sqlite3.connect(os.path.join(project_path, "db.sqlite3")) as connection:
+            connection.execute("DELETE FROM django_migrations WHERE app = 'sessions'")
+
+        result = run_module("hooks.check_unapplied_migrations", "--project-folder", project_path)
+        assert result.returncode == 1
+        assert "Unapplied migration: sessions 0001_initial (unapplied)" in result.stdout
@@ -1,3 +1,5 @@
+import subprocess
+
 from hooks.check_untracked_migrations import main
 from hooks.utils import get_current_branch
 
@@ -25,3 +27,41 @@ def test_running_on_correct_branch(temp_git_dir):
 def test_running_on_incorrect_branch(temp_git_dir):
     with temp_git_dir.as_cwd():
         assert main(["--branches", "branch_one", "branch_two"]) == 1
+
+
+def test_ignored_and_tracked_migrations(temp_git_dir):
+    with temp_git_dir.as_cwd():
+        temp_git_dir.join(".gitignore").write("build/\n")
+        temp_git_dir.mkdir("build").mkdir("app").mkdir("migrations").join("0001_initial.py").write("")
+        migrations_dir = temp_git_dir.mkdir("app").mkdir("migrations")
+        migrations_dir.join("0001_initial.py").write("")
+        migrations_dir.join("notes.txt").write("")
+        subprocess.check_call(["git", "add", "app/migrations/0001_initial.py"])
+        assert main([]) == 0
+
+
+def test_nested_untracked_migrations(temp_git_dir, capsys):
+    with temp_git_dir.as_cwd():
+        migrations_dir = temp_git_dir.mkdir("src").mkdir("app").mkdir("migrations")
+        migrations_dir.join("0001_initial.py").write("")
+        assert main([]) == 1
+    assert "Untracked migration file found: src/app/migrations/0001_initial.py" in capsys.readouterr().out
+
+
+def test_several_repositories(tmpdir, capsys):
+    repos = []
+    for name in ("first", "second", "third"):
+        repo = tmpdir.join(name)
+        subprocess.check_call(["git", "init", "--quiet", "--", str(repo)])
+        repos.append(repo)
+    repos[1].mkdir("app").mkdir("migrations").join("0001_initial.py").write("")
+
+    argv = [arg for repo in repos for arg in ("--repo", str(repo))]
+    assert main([*argv, "--jobs", "3"]) == 1
+    assert capsys.readouterr().out == f"{repos[1]}: Untracked migration file found: app/migrations/0001_initial.py\n"
+
+    assert main(["--repo", str(repos[0]), "--repo", str(repos[2]), "--jobs", "2"]) == 0
+
+
+def test_not_a_repository(tmpdir):
+    assert main(["--repo", str(tmpdir)]) == 1
@@ -0,0 +1,41 @@
+import pytest
+
+from hooks.cli import main
+
+from .utils import TempDjangoProject
+from .utils import run_module
+
+
+def test_run_untracked_without_django(temp_git_dir):
+    with temp_git_dir.as_cwd():
+        assert main(["run", "--hooks", "untracked"]) == 0
+
+
+def test_run_unknown_hook():
+    with pytest.raises(SystemExit):
+        main(["run", "--hooks", "debug,unknown"])
+
+
+def test_run_debug_and_absent():
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as temp_project_path:
+        result = run_module("hooks.cli", "run", "--hooks", "debug,absent", "--project-folder", temp_project_path)
+    assert result.returncode == 0, result.stdout
+    assert "debug: OK" in result.stdout
+    assert "absent: OK" in result.stdout
+
+
+def test_run_reports_failed_checks():
+    with TempDjangoProject(custom_settings={"DEBUG": True}) as temp_project_path:
+        result = run_module("hooks.cli", "run", "--hooks", "debug,absent", "--project-folder", temp_project_path)
+    assert result.returncode == 1
+    assert "debug: FAILED (exit code 1)" in result.stdout
+    assert "absent: OK" in result.stdout
+
+
+def test_run_performance_shares_django_setup():
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as temp_project_path:
+        result = run_module("hooks.cli", "run", "--hooks", "debug,performance", "--project-folder", temp_project_path)
+    assert result.returncode == 1
+    assert "ERROR local-cache" in result.stdout
+    assert "debug: OK" in result.stdout
+    assert "performance: FAILED (exit code 1)" in result.stdout
@@ -0,0 +1,107 @@
+import os
+import stat
+import subprocess
+import sys
+import time
+
+import pytest
+
+from hooks.daemon import get_socket_path
+from hooks.daemon import is_daemon_running
+from hooks.daemon import run_in_daemon
+from hooks.settings import get_project_root
+
+from .utils import TempDjangoProject
+
+PO_DATA = '#: foo/bar.py:1 foo/bar.py:2\nmsgid "Foo"\nmsgstr "Bar"\n'
+
+
+def wait_for_daemon(timeout=10.0):
+    socket_path = get_socket_path()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(socket_path) and is_daemon_running(socket_path):
+            return
+        time.sleep(0.05)
+    raise AssertionError("daemon did not start")
+
+
+@pytest.fixture
+def start_daemon(monkeypatch):
+    processes = []
+    monkeypatch.setenv("PYTHONPATH", get_project_root())
+
+    def start(project_folder):
+        monkeypatch.chdir(project_folder)
+        command = [sys.executable, "-m", "hooks.cli", "serve", "--project-folder", ".", "--idle-timeout", "60"]
+        processes.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+        wait_for_daemon()
+
+    yield start
+
+    for process in processes:
+        process.terminate()
+        process.wait()
+
+
+def test_without_daemon(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    assert run_in_daemon("check-untracked-migrations", []) is None
+
+
+def test_hook_runs_in_daemon(tmpdir, start_daemon, capsys):
+    po_file = tmpdir.join("django.po")
+    po_file.write_text(PO_DATA, encoding="utf-8")
+    start_daemon(tmpdir)
+
+    assert run_in_daemon("po-location-format", ["django.po", "--add-location", "file"]) == 1
+    assert "Reformatted django.po" in capsys.readouterr().out
+    assert po_file.read_text(encoding="utf-8") == '#: foo/bar.py\nmsgid "Foo"\nmsgstr "Bar"\n'
+    assert run_in_daemon("po-location-format", ["django.po", "--add-location", "file"]) == 0
+
+
+def test_argument_errors_are_returned(tmpdir, start_daemon, capsys):
+    start_daemon(tmpdir)
+    assert run_in_daemon("po-location-format", ["django.po"]) == 2
+    assert "--add-location" in capsys.readouterr().err
+
+
+def test_daemon_restarts_when_project_modules_change(start_daemon, capsys):
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as project_path:
+        start_daemon(project_path)
+        assert run_in_daemon("check-debug-mode", ["--mode", "import"]) == 0
+
+        settings_path = os.path.join(project_path, "testproject", "settings.py")
+        with open(settings_path, "a", encoding="utf-8") as f:
+            f.write("\nDEBUG = True\n")
+        stat = os.stat(settings_path)
+        os.utime(settings_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        # Imported settings are stale, the hook must run in the client while the daemon restarts
+        assert run_in_daemon("check-debug-mode", ["--mode", "import"]) is None
+        wait_for_daemon()
+        assert run_in_daemon("check-debug-mode", ["--mode", "import"]) == 1
+        assert "DEBUG mode: True" in capsys.readouterr().out
+
+
+def test_client_does_not_create_cache_dir(tmpdir, monkeypatch):
+    cache_dir = tmpdir.join("cache")
+    monkeypatch.setenv("DJANGO_CHECK_CACHE_DIR", str(cache_dir))
+    monkeypatch.chdir(tmpdir)
+    assert run_in_daemon("po-location-format", []) is None
+    assert not cache_dir.exists()
+
+
+def test_socket_is_private(tmpdir, start_daemon):
+    start_daemon(tmpdir)
+    assert stat.S_IMODE(os.stat(get_socket_path()).st_mode) == 0o600
+
+
+def test_hook_runs_in_client_when_environment_differs(tmpdir, start_daemon, monkeypatch):
+    tmpdir.join("django.po").write_text(PO_DATA, encoding="utf-8")
+    start_daemon(tmpdir)
+    monkeypatch.setenv("PWD", "/elsewhere")
+    assert run_in_daemon("po-location-format", ["django.po", "--add-location", "file"]) == 1
+
+    monkeypatch.setenv("DJANGO_SETTINGS_MODULE", "other.settings")
+    assert run_in_daemon("po-location-format", ["django.po", "--add-location", "file"]) is None
@@ -0,0 +1,50 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from hooks.settings import get_project_root
+
+# Modules the hooks import only when a check needs them
+HEAVY_MODULES = ("django", "multiprocessing", "sqlite3", "celery", "sentry_sdk")
+# Cumulative import time of a hook module, in microseconds
+IMPORT_TIME_BUDGET = int(os.environ.get("IMPORT_TIME_BUDGET_US", 150_000))
+
+
+def get_script_modules():
+    with open(os.path.join(get_project_root(), "pyproject.toml"), encoding="utf-8") as f:
+        content = f.read()
+    scripts = re.search(r"^\[project\.scripts\]\n(.*?)(?:^\[|\Z)", content, re.M | re.S).group(1)
+    return sorted(set(re.findall(r'^[\w-]+\s*=\s*"([\w.]+):\w+"', scripts, re.M)))
+
+
+def run_python(*args):
+    env = {**os.environ, "PYTHONPATH": get_project_root()}
+    result = subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+    return result
+
+
+@pytest.mark.parametrize("module", get_script_modules())
+def test_heavy_modules_are_not_imported(module):
+    code = f"import sys, {module}; print(' '.join(sorted(sys.modules)))"
+    imported = run_python("-c", code).stdout.split()
+    assert [name for name in imported if name.split(".")[0] in HEAVY_MODULES] == []
+
+
+def get_import_time(module):
+    # Lines of -X importtime: "import time: self [us] | cumulative | imported package"
+    stderr = run_python("-X", "importtime", "-c", f"import {module}").stderr
+    return sum(
+        int(cumulative)
+        for cumulative, name in re.findall(r"^import time:\s+\d+ \|\s+(\d+) \| (\S.*)$", stderr, re.M)
+        if name == module or (name.startswith("hooks") and "." not in name)
+    )
+
+
+@pytest.mark.parametrize("module", get_script_modules())
+def test_import_time_budget(module):
+    # The best of a few runs, the first one may read modules from a cold disk cache
+    import_time = min(get_import_time(module) for _ in range(3))
+    assert import_time < IMPORT_TIME_BUDGET, f"{module} imports in {import_time / 1000:.1f} ms"
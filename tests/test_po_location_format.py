@@ -1,3 +1,6 @@
+import os
+import stat
+
 import pytest
 
 from hooks.po_location_format import main
@@ -49,3 +52,71 @@ def test_output_is_correct(input_data, output_data, add_location, tmpdir):
         assert main([str(in_file), "--add-location", add_location]) == 1
         with in_file.open() as f:
             assert output_data == f.read()
+
+
+@pytest.mark.parametrize("add_location", ["file", "never"])
+def test_formatted_file_is_not_rewritten(add_location, tmpdir):
+    in_file = tmpdir.join("in.po")
+    in_file.write_text(FILE_PO_DATA if add_location == "file" else NEVER_PO_DATA, encoding="utf-8")
+    os.utime(in_file, ns=(0, 0))
+    assert main([str(in_file), "--add-location", add_location]) == 0
+    assert in_file.stat().mtime == 0
+
+
+def test_check_does_not_write(tmpdir):
+    in_file = tmpdir.join("in.po")
+    in_file.write_text(INPUT_PO_DATA, encoding="utf-8")
+    assert main([str(in_file), "--add-location", "file", "--check"]) == 1
+    assert in_file.read_text(encoding="utf-8") == INPUT_PO_DATA
+
+
+def test_line_endings_and_mode_are_kept(tmpdir):
+    in_file = tmpdir.join("in.po")
+    in_file.write_binary(INPUT_PO_DATA.replace("\n", "\r\n").encode())
+    in_file.chmod(0o640)
+    assert main([str(in_file), "--add-location", "file"]) == 1
+    assert in_file.read_binary() == FILE_PO_DATA.replace("\n", "\r\n").encode()
+    assert stat.S_IMODE(in_file.stat().mode) == 0o640
+    assert not tmpdir.listdir(lambda path: path.ext == ".tmp")
+
+
+def test_locations_at_end_of_file(tmpdir):
+    in_file = tmpdir.join("in.po")
+    in_file.write_text('msgid "Foo"\n#: foo/foo.py:1\n#: foo/bar.py:2 foo/foo.py:3', encoding="utf-8")
+    assert main([str(in_file), "--add-location", "file"]) == 1
+    assert in_file.read_text(encoding="utf-8") == 'msgid "Foo"\n#: foo/bar.py\n#: foo/foo.py'
+
+
+def test_empty_location_lines_are_kept(tmpdir):
+    in_file = tmpdir.join("in.po")
+    content = '#: \nmsgid "Foo"\nmsgstr ""\n\n#: \n#: foo/foo.py:1\nmsgid "Bar"\nmsgstr ""\n#: '
+    in_file.write_text(content, encoding="utf-8")
+    assert main([str(in_file), "--add-location", "file"]) == 1
+    expected = '#: \nmsgid "Foo"\nmsgstr ""\n\n#: \n#: foo/foo.py\nmsgid "Bar"\nmsgstr ""\n#: '
+    assert in_file.read_text(encoding="utf-8") == expected
+    assert main([str(in_file), "--add-location", "file", "--no-cache"]) == 0
+
+
+def test_normalized_files_are_cached(tmpdir, monkeypatch):
+    in_file = tmpdir.join("in.po")
+    in_file.write_text(INPUT_PO_DATA, encoding="utf-8")
+    assert main([str(in_file), "--add-location", "file"]) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("normalized file is formatted again")
+
+    monkeypatch.setattr("hooks.po_location_format.format_file", fail)
+    assert main([str(in_file), "--add-location", "file"]) == 0
+    # Cache is kept per add-location mode
+    monkeypatch.undo()
+    assert main([str(in_file), "--add-location", "never"]) == 1
+    assert in_file.read_text(encoding="utf-8") == NEVER_PO_DATA
+
+
+def test_parallel_formatting(tmpdir):
+    files = [tmpdir.join(f"{locale}.po") for locale in ("de", "fr", "it")]
+    for po_file in files:
+        po_file.write_text(INPUT_PO_DATA, encoding="utf-8")
+    assert main([*map(str, files), "--add-location", "file", "--jobs", "3"]) == 1
+    assert all(po_file.read_text(encoding="utf-8") == FILE_PO_DATA for po_file in files)
+    assert main([*map(str, files), "--add-location", "file", "--jobs", "3", "--no-cache"]) == 0
@@ -0,0 +1,107 @@
+import os
+
+from hooks import check_debug_mode
+from hooks import check_unapplied_migrations
+from hooks import relevance
+from hooks.relevance import MIGRATIONS
+from hooks.relevance import MODELS
+from hooks.relevance import SETTINGS
+from hooks.relevance import has_relevant_changes
+from hooks.relevance import load_relevance_index
+
+from .utils import TempDjangoProject
+
+
+def _write(path, content=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_relevance_index():
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as project_path:
+        _write(os.path.join(project_path, "shop", "migrations", "__init__.py"))
+        _write(os.path.join(project_path, "shop", "models.py"))
+        index = load_relevance_index(project_path)
+
+        assert index["settings_files"] == ["testproject/settings.py"]
+        assert "manage.py" in index["entry_points"]
+        assert index["app_dirs"] == ["shop"]
+
+
+def test_relevant_changes():
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as project_path:
+        _write(os.path.join(project_path, "shop", "models.py"))
+
+        def is_relevant(filename, kind):
+            return has_relevant_changes([os.path.join(project_path, filename)], project_path, kind)
+
+        assert is_relevant("testproject/settings.py", SETTINGS)
+        assert is_relevant("testproject/local.py", SETTINGS)
+        assert is_relevant(".env", SETTINGS)
+        assert not is_relevant("shop/models.py", SETTINGS)
+        assert not is_relevant("README.md", MODELS)
+
+        assert is_relevant("shop/migrations/0002_item.py", MIGRATIONS)
+        assert is_relevant("blog/migrations/0001_initial.py", MIGRATIONS)
+        assert not is_relevant("shop/models.py", MIGRATIONS)
+
+        assert is_relevant("shop/models.py", MODELS)
+        assert is_relevant("shop/fields.py", MODELS)
+        assert not is_relevant("scripts/deploy.py", MODELS)
+
+
+def test_relevance_index_of_undecidable_settings():
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as project_path:
+        assert load_relevance_index(project_path, use_cache=False)["complete"]
+
+        settings_path = os.path.join(project_path, "testproject", "settings.py")
+        with open(settings_path, encoding="utf-8") as f:
+            settings_content = f.read()
+        for source in [
+            "if BASE_DIR.name == 'production':\n    from scripts.production import *",
+            "from scripts.setup import configure\nconfigure()",
+            "INSTALLED_APPS = [*INSTALLED_APPS, *BASE_DIR.iterdir()]",
+        ]:
+            _write(settings_path, f"{settings_content}\n{source}\n")
+            assert not load_relevance_index(project_path, use_cache=False)["complete"], source
+            changed = [os.path.join(project_path, "scripts", "deploy.py")]
+            assert has_relevant_changes(changed, project_path, SETTINGS, use_cache=False)
+
+
+def test_relevance_index_is_rebuilt_when_layout_changes(monkeypatch):
+    with TempDjangoProject(custom_settings={"DEBUG": False}) as project_path:
+        load_relevance_index(project_path)
+
+        def fail_build(*args, **kwargs):
+            raise AssertionError("index must not be rebuilt")
+
+        with monkeypatch.context() as m:
+            m.setattr(relevance, "build_relevance_index", fail_build)
+            load_relevance_index(project_path)
+
+        with open(os.path.join(project_path, "testproject", "settings.py"), "a", encoding="utf-8") as f:
+            f.write("\nfrom .base import *\n")
+        _write(os.path.join(project_path, "testproject", "base.py"), "DEBUG = False\n")
+        assert "testproject/base.py" in load_relevance_index(project_path)["settings_files"]
+
+
+def test_hooks_skip_irrelevant_changes(monkeypatch, capsys):
+    def fail(*args, **kwargs):
+        raise AssertionError("settings must not be evaluated")
+
+    monkeypatch.setattr(check_debug_mode, "check_debug_mode", fail)
+    monkeypatch.setattr(check_unapplied_migrations, "setup_django", fail)
+    with TempDjangoProject(custom_settings={"DEBUG": True}) as project_path:
+        readme = os.path.join(project_path, "README.md")
+        assert check_debug_mode.main(["--project-folder", project_path, readme]) == 0
+        assert check_unapplied_migrations.main(["--project-folder", project_path, readme]) == 0
+        out = capsys.readouterr().out
+        assert "No settings files changed" in out
+        assert "No migration files changed" in out
+
+
+def test_hooks_check_relevant_changes():
+    with TempDjangoProject(custom_settings={"DEBUG": True}) as project_path:
+        settings_path = os.path.join(project_path, "testproject", "settings.py")
+        assert check_debug_mode.main(["--project-folder", project_path, settings_path]) == 1
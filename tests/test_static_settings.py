@@ -0,0 +1,146 @@
+import pytest
+
+from hooks.static_settings import UNDECIDABLE
+from hooks.static_settings import evaluate_settings_module
+from hooks.static_settings import is_decidable
+
+
+def write_settings(tmpdir, files):
+    for name, content in files.items():
+        path = tmpdir.join(*name.split("/"))
+        path.dirpath().ensure(dir=True)
+        path.write(content)
+
+
+def evaluate_debug(tmpdir, files, environ=None, settings_module="project.settings"):
+    write_settings(tmpdir, {"project/__init__.py": "", **files})
+    namespace = evaluate_settings_module(settings_module, str(tmpdir), environ=environ or {})
+    return namespace.lookup("DEBUG", False)
+
+
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        ("DEBUG = False", False),
+        ("DEBUG = True", True),
+        ("X = 1\nDEBUG = X > 2 or not True", False),
+        ("DEBUG = 'on' in ('on', 'yes')", True),
+        ("FLAGS = {'debug': False}\nDEBUG = FLAGS['debug']", False),
+        ("DEBUG = True\nDEBUG &= False", False),
+        ("DEBUG = True if 1 > 2 else False", False),
+        ("ALLOWED_HOSTS = []", False),
+    ],
+)
+def test_constant_folding(tmpdir, source, expected):
+    assert evaluate_debug(tmpdir, {"project/settings.py": source}) is expected
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "DEBUG = get_debug()",
+        "import random\nDEBUG = random.choice([True, False])",
+        "from third_party import *",
+        "import os\nif os.path.exists('/tmp'):\n    DEBUG = True",
+        "globals()['DEBUG'] = True",
+        "for flag in [True]:\n    DEBUG = flag",
+        "import prodflags\nif prodflags.IS_PRODUCTION:\n    DEBUG = True",
+        "import prodflags\nDEBUG = True if prodflags.IS_PRODUCTION else False",
+        "import prodflags\nDEBUG = prodflags.IS_PRODUCTION and True",
+    ],
+)
+def test_undecidable(tmpdir, source):
+    value = evaluate_debug(tmpdir, {"project/settings.py": f"DEBUG = False\n{source}"})
+    assert value is UNDECIDABLE
+
+
+def test_star_import_chain(tmpdir):
+    files = {
+        "project/settings/__init__.py": "from .production import *",
+        "project/settings/production.py": "from .base import *\nDEBUG = not DEBUG",
+        "project/settings/base.py": "DEBUG = True",
+    }
+    assert evaluate_debug(tmpdir, files) is False
+
+
+def test_optional_local_settings(tmpdir):
+    source = "DEBUG = False\ntry:\n    from .local import *\nexcept ImportError:\n    pass\n"
+    assert evaluate_debug(tmpdir, {"project/settings.py": source}) is False
+    assert evaluate_debug(tmpdir, {"project/settings.py": source, "project/local.py": "DEBUG = True"}) is True
+
+
+def test_split_settings_include(tmpdir):
+    files = {
+        "project/settings/__init__.py": (
+            "from split_settings.tools import include, optional\ninclude('components/*.py', optional('local.py'))\n"
+        ),
+        "project/settings/components/a_base.py": "DEBUG = True",
+        "project/settings/components/b_production.py": "DEBUG = False",
+    }
+    assert evaluate_debug(tmpdir, files) is False
+
+    files["project/settings/local.py"] = "DEBUG = True"
+    assert evaluate_debug(tmpdir, files) is True
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "import environ\nenv = environ.Env(DEBUG=(bool, False))\nDEBUG = env('DEBUG')",
+        "import environ\nenv = environ.Env()\nDEBUG = env.bool('DEBUG', default=False)",
+        "from environ import Env\nenv = Env()\nDEBUG = env('DEBUG', cast=bool, default=False)",
+        "import os\nDEBUG = os.environ.get('DEBUG', '0') == '1'",
+        "import os\nDEBUG = os.getenv('DEBUG', 'false').lower() in ('1', 'true')",
+    ],
+)
+def test_environment(tmpdir, source):
+    assert evaluate_debug(tmpdir, {"project/settings.py": source}) is False
+    assert evaluate_debug(tmpdir, {"project/settings.py": source}, environ={"DEBUG": "1"}) is True
+
+
+def test_environment_file_is_undecidable(tmpdir):
+    source = (
+        "import environ\nenv = environ.Env()\nenviron.Env.read_env('.env')\nDEBUG = env.bool('DEBUG', default=False)"
+    )
+    assert evaluate_debug(tmpdir, {"project/settings.py": source}) is UNDECIDABLE
+    assert evaluate_debug(tmpdir, {"project/settings.py": source}, environ={"DEBUG": "no"}) is False
+
+
+def test_settings_module_outside_project(tmpdir):
+    assert evaluate_settings_module("missing.settings", str(tmpdir), environ={}) is None
+
+
+def test_is_decidable():
+    assert is_decidable({"default": {"NAME": "db"}})
+    assert not is_decidable({"default": {"NAME": UNDECIDABLE}})
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "from dotenv import load_dotenv\nload_dotenv()",
+        "from .helpers import enable_debug\nenable_debug()",
+        "import logging\nlogger = logging.getLogger(__name__)",
+    ],
+)
+def test_unknown_calls_are_undecidable(tmpdir, source):
+    files = {
+        "project/settings.py": f"import os\n{source}\nDEBUG = os.environ.get('DEBUG', 'False') == 'True'",
+        "project/helpers.py": "def enable_debug():\n    global DEBUG\n    DEBUG = True",
+    }
+    assert evaluate_debug(tmpdir, files) is UNDECIDABLE
+
+
+def test_known_calls_are_followed(tmpdir):
+    source = (
+        "from pathlib import Path\nBASE_DIR = Path(__file__).resolve().parent.parent\n"
+        "NAME = str(BASE_DIR / 'db.sqlite3')\nDEBUG = ' '.join(['a']).upper() == 'B'\n"
+        "def get_debug():\n    return load()\n"
+    )
+    assert evaluate_debug(tmpdir, {"project/settings.py": source}) is False
+
+
+def test_big_values_are_undecidable(tmpdir):
+    assert evaluate_debug(tmpdir, {"project/settings.py": "DEBUG = 10 ** 10 ** 10"}) is UNDECIDABLE
+    assert evaluate_debug(tmpdir, {"project/settings.py": "DEBUG = [1] * 10 ** 9"}) is UNDECIDABLE
+    assert evaluate_debug(tmpdir, {"project/settings.py": "DEBUG = 1 << 10 ** 9"}) is UNDECIDABLE
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from .utils import SETTINGS_PATH
+from .utils import TempDjangoProject
+from .utils import temp_django_projects
+
+
+def test_project_files_are_linked():
+    with TempDjangoProject() as first_path, TempDjangoProject() as second_path:
+        first_manage = os.stat(os.path.join(first_path, "manage.py"))
+        second_manage = os.stat(os.path.join(second_path, "manage.py"))
+        assert first_manage.st_ino == second_manage.st_ino
+
+        first_settings = os.stat(os.path.join(first_path, SETTINGS_PATH))
+        second_settings = os.stat(os.path.join(second_path, SETTINGS_PATH))
+        assert first_settings.st_ino != second_settings.st_ino
+
+
+def test_custom_settings_replace_assignments():
+    installed_apps = ["django.contrib.auth", "django.contrib.contenttypes"]
+    project = TempDjangoProject(custom_settings={"DEBUG": False, "INSTALLED_APPS": installed_apps, "NEW": 1})
+    with project as project_path:
+        settings = project.get_settings()
+        assert settings["DEBUG"] is False
+        assert settings["INSTALLED_APPS"] == installed_apps
+        assert settings["NEW"] == 1
+        # Multiline assignments following the replaced one are kept
+        assert "django.middleware.security.SecurityMiddleware" in settings["MIDDLEWARE"]
+
+        with open(os.path.join(project_path, SETTINGS_PATH), encoding="utf-8") as f:
+            content = f.read()
+        assert content.count("INSTALLED_APPS =") == 1
+        assert content.count("DEBUG =") == 1
+
+
+def test_changing_linked_file_fails():
+    with pytest.raises(AssertionError, match="copy_files"):
+        with TempDjangoProject() as project_path:
+            with open(os.path.join(project_path, "manage.py"), "a", encoding="utf-8") as f:
+                f.write("\n# changed\n")
+
+    with TempDjangoProject() as project_path:
+        with open(os.path.join(project_path, "manage.py"), encoding="utf-8") as f:
+            assert "# changed" not in f.read()
+
+
+def test_copied_files_can_be_changed():
+    wsgi_path = os.path.join("testproject", "wsgi.py")
+    with TempDjangoProject(copy_files=[wsgi_path]) as project_path:
+        with open(os.path.join(project_path, wsgi_path), "a", encoding="utf-8") as f:
+            f.write("\n# changed\n")
+
+
+def test_many_projects_in_parallel():
+    variants = [{"DEBUG": index % 2 == 0, "TIME_ZONE": f"Etc/GMT+{index}"} for index in range(10)]
+    with temp_django_projects(variants) as project_paths:
+        assert len(set(project_paths)) == len(variants)
+        for index, project_path in enumerate(project_paths):
+            with open(os.path.join(project_path, SETTINGS_PATH), encoding="utf-8") as f:
+                content = f.read()
+            assert f'TIME_ZONE = "Etc/GMT+{index}"' in content
+    assert not any(os.path.exists(project_path) for project_path in project_paths)
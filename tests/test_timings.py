@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from hooks import timings
+from hooks.po_location_format import main as po_location_format_main
+from hooks.timings import record_timings
+from hooks.timings import span
+
+
+def test_span_is_not_recorded_without_timings():
+    with span("outside"):
+        pass
+    assert timings._recorder is None
+
+
+def test_summary_is_printed(capsys):
+    with record_timings(timings.SUMMARY, "hook"):
+        with span("read file", timings.IO):
+            pass
+        with span("read file", timings.IO):
+            pass
+
+    err = capsys.readouterr().err
+    assert "Timings of hook" in err
+    row = next(line for line in err.splitlines() if "read file" in line)
+    assert row.split()[:4] == ["io", "read", "file", "2"]
+    assert timings._recorder is None
+
+
+def test_chrome_trace_is_written(tmpdir):
+    trace_path = tmpdir.join("trace.json")
+    with record_timings(str(trace_path), "hook"):
+        with span("git status", timings.SUBPROCESS, cwd="."):
+            pass
+
+    events = json.loads(trace_path.read_text(encoding="utf-8"))["traceEvents"]
+    assert {event["name"] for event in events} == {"hook", "git status"}
+    event = next(event for event in events if event["name"] == "git status")
+    assert event["ph"] == "X"
+    assert event["cat"] == "subprocess"
+    assert event["args"] == {"cwd": "."}
+
+
+def test_nested_runs_are_recorded_once(capsys):
+    with record_timings(timings.SUMMARY, "outer"):
+        with record_timings(timings.SUMMARY, "inner"):
+            with span("step"):
+                pass
+
+    err = capsys.readouterr().err
+    assert "Timings of outer" in err
+    assert "Timings of inner" not in err
+
+
+def test_timings_from_environment(tmpdir, monkeypatch, capsys):
+    monkeypatch.setenv(timings.TIMINGS_ENV, "1")
+    po_file = tmpdir.join("django.po")
+    po_file.write_text('#: foo.py:1\nmsgid "Foo"\nmsgstr "Bar"\n', encoding="utf-8")
+
+    assert po_location_format_main([str(po_file), "--add-location", "file"]) == 1
+    err = capsys.readouterr().err
+    assert "Timings of po-location-format" in err
+    assert "format file" in err
+
+
+@pytest.mark.parametrize("value", ["0", "false", "No", "off"])
+def test_timings_disabled_in_environment(tmpdir, monkeypatch, capsys, value):
+    monkeypatch.setenv(timings.TIMINGS_ENV, value)
+    monkeypatch.chdir(tmpdir)
+    with record_timings(None, "hook"):
+        pass
+    assert capsys.readouterr().err == ""
+    assert tmpdir.listdir() == []
+
+
+def test_timings_flag_writes_trace(tmpdir):
+    trace_path = tmpdir.join("trace.json")
+    po_file = tmpdir.join("django.po")
+    po_file.write_text('msgid "Foo"\nmsgstr "Bar"\n', encoding="utf-8")
+
+    assert po_location_format_main([str(po_file), "--add-location", "file", f"--timings={trace_path}"]) == 0
+    events = json.loads(trace_path.read_text(encoding="utf-8"))["traceEvents"]
+    assert "po-location-format" in {event["name"] for event in events}
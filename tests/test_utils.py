@@ -0,0 +1,117 @@
+import io
+import os
+
+from hooks.gitignore import IgnoreRules
+from hooks.utils import build_file_index
+from hooks.utils import get_files_with_extension
+from hooks.utils import get_git_files
+from hooks.utils import iter_files_with_extension
+from hooks.utils import iter_null_separated
+
+
+def test_get_git_files(temp_git_dir):
+    temp_git_dir.join("manage.py").write("")
+    temp_git_dir.mkdir("project").join("settings.py").write("")
+    temp_git_dir.mkdir("node_modules").join("settings.py").write("")
+    temp_git_dir.join("other.py").write("")
+
+    found_files = get_git_files(["manage.py", "*/manage.py", "settings.py", "*/settings.py"], str(temp_git_dir))
+
+    assert sorted(os.path.relpath(f, temp_git_dir) for f in found_files) == [
+        "manage.py",
+        os.path.join("project", "settings.py"),
+    ]
+
+
+def test_get_git_files_respects_gitignore(temp_git_dir):
+    temp_git_dir.join(".gitignore").write("ignored/\n")
+    temp_git_dir.mkdir("ignored").join("manage.py").write("")
+
+    assert get_git_files(["manage.py", "*/manage.py"], str(temp_git_dir)) == []
+
+
+def test_get_git_files_outside_git(tmpdir):
+    assert get_git_files(["*.py"], str(tmpdir)) is None
+
+
+def test_build_file_index():
+    index = build_file_index(["a/settings.py", "b/settings.py", "a/manage.py"])
+    assert index == {"settings.py": ["a/settings.py", "b/settings.py"], "manage.py": ["a/manage.py"]}
+
+
+def test_iter_null_separated():
+    stream = io.BytesIO(b"first\0second\0third")
+    assert list(iter_null_separated(stream, chunk_size=4)) == ["first", "second", "third"]
+
+
+def test_get_git_files_respects_exclude_setting(temp_git_dir):
+    temp_git_dir.join("pyproject.toml").write('[tool.django-check]\nexclude = ["docs/"]\n')
+    temp_git_dir.join("manage.py").write("")
+    temp_git_dir.mkdir("docs").join("manage.py").write("")
+
+    found_files = get_git_files(["manage.py", "*/manage.py"], str(temp_git_dir))
+    assert [os.path.relpath(f, temp_git_dir) for f in found_files] == ["manage.py"]
+
+
+def test_ignore_rules():
+    rules = IgnoreRules.from_lines(["# comment", "*.log", "!keep.log", "/build/", "docs/**/tmp", "cache/"])
+
+    assert rules.match("debug.log", False) is True
+    assert rules.match("nested/keep.log", False) is False
+    assert rules.match("build", True) is True
+    assert rules.match("app/build", True) is None
+    assert rules.match("docs/a/b/tmp", False) is True
+    assert rules.match("cache", False) is None
+    assert rules.match("app/cache", True) is True
+
+
+def test_iter_files_with_extension(tmpdir):
+    tmpdir.join("manage.py").write("")
+    tmpdir.join("readme.txt").write("")
+    tmpdir.mkdir("node_modules").join("module.py").write("")
+    tmpdir.mkdir(".hidden").join("module.py").write("")
+    tmpdir.mkdir("app").join("views.py").write("")
+
+    found_files = iter_files_with_extension(".py", str(tmpdir))
+    assert sorted(os.path.relpath(f, tmpdir) for f in found_files) == [os.path.join("app", "views.py"), "manage.py"]
+
+
+def test_iter_files_with_extension_respects_ignores(tmpdir):
+    tmpdir.join("pyproject.toml").write('[tool.django-check]\nexclude = ["/deploy"]\n')
+    tmpdir.join(".gitignore").write("generated/\n*_local.py\n")
+    tmpdir.mkdir("generated").join("settings.py").write("")
+    tmpdir.mkdir("deploy").join("settings.py").write("")
+    app = tmpdir.mkdir("app")
+    app.join(".gitignore").write("!settings_local.py\n")
+    app.join("settings_local.py").write("")
+    app.join("other_local.py").write("")
+    tmpdir.join("settings_local.py").write("")
+
+    found_files = iter_files_with_extension(".py", str(tmpdir))
+    assert sorted(os.path.relpath(f, tmpdir) for f in found_files) == [os.path.join("app", "settings_local.py")]
+
+
+def test_iter_files_with_extension_priority(tmpdir):
+    tmpdir.mkdir("a").join("settings.py").write("")
+    tmpdir.join("a").join("manage.py").write("")
+    tmpdir.mkdir("b").join("wsgi.py").write("")
+    tmpdir.join("b").join("other.py").write("")
+    tmpdir.join("settings.py").write("")
+
+    found_files = iter_files_with_extension(".py", str(tmpdir), priority_names=["wsgi.py", "manage.py", "settings.py"])
+    assert [os.path.relpath(f, tmpdir) for f in found_files] == [
+        os.path.join("b", "wsgi.py"),
+        os.path.join("a", "manage.py"),
+        "settings.py",
+        os.path.join("a", "settings.py"),
+    ]
+
+
+def test_get_files_with_extension_with_quoted_config_section(tmpdir):
+    tmpdir.join("pyproject.toml").write('[tool."django-check"]\nexclude = ["deploy/"]\n')
+    tmpdir.mkdir("deploy").join("settings.py").write("")
+    tmpdir.join("manage.py").write("")
+
+    found_files = get_files_with_extension(".py", str(tmpdir))
+    assert isinstance(found_files, list)
+    assert [os.path.relpath(f, tmpdir) for f in found_files] == ["manage.py"]
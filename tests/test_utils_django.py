@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from hooks import utils_django
+from hooks.utils_django import extract_django_settings_module
+from hooks.utils_django import find_settings_module
+from hooks.utils_django import find_settings_module_in_files
+
+from .utils import TempDjangoProject
+
+
+def test_find_settings_module():
+    with TempDjangoProject() as temp_project_path:
+        assert find_settings_module(temp_project_path) == "testproject.settings"
+
+
+def test_find_settings_module_uses_cache(monkeypatch):
+    with TempDjangoProject() as temp_project_path:
+        assert find_settings_module(temp_project_path) == "testproject.settings"
+
+        def fail_discovery(project_folder):
+            raise AssertionError("project tree must not be scanned")
+
+        monkeypatch.setattr(utils_django, "discover_settings_module", fail_discovery)
+        assert find_settings_module(temp_project_path) == "testproject.settings"
+
+
+def test_find_settings_module_cache_invalidated(monkeypatch):
+    with TempDjangoProject(copy_files=[os.path.join("testproject", "wsgi.py")]) as temp_project_path:
+        assert find_settings_module(temp_project_path) == "testproject.settings"
+
+        wsgi_path = os.path.join(temp_project_path, "testproject", "wsgi.py")
+        with open(wsgi_path, encoding="utf-8") as f:
+            content = f.read()
+        with open(wsgi_path, "w", encoding="utf-8") as f:
+            f.write(content.replace("testproject.settings", "testproject.production"))
+
+        assert find_settings_module(temp_project_path) == "testproject.production"
+
+
+def test_find_settings_module_without_cache(isolated_cache_dir):
+    with TempDjangoProject() as temp_project_path:
+        assert find_settings_module(temp_project_path, use_cache=False) == "testproject.settings"
+    assert not isolated_cache_dir.exists()
+
+
+@pytest.mark.parametrize(
+    "file_content",
+    [
+        'import os\nos.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")',
+        'import os\nos.environ["DJANGO_SETTINGS_MODULE"] = "project.settings"',
+        'DJANGO_SETTINGS_MODULE = "project.settings"',
+        'def main():\n    if True:\n        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")',
+        'if __name__ == "__main__":\n    os.environ.setdefault(\n        "DJANGO_SETTINGS_MODULE",\n        "project.settings",\n    )',
+        '"""Uses DJANGO_SETTINGS_MODULE."""\n# DJANGO_SETTINGS_MODULE = "other"\nDJANGO_SETTINGS_MODULE = "project.settings"',
+        '"""\nos.environ.setdefault("DJANGO_SETTINGS_MODULE", "other")\n"""\nDJANGO_SETTINGS_MODULE = "project.settings"',
+        'value = os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")',
+        'DEFAULTS = {\n    "DEBUG": False,\n}\nDJANGO_SETTINGS_MODULE = "project.settings"',
+    ],
+)
+def test_extract_django_settings_module(file_content):
+    assert extract_django_settings_module(file_content) == "project.settings"
+
+
+@pytest.mark.parametrize(
+    "file_content",
+    [
+        "DEBUG = True",
+        'print("DJANGO_SETTINGS_MODULE")',
+        'os.environ.get("DJANGO_SETTINGS_MODULE", "project.settings")',
+        "DJANGO_SETTINGS_MODULE = (",
+        'HELP = """\nDJANGO_SETTINGS_MODULE = "project.settings"\n"""',
+        'HELP = (\n    "text"\n    if True else\n    f"""\nos.environ["DJANGO_SETTINGS_MODULE"] = "project.settings"\n"""\n)',
+    ],
+)
+def test_extract_django_settings_module_not_found(file_content):
+    assert extract_django_settings_module(file_content) is None
+
+
+def test_find_settings_module_in_files(tmpdir):
+    first = tmpdir.join("wsgi.py")
+    first.write("application = None")
+    second = tmpdir.join("manage.py")
+    second.write('DJANGO_SETTINGS_MODULE = "project.settings"')
+    third = tmpdir.join("settings.py")
+    third.write('DJANGO_SETTINGS_MODULE = "other.settings"')
+
+    assert find_settings_module_in_files([str(first), str(second), str(third)]) == (
+        "project.settings",
+        str(second),
+    )
+    assert find_settings_module_in_files([str(first)]) is None
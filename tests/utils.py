@@ -14,21 +14,256 @@ with TempDjangoProject(custom_settings=settings) as project_path:
 with TempDjangoProject(custom_settings={'DEBUG': False}) as project_path:
     # Work with project where DEBUG = False
     pass
+
+# Many projects at once
+with temp_django_projects([{'DEBUG': False}, {'DEBUG': True}]) as project_paths:
+    pass
 """
 
+import ast
+import atexit
 import os
 import shutil
+import subprocess
+import sys
 import tempfile
+import threading
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Any
 
 from hooks.settings import get_example_project_path
+from hooks.settings import get_project_root
+
+SETTINGS_PATH = os.path.join("testproject", "settings.py")
+
+DEFAULT_INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+]
+
+
+MIGRATION = """
+from django.db import migrations
+from django.db import models
+{functions}
+
+class Migration(migrations.Migration):
+    dependencies = {dependencies}
+
+    operations = {operations}
+"""
+
+
+def migration_source(dependencies=(), operations="", functions=""):
+    """Returns the source of a migration, without operations by default."""
+    return MIGRATION.format(
+        dependencies=list(dependencies),
+        operations=f"[\n{operations}\n    ]" if operations else "[]",
+        functions=functions,
+    )
+
+
+def write_migration(project, app, name, dependencies=(), operations="", functions=""):
+    """
+    Writes a migration into <project>/<app>/migrations/<name>.py, without operations by default.
+
+    Returns:
+        Path to the migration
+    """
+    migrations_dir = project.join(app, "migrations")
+    migrations_dir.ensure(dir=True)
+    migrations_dir.join("__init__.py").ensure()
+    path = migrations_dir.join(f"{name}.py")
+    path.write(migration_source(dependencies, operations, functions))
+    return str(path)
+
+
+def create_migrations_project(tmpdir):
+    """Creates shop and blog apps with migrations, blog depends on shop and django.contrib.auth."""
+    write_migration(tmpdir, "shop", "0001_initial")
+    write_migration(tmpdir, "shop", "0002_price", [("shop", "0001_initial")])
+    write_migration(tmpdir, "blog", "0001_initial", [("shop", "0001_initial"), ("auth", "0012_user")])
+
+
+def run_module(module: str, *args: str) -> subprocess.CompletedProcess:
+    """
+    Runs the hook module in a separate process, Django can be set up only once per process.
+
+    Args:
+        module: Module name, e.g. "hooks.check_absent_migrations"
+        args: Command line arguments
+
+    Returns:
+        Completed process with captured text output
+    """
+    return subprocess.run(
+        [sys.executable, "-m", module, *args],
+        cwd=get_project_root(),
+        capture_output=True,
+        text=True,
+    )
+
+
+def create_app(project_path: str, app_label: str, models: str = "", migrations: dict[str, str] | None = None) -> str:
+    """
+    Creates a Django app inside the temporary project.
+
+    Args:
+        project_path: Path to the project
+        app_label: App label, used as the package name
+        models: Content of models.py
+        migrations: Migration file names (without .py) mapped to their content
+
+    Returns:
+        Path to the app
+    """
+    app_path = os.path.join(project_path, app_label)
+    migrations_path = os.path.join(app_path, "migrations")
+    os.makedirs(migrations_path)
+    for file_path, content in [
+        (os.path.join(app_path, "__init__.py"), ""),
+        (os.path.join(app_path, "models.py"), models),
+        (os.path.join(migrations_path, "__init__.py"), ""),
+        *[(os.path.join(migrations_path, f"{name}.py"), content) for name, content in (migrations or {}).items()],
+    ]:
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(content)
+    return app_path
+
+
+class _ProjectTemplate:
+    """
+    Private copy of the example project, shared by all temporary projects of the test session.
+
+    Temporary projects hardlink its files, so the example project itself is never linked and can not
+    be changed by tests. The template is removed at exit.
+    """
+
+    def __init__(self) -> None:
+        self.path = os.path.join(tempfile.mkdtemp(prefix="django-check-template-"), "example")
+        shutil.copytree(get_example_project_path(), self.path, ignore=shutil.ignore_patterns("__pycache__", "*.pyc"))
+        atexit.register(shutil.rmtree, os.path.dirname(self.path), True)
+
+        self.dirs: list[str] = []
+        self.files: list[str] = []
+        for root, dirs, files in os.walk(self.path):
+            relative_root = os.path.relpath(root, self.path)
+            self.dirs.extend(os.path.normpath(os.path.join(relative_root, d)) for d in dirs)
+            self.files.extend(os.path.normpath(os.path.join(relative_root, f)) for f in files)
+
+        self.stats = {f: self._stat(f) for f in self.files}
+
+        with open(os.path.join(self.path, SETTINGS_PATH), encoding="utf-8") as f:
+            self.settings_content = f.read()
+        self.assignments = _find_assignments(self.settings_content)
+
+    def _stat(self, relative_file: str) -> tuple[int, int]:
+        stat = os.stat(os.path.join(self.path, relative_file))
+        return stat.st_size, stat.st_mtime_ns
+
+    def changed_files(self) -> list[str]:
+        """Template files changed through hardlinks of a temporary project."""
+        return [f for f in self.files if self._stat(f) != self.stats[f]]
+
+    def materialize(self, project_path: str, settings_content: str, copy_files: Iterable[str] = ()) -> None:
+        """
+        Creates a project from the template: folders are created, files are hardlinked.
+
+        Args:
+            project_path: Path of the new project
+            settings_content: Content of settings.py, it is always written as a new file
+            copy_files: Relative paths of files to copy instead of linking, for tests changing them in place
+        """
+        copy_files = {os.path.normpath(f) for f in copy_files}
+        os.mkdir(project_path)
+        for relative_dir in self.dirs:
+            os.mkdir(os.path.join(project_path, relative_dir))
+        for relative_file in self.files:
+            if relative_file == SETTINGS_PATH:
+                continue
+            source = os.path.join(self.path, relative_file)
+            target = os.path.join(project_path, relative_file)
+            if relative_file in copy_files:
+                shutil.copy2(source, target)
+                continue
+            try:
+                os.link(source, target)
+            except OSError:
+                # Different file systems or links are not supported
+                shutil.copy2(source, target)
+        with open(os.path.join(project_path, SETTINGS_PATH), "w", encoding="utf-8") as f:
+            f.write(settings_content)
+
+
+def _find_assignments(content: str) -> dict[str, tuple[int, int]]:
+    """
+    Finds top-level assignments of settings.
+
+    Args:
+        content: Settings module source
+
+    Returns:
+        Setting name mapped to the start and end offsets of its first assignment statement
+    """
+    line_offsets = [0]
+    for line in content.splitlines(keepends=True):
+        line_offsets.append(line_offsets[-1] + len(line))
+
+    assignments: dict[str, tuple[int, int]] = {}
+    for node in ast.parse(content).body:
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id not in assignments:
+                    # Offsets of ast nodes are in UTF-8 bytes, settings of the example project are ASCII
+                    start = line_offsets[node.lineno - 1] + node.col_offset
+                    end = line_offsets[node.end_lineno - 1] + node.end_col_offset
+                    assignments[target.id] = (start, end)
+    return assignments
+
+
+_template: _ProjectTemplate | None = None
+_template_lock = threading.Lock()
+
+
+def _get_template() -> _ProjectTemplate:
+    global _template
+    with _template_lock:
+        if _template is None:
+            _template = _ProjectTemplate()
+    return _template
+
+
+def _check_template(raise_error: bool = True) -> None:
+    """Fails the test which changed a linked file in place, the next project gets a fresh template."""
+    global _template
+    with _template_lock:
+        changed_files = _template.changed_files() if _template else []
+        if changed_files:
+            _template = None
+    if changed_files and raise_error:
+        raise AssertionError(f"Linked project files changed in place, add them to copy_files: {changed_files}")
 
 
 class TempDjangoProject:
-    """Context manager for creating a temporary Django project."""
+    """
+    Context manager for creating a temporary Django project.
 
-    def __init__(self, custom_settings: dict[str, Any] | None = None):
+    Files of the project are hardlinks to a template shared by the test session, only settings.py
+    is written. Tests changing other project files in place must list them in copy_files.
+    """
+
+    def __init__(self, custom_settings: dict[str, Any] | None = None, copy_files: Iterable[str] = ()):
         self.custom_settings = custom_settings
+        self.copy_files = copy_files
         self.project_path: str | None = None
 
     def __enter__(self) -> str:
@@ -38,6 +273,8 @@ class TempDjangoProject:
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.project_path:
             self._cleanup_project()
+            # Do not hide the error of the test itself
+            _check_template(raise_error=exc_type is None)
 
     def _create_temp_project(self) -> str:
         """
@@ -46,104 +283,50 @@ class TempDjangoProject:
         Returns:
             Path to the temporary project
         """
-        temp_dir = tempfile.mkdtemp()
-        example_path = get_example_project_path()
-
-        # Copy all example folder to temporary directory
-        temp_project_path = os.path.join(temp_dir, "example")
-        shutil.copytree(example_path, temp_project_path)
-
-        # Update settings.py
-        self._update_settings_file(temp_project_path)
-
-        return temp_project_path
-
-    def _update_settings_file(self, project_path: str) -> None:
-        """
-        Updates the settings.py file in the temporary project.
-
-        Args:
-            project_path: Path to the project
-        """
-        settings_path = os.path.join(project_path, "testproject", "settings.py")
-
-        with open(settings_path, encoding="utf-8") as f:
-            content = f.read()
-
-        # Apply settings
+        template = _get_template()
+        content = template.settings_content
         if self.custom_settings:
-            content = self._apply_custom_settings(content, self.custom_settings)
+            content = self._apply_custom_settings(content, self.custom_settings, template.assignments)
 
-        with open(settings_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        temp_project_path = os.path.join(tempfile.mkdtemp(), "example")
+        template.materialize(temp_project_path, content, self.copy_files)
+        return temp_project_path
 
-    def _apply_custom_settings(self, content: str, settings: dict[str, Any]) -> str:
+    def _apply_custom_settings(
+        self,
+        content: str,
+        settings: dict[str, Any],
+        assignments: dict[str, tuple[int, int]] | None = None,
+    ) -> str:
         """
         Applies additional settings to the settings.py content.
 
+        Existing assignments are replaced in place, new settings are added to the end of the file.
+
         Args:
             content: Content of the settings.py file
             settings: Dictionary with settings
+            assignments: Offsets of assignments in the content, found by parsing it if not specified
 
         Returns:
             Updated content of the file
         """
-        lines = content.split("\n")
+        if assignments is None:
+            assignments = _find_assignments(content)
 
+        replacements = []
+        appended = []
         for setting_name, setting_value in settings.items():
-            # Looking for existing setting
-            setting_found = False
-            for i, line in enumerate(lines):
-                if line.strip().startswith(f"{setting_name} ="):
-                    # Found setting, need to replace it and delete all related lines
-                    new_setting = f"{setting_name} = {self._format_setting_value(setting_value)}"
-
-                    # Define range of lines to delete (multiline settings)
-                    start_index = i
-                    end_index = i
-
-                    # If setting contains opening bracket, looking for closing bracket
-                    if any(bracket in line for bracket in ["{", "[", "("]):
-                        bracket_count = 0
-                        for bracket in line:
-                            if bracket in "{[(":
-                                bracket_count += 1
-                            elif bracket in "}])":
-                                bracket_count -= 1
-
-                        # Looking for closing brackets in the next lines
-                        j = i + 1
-                        while j < len(lines) and bracket_count > 0:
-                            for bracket in lines[j]:
-                                if bracket in "{[(":
-                                    bracket_count += 1
-                                elif bracket in "}])":
-                                    bracket_count -= 1
-                            if bracket_count > 0:
-                                j += 1
-                            else:
-                                end_index = j
-                                break
-                        else:
-                            end_index = j - 1 if j > i + 1 else i
-
-                    # Replace range of lines with one new setting
-                    if isinstance(setting_value, (dict, list)) and len(setting_value) > 0:
-                        # For complex settings use multiline format
-                        new_lines = new_setting.split("\n")
-                        lines[start_index : end_index + 1] = new_lines
-                    else:
-                        # For simple settings use singleline format
-                        lines[start_index : end_index + 1] = [new_setting]
-
-                    setting_found = True
-                    break
-
-            # If setting not found, add it to the end of the file
-            if not setting_found:
-                lines.append(f"{setting_name} = {self._format_setting_value(setting_value)}")
-
-        return "\n".join(lines)
+            new_setting = f"{setting_name} = {self._format_setting_value(setting_value)}"
+            if setting_name in assignments:
+                replacements.append((*assignments[setting_name], new_setting))
+            else:
+                appended.append(new_setting)
+
+        # Replace from the end, so offsets of the remaining assignments stay valid
+        for start, end, new_setting in sorted(replacements, reverse=True):
+            content = content[:start] + new_setting + content[end:]
+        return "\n".join([content, *appended]) if appended else content
 
     def _format_setting_value(self, value: Any, indent_level: int = 0) -> str:
         """
@@ -212,6 +395,8 @@ class TempDjangoProject:
         """
         Gets settings from the temporary project.
 
+        The settings module is executed without importing it, so it is not cached in sys.modules.
+
         Returns:
             Dictionary with settings from settings.py
 
@@ -221,28 +406,33 @@ class TempDjangoProject:
         if not self.project_path:
             raise RuntimeError("Project is not created. Use context manager or create project.")
 
-        import importlib.util
-        import sys
-
-        # Add project path to sys.path
-        if self.project_path not in sys.path:
-            sys.path.insert(0, self.project_path)
-
-        try:
-            # Import settings
-            settings_path = os.path.join(self.project_path, "testproject", "settings.py")
-            spec = importlib.util.spec_from_file_location("settings", settings_path)
-            settings_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(settings_module)
-
-            # Get main settings
-            result = {}
-            for attr_name in dir(settings_module):
-                if not attr_name.startswith("_"):
-                    result[attr_name] = getattr(settings_module, attr_name)
-
-            return result
-        finally:
-            # Remove path from sys.path
-            if self.project_path in sys.path:
-                sys.path.remove(self.project_path)
+        settings_path = os.path.join(self.project_path, SETTINGS_PATH)
+        with open(settings_path, encoding="utf-8") as f:
+            code = compile(f.read(), settings_path, "exec")
+        namespace: dict[str, Any] = {"__file__": settings_path, "__name__": "settings"}
+        exec(code, namespace)
+        return {name: value for name, value in namespace.items() if not name.startswith("_")}
+
+
+@contextmanager
+def temp_django_projects(
+    variants: Sequence[dict[str, Any] | None],
+    jobs: int = 8,
+) -> Iterator[list[str]]:
+    """
+    Creates many temporary Django projects in parallel.
+
+    Args:
+        variants: Custom settings of every project
+        jobs: Number of threads creating projects
+
+    Yields:
+        Paths to the projects in the order of variants
+    """
+    projects = [TempDjangoProject(custom_settings=custom_settings) for custom_settings in variants]
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            yield list(executor.map(lambda project: project.__enter__(), projects))
+    finally:
+        for project in projects:
+            project.__exit__(None, None, None)